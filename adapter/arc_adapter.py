@@ -2,6 +2,7 @@ from adapter.path_adapter import PathAdapter, PathAttributeID
 from command_creation.command_type import CommandType
 
 from enum import Enum, auto
+from typing import Callable
 
 from entity_base.image.image_state import ImageState
 
@@ -11,5 +12,5 @@ class ArcAdapter(PathAdapter):
 
         super().__init__(CommandType.ARC, iconImageStates)
 
-    def set(self, attribute: PathAttributeID, value: float, string: str):
-        super().set(attribute, value, string)
\ No newline at end of file
+    def set(self, attribute: PathAttributeID, value: float, string: str | Callable[[float], str]) -> bool:
+        return super().set(attribute, value, string)
\ No newline at end of file
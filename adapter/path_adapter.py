@@ -1,6 +1,8 @@
+from __future__ import annotations
 from abc import ABC, abstractmethod
+from typing import Callable
 from enum import Enum, auto
-from data_structures.observer import Observable
+from data_structures.observer import NotifyType, Observable
 from command_creation.command_type import CommandType
 from common.image_manager import ImageID
 from entity_base.image.image_state import ImageState
@@ -71,23 +73,65 @@ class PathAdapter(ABC, Observable):
         self._dictValue: dict[Enum, float] = {}
         self._dictStr: dict[Enum, str] = {}
 
+        # the unrounded values last set. Readouts can show more precision than the rounded value,
+        # so whether a value changed is decided from these
+        self._rawValues: dict[Enum, float] = {}
+
         for attribute in legalAttributesForType[type]:
             self._dictValue[attribute] = -1
             self._dictStr[attribute] = ""
 
+        # attributes that have never been set, so they count as changed even if the value matches the default
+        self._unsetAttributes: set[Enum] = set(legalAttributesForType[type])
+
+        # attributes changed since observers were last notified. Coalesced subscriptions are
+        # notified later, so they are passed the attributes that changed instead
+        self.changedAttributes: set[Enum] = set()
+
     def getDict(self) -> dict:
         return self._dict
     
     # value: the raw numerical value to be used in generated code
-    # string: to be displayed by readouts, etc.
-    def set(self, attribute: Enum, value: float, string: str):
+    # string: to be displayed by readouts, etc. Can also be a function that formats the value,
+    # which is only called if the value changed
+    # Observers are only notified if the value or the given string changed. Returns whether it changed
+    def set(self, attribute: Enum, value: float, string: str | Callable[[float], str]) -> bool:
 
         # make sure the attribute belongs to the corresponding type of adapter
         assert(attribute in self._dictValue)
 
+        if attribute not in self._unsetAttributes and value == self._rawValues[attribute] \
+                and (callable(string) or string == self._dictStr[attribute]):
+            return False
+        
+        self._rawValues[attribute] = value
         self._dictValue[attribute] = round(value, 3)
-        self._dictStr[attribute] = string
+        self._dictStr[attribute] = string(value) if callable(string) else string
+        self._unsetAttributes.discard(attribute)
+
+        self.changedAttributes.add(attribute)
         self.notify()
+        return True
+    
+    # Set many attributes at once, given as attribute -> (value, string or format function).
+    # Observers are notified at most once, and can check changedAttributes to see what changed,
+    # or the changes passed to them if subscribed with coalesce. Returns the attributes that changed
+    def setValues(self, values: dict[Enum, tuple[float, str | Callable[[float], str]]]) -> set[Enum]:
+        changed = set()
+        with self.batch():
+            for attribute, (value, string) in values.items():
+                if self.set(attribute, value, string):
+                    changed.add(attribute)
+        return changed
+
+    # changedAttributes only lists the changes for the notification being sent. When nothing was
+    # set, whatever changed is not known, so coalesced subscriptions are not told what changed
+    def notify(self, id = NotifyType.DEFAULT, changes: set | None = None):
+        if id == NotifyType.DEFAULT and changes is None and len(self.changedAttributes) > 0:
+            changes = self.changedAttributes
+        super().notify(id, changes)
+        if id == NotifyType.DEFAULT and not self.isBatching():
+            self.changedAttributes = set()
     
     def getValue(self, attribute: Enum) -> float:
         if attribute in self._dictValue:
@@ -3,6 +3,7 @@ from command_creation.command_type import CommandType
 from data_structures.observer import NotifyType
 
 from enum import Enum, auto
+from typing import Callable
 
 from entity_base.image.image_state import ImageState
 
@@ -14,8 +15,8 @@ class TurnAdapter(PathAdapter):
 
         self.turnEnabled: bool = None # if set to false, means THETA1 ~= THETA2)
 
-    def set(self, attribute: PathAttributeID, value: float, string: str):
-        super().set(attribute, value, string)
+    def set(self, attribute: PathAttributeID, value: float, string: str | Callable[[float], str]) -> bool:
+        return super().set(attribute, value, string)
 
     def setTurnEnabled(self, turnEnabled: bool):
         isChange = self.turnEnabled != turnEnabled
@@ -0,0 +1,31 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
+from common.frame_scheduler import FrameScheduler
+
+"""
+Runs expensive computations (ie. evenly spaced bezier points) on a worker thread, so that
+the main loop does not freeze while they run. The caller keeps showing an approximation
+and polls the returned Future every tick, swapping in the result on the main thread once
+it is done. The main loop is woken up as soon as a job finishes.
+
+Jobs should only read the arguments they are given, and not touch any entity.
+"""
+
+class BackgroundWorker:
+
+    MAX_WORKERS = 2
+
+    _executor: ThreadPoolExecutor = None
+
+    # Run function(*args) on a worker thread. Call cancel() on the returned Future
+    # if the result is no longer needed
+    @staticmethod
+    def submit(function: Callable, *args) -> Future:
+
+        if BackgroundWorker._executor is None:
+            BackgroundWorker._executor = ThreadPoolExecutor(max_workers = BackgroundWorker.MAX_WORKERS,
+                                                            thread_name_prefix = "BackgroundWorker")
+
+        future = BackgroundWorker._executor.submit(function, *args)
+        future.add_done_callback(lambda future: FrameScheduler.wake())
+        return future
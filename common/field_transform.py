@@ -4,7 +4,6 @@ from utility.math_functions import clamp
 from utility.pygame_functions import scaleSurface
 from data_structures.observer import Observable
 import pygame
-import weakref
 
 
 """This class is used for storing the field transformations (zooming and panning) relative to the screen, as well as
@@ -19,7 +18,14 @@ class FieldTransform(Observable):
 
     def __init__(self, images: ImageManager, dimensions: Dimensions, fieldZoom: float = 1, xyFieldPanInPixels: tuple = (0,0)):
 
-        self.pointsAndVectors: list = weakref.WeakSet()
+        # incremented whenever the pan or zoom changes, so that screen coordinates
+        # computed from this transform can be cached until the version changes
+        self.version = 0
+
+        # field to screen is screen = field * scale + offset. Precomputed whenever the version changes
+        self.scale: float = None
+        self.offsetX: float = None
+        self.offsetY: float = None
 
         self._images = images
         self._dimensions = dimensions
@@ -30,15 +36,20 @@ class FieldTransform(Observable):
 
         self.resizeScreen()
 
+    # Called whenever the pan or zoom changes. Precompute the field to screen affine transform, and
+    # bump the version so that every screen coordinate cached by PointRef/PointArray is recomputed
     def recalculatePointsAndVectors(self):
-        pass
+        dims = self._dimensions
+        self.scale = self.zoom * dims.FIELD_SIZE_IN_PIXELS_NO_MARGIN / dims.FIELD_SIZE_IN_INCHES
+        self.offsetX = dims.FIELD_MARGIN_IN_PIXELS * self.zoom + self._panX
+        self.offsetY = dims.FIELD_MARGIN_IN_PIXELS * self.zoom + self._panY
+        self.version += 1
 
     def resizeScreen(self):
 
         self.zoom = self._dimensions.SMALLER_FIELD_SIDE / self.rawSize
         self.updateScaledSurface()
         self._boundFieldPan()
-        self.recalculatePointsAndVectors()
 
     # Whenever the zoom is changed, this function should be called to scale the raw surface into the scaled one
     def updateScaledSurface(self):
@@ -62,6 +73,7 @@ class FieldTransform(Observable):
         self._panX = clamp(self._panX, minPanX - MARGIN, maxPanX + MARGIN)
         self._panY = clamp(self._panY, minPanY - MARGIN, maxPanY + MARGIN)
 
+        self.recalculatePointsAndVectors()
         self.notify()
 
     # mouse is a PointRef
@@ -77,6 +89,8 @@ class FieldTransform(Observable):
         if self._dimensions.SMALLER_FIELD_SIDE > self.rawSize * self.zoom:
             self.zoom = self._dimensions.SMALLER_FIELD_SIDE / self.rawSize
 
+        # the mouse position in screen reference frame is cached, so it must be recomputed with the new zoom
+        self.recalculatePointsAndVectors()
         newX, newY = mouse.screenRef
 
         # compensate pan for zooming to maintain zoom center at mouse pointer
@@ -85,7 +99,6 @@ class FieldTransform(Observable):
 
         self.updateScaledSurface()
         self._boundFieldPan()
-        self.recalculatePointsAndVectors()
 
     def getPan(self) -> tuple:
         return self._panX, self._panY
@@ -99,7 +112,6 @@ class FieldTransform(Observable):
         self._panY = self.startY + offsetY
 
         self._boundFieldPan()
-        self.recalculatePointsAndVectors()
 
     # Return the zoom multiplied by a scalar. The most common use case is for determining the size of objects, so that
     # objects grow when zooming in, but at a slower rate than the zoom (when 0 < scalar < 1)
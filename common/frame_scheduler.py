@@ -0,0 +1,71 @@
+import pygame
+
+"""
+Decides how long the main loop should wait before the next frame. When nothing is animating,
+being dragged, or receiving input, the loop blocks on the event queue instead of spinning at a
+fixed frame rate, so an idle window uses almost no CPU.
+
+Anything that needs to keep updating on its own (motion profiles, blinking cursors) calls
+FrameScheduler.requestFrame() during a frame to keep the next frame running at full rate.
+"""
+
+class FrameScheduler:
+
+    ACTIVE_FPS = 60 # while animating or dragging
+    UNFOCUSED_FPS = 10 # cap when the window does not have focus
+
+    IDLE_TIMEOUT_MS = 500 # longest blocking wait while focused and idle
+    UNFOCUSED_TIMEOUT_MS = 2000 # longest blocking wait while unfocused and idle
+
+    # set by anything that requested another frame since the last wait
+    _frameRequested: bool = False
+
+    # Keep the main loop running at full rate for at least one more frame
+    @staticmethod
+    def requestFrame():
+        FrameScheduler._frameRequested = True
+
+    # Wake a blocked main loop from another thread, ie. the stdin I/O thread
+    @staticmethod
+    def wake():
+        pygame.event.post(pygame.event.Event(pygame.USEREVENT))
+
+    def __init__(self):
+        self.clock = pygame.time.Clock()
+        self.focused: bool = True
+
+    def _isActive(self, busy: bool) -> bool:
+        return busy or FrameScheduler._frameRequested
+
+    # Update focus state from window events. Handling any event may change what is on screen
+    # (ie. what is hovered after a click), so run at least one more frame at full rate
+    def onEvent(self, event: pygame.event.Event):
+
+        FrameScheduler.requestFrame()
+
+        if event.type == pygame.WINDOWFOCUSLOST:
+            self.focused = False
+        elif event.type == pygame.WINDOWFOCUSGAINED:
+            self.focused = True
+
+    # Wait until the next frame is due and return the events to handle for it.
+    # busy should be true while the user is dragging something
+    def waitForEvents(self, busy: bool) -> list[pygame.event.Event]:
+
+        active = self._isActive(busy)
+        FrameScheduler._frameRequested = False
+
+        if active:
+            # something is moving on its own, so keep a steady frame rate
+            self.clock.tick(self.ACTIVE_FPS if self.focused else self.UNFOCUSED_FPS)
+            return pygame.event.get()
+
+        # nothing to do until there is input, so block on the event queue. The timeout
+        # bounds the wait in case some state changes without posting an event
+        timeout = self.IDLE_TIMEOUT_MS if self.focused else self.UNFOCUSED_TIMEOUT_MS
+        first = pygame.event.wait(timeout)
+        self.clock.tick()
+
+        if first.type == pygame.NOEVENT:
+            return pygame.event.get()
+        return [first] + pygame.event.get()
@@ -1,6 +1,7 @@
 from common.field_transform import FieldTransform
 from common.dimensions import Dimensions
 import math, utility.math_functions as math_functions
+import numpy as np
 from enum import Enum
 
 transform: FieldTransform = None
@@ -31,54 +32,67 @@ class Ref(Enum):
 
 class PointRef:
 
+    # a value type: no per-instance __dict__, so that creating the many short-lived points
+    # while dragging is as cheap as possible
+    __slots__ = ("transform", "_xf", "_yf", "_screen", "_screenVersion")
+
     def __init__(self, referenceMode: Ref = None, point: tuple = (0,0)):
 
         self.transform = transform
         self._xf, self._yf = None, None
+
+        # the screen reference frame point, valid as long as the field transform version is the same
+        self._screen: tuple = None
+        self._screenVersion = None
+
         if referenceMode == Ref.SCREEN:
             self.screenRef = point
         else:
             self.fieldRef = point
 
+    # Create a point directly from field coordinates, skipping the reference mode checks and tuple
+    # unpacking in __init__. Used by the arithmetic operators
+    @staticmethod
+    def _fromField(xf: float, yf: float) -> 'PointRef':
+        point = object.__new__(PointRef)
+        point.transform = transform
+        point._xf = xf
+        point._yf = yf
+        point._screen = None
+        point._screenVersion = None
+        return point
 
     # Given we only store the point in the field reference frame, convert to field reference frame before storing it
     def _screenToField(self, pointS: tuple) -> None:
 
-        # undo the panning and zooming
-        panX, panY = self.transform.getPan()
-        normalizedScreenX = (pointS[0] - panX) / self.transform.zoom
-        normalizedScreenY = (pointS[1] - panY) / self.transform.zoom
-
-        # convert to field reference frame
-        xf = (normalizedScreenX - dimensions.FIELD_MARGIN_IN_PIXELS) / dimensions.FIELD_SIZE_IN_PIXELS_NO_MARGIN * dimensions.FIELD_SIZE_IN_INCHES
-        yf = (normalizedScreenY - dimensions.FIELD_MARGIN_IN_PIXELS) / dimensions.FIELD_SIZE_IN_PIXELS_NO_MARGIN * dimensions.FIELD_SIZE_IN_INCHES
-
-        return xf, yf
+        # undo the panning, zooming and margin in one step with the inverse of the precomputed affine transform
+        transform = self.transform
+        return (pointS[0] - transform.offsetX) / transform.scale, (pointS[1] - transform.offsetY) / transform.scale
 
     # Given we only store the point in the field reference frame, we need to convert it to return as screen reference frame
+    # Uses the affine transform precomputed by the field transform, which includes the margin, zoom, and pan
     def _fieldToScreen(self, pointF: tuple) -> tuple:
-        # convert to normalized (pre-zoom and pre-panning) coordinates
-        normalizedScreenX = pointF[0] / dimensions.FIELD_SIZE_IN_INCHES * dimensions.FIELD_SIZE_IN_PIXELS_NO_MARGIN + dimensions.FIELD_MARGIN_IN_PIXELS
-        normalizedScreenY = pointF[1] / dimensions.FIELD_SIZE_IN_INCHES * dimensions.FIELD_SIZE_IN_PIXELS_NO_MARGIN + dimensions.FIELD_MARGIN_IN_PIXELS
-
-        # convert to screen reference frame
-        panX, panY = self.transform.getPan()
-        xs = normalizedScreenX * self.transform.zoom + panX
-        ys = normalizedScreenY * self.transform.zoom + panY
-
-        return xs, ys
+        transform = self.transform
+        return pointF[0] * transform.scale + transform.offsetX, pointF[1] * transform.scale + transform.offsetY
     
+    # Only recompute the screen point if the field transform changed since it was last computed.
+    # Setting the point resets the version, so the cache is also keyed on the point itself
     def _getScreenRef(self) -> tuple:
-        return self._fieldToScreen(self.fieldRef)
+        if self._screenVersion != self.transform.version:
+            self._screen = self._fieldToScreen(self.fieldRef)
+            self._screenVersion = self.transform.version
+        return self._screen
 
     def _setScreenRef(self, pointS: tuple) -> None:
         self._xf, self._yf = self._screenToField(pointS)
+        self._screenVersion = None
 
     # getter and setter for point in screen reference frame
     screenRef = property(_getScreenRef, _setScreenRef)
     
     def _setFieldRef(self, pointF: tuple) -> None:
         self._xf, self._yf = pointF
+        self._screenVersion = None
         
     def _getFieldRef(self) -> tuple:
         return self._xf, self._yf
@@ -92,30 +106,87 @@ class PointRef:
 
     # PointRef + VectorRef = PointRef
     def __add__(self, other: 'VectorRef') -> 'PointRef':
-        return PointRef(Ref.FIELD, math_functions.addTuples(self.fieldRef, other.fieldRef))
+        return PointRef._fromField(self._xf + other._vxf, self._yf + other._vyf)
 
     # PointRef - VectorRef = PointRef
     # PointRef - PointRef = VectorRef
     def __sub__(self, other):
-        if type(other) == PointRef:
-            return VectorRef(Ref.FIELD, math_functions.subtractTuples(self.fieldRef, other.fieldRef))
+        if isinstance(other, PointRef):
+            return VectorRef._fromField(self._xf - other._xf, self._yf - other._yf)
         else: # other is of type VectorRef
-            return PointRef(Ref.FIELD, math_functions.subtractTuples(self.fieldRef, other.fieldRef))
+            return PointRef._fromField(self._xf - other._vxf, self._yf - other._vyf)
+
+    # In-place PointRef + VectorRef. Modifies and returns this object instead of creating a new one.
+    # Deliberately not __iadd__, as "position += delta" is relied on to not modify shared positions
+    def addInPlace(self, other: 'VectorRef') -> 'PointRef':
+        self._xf += other._vxf
+        self._yf += other._vyf
+        self._screenVersion = None
+        return self
+
+    # In-place PointRef - VectorRef. Modifies and returns this object instead of creating a new one
+    def subtractInPlace(self, other: 'VectorRef') -> 'PointRef':
+        self._xf -= other._vxf
+        self._yf -= other._vyf
+        self._screenVersion = None
+        return self
 
     def __eq__(self, other):
 
-        if not type(other) == PointRef:
+        if not isinstance(other, PointRef):
             return False
 
         return self._xf == other._xf and self._yf == other._yf
 
     # Create a deep copy of the object and return the copy
     def copy(self) -> 'PointRef':
-        return PointRef(Ref.FIELD, self.fieldRef)
+        return PointRef._fromField(self._xf, self._yf)
+    
+    # Create an immutable, hashable copy of the object, ie. to use as a dictionary key
+    def freeze(self) -> 'FrozenPointRef':
+        return FrozenPointRef(Ref.FIELD, self.fieldRef)
 
     def __str__(self):
         return "Point object:\nScreen: ({},{})\nField: ({},{})".format(*self.screenRef, *self.fieldRef)
 
+"""
+An immutable PointRef. Since its value never changes, it can be hashed and used in sets or as a dictionary key.
+Arithmetic still works, and returns regular (mutable) PointRef and VectorRef objects
+"""
+class FrozenPointRef(PointRef):
+
+    __slots__ = ()
+
+    def __init__(self, referenceMode: Ref = None, point: tuple = (0,0)):
+
+        object.__setattr__(self, "transform", transform)
+        if referenceMode == Ref.SCREEN:
+            point = self._screenToField(point)
+
+        object.__setattr__(self, "_screen", None)
+        object.__setattr__(self, "_screenVersion", None)
+        object.__setattr__(self, "_xf", point[0])
+        object.__setattr__(self, "_yf", point[1])
+
+    # the screen point is cached, so that is the only attribute that may still change
+    def __setattr__(self, name, value):
+        if name not in ("_screen", "_screenVersion"):
+            raise AttributeError("FrozenPointRef is immutable")
+        object.__setattr__(self, name, value)
+
+    def addInPlace(self, other: 'VectorRef'):
+        raise AttributeError("FrozenPointRef is immutable")
+
+    def subtractInPlace(self, other: 'VectorRef'):
+        raise AttributeError("FrozenPointRef is immutable")
+
+    def __hash__(self):
+        return hash((self._xf, self._yf))
+
+    # already immutable
+    def freeze(self) -> 'FrozenPointRef':
+        return self
+
 """A class that stores a translation vector in both field and reference frames.
 PointRef + VectorRef = PointRef
 PointRef - VectorRef = PointRef
@@ -125,6 +196,8 @@ VectorRef - VectorRef = VectorRef
 """
 class VectorRef:
 
+    __slots__ = ("transform", "_vxf", "_vyf")
+
     def __init__(self, referenceMode: Ref, vector: tuple = (0,0), magnitude: float = None, heading: float = None):
 
         self.transform: FieldTransform = transform
@@ -139,9 +212,14 @@ class VectorRef:
         else:
             self.fieldRef = vector
 
-    # recalculate screenRef from pointRef
-    def recalculate(self):
-        self._xs, self._ys = self._fieldToScreen(self.fieldRef)
+    # Create a vector directly from field coordinates. Used by the arithmetic operators
+    @staticmethod
+    def _fromField(vxf: float, vyf: float) -> 'VectorRef':
+        vector = object.__new__(VectorRef)
+        vector.transform = transform
+        vector._vxf = vxf
+        vector._vyf = vyf
+        return vector
 
     def _setFieldRef(self, vector: tuple):
         self._vxf, self._vyf = vector
@@ -159,14 +237,14 @@ class VectorRef:
 
     # Given we only store the point in the field reference frame, we need to convert it to return as screen reference frame
     def _getScreenRef(self):
-        scalar = self.transform.zoom * dimensions.FIELD_SIZE_IN_PIXELS_NO_MARGIN / dimensions.FIELD_SIZE_IN_INCHES
+        scalar = self.transform.scale
         return self._vxf * scalar, self._vyf * scalar
 
     screenRef = property(_getScreenRef, _setScreenRef)
 
     # Return the magnitude of the vector based on the given reference frame
     def magnitude(self, referenceFrame: Ref) -> float:
-        refMag = math_functions.distance(0, 0, *self.fieldRef)
+        refMag = math.sqrt(self._vxf * self._vxf + self._vyf * self._vyf)
         if referenceFrame == Ref.FIELD:
             return refMag
         else:
@@ -182,31 +260,168 @@ class VectorRef:
         mag = self.magnitude(Ref.FIELD)
         angle = self.theta()
         angle += theta
-        return VectorRef(Ref.FIELD, (mag * math.cos(angle), mag * math.sin(angle)))
+        return VectorRef._fromField(mag * math.cos(angle), mag * math.sin(angle))
 
     # Does not modify the current object but creates a new object with a magnitude of 1
     def normalize(self) -> 'VectorRef':
         mag = self.magnitude(Ref.FIELD)
-        return VectorRef(Ref.FIELD, math_functions.divideTuple(self.fieldRef, mag))
+        return VectorRef._fromField(self._vxf / mag, self._vyf / mag)
 
     # Vector addition. Does not modify but returns new VectorRef
     def __add__(self, other: 'VectorRef') -> 'VectorRef':
-        return VectorRef(Ref.FIELD, math_functions.addTuples(self.fieldRef, other.fieldRef))
+        return VectorRef._fromField(self._vxf + other._vxf, self._vyf + other._vyf)
 
     # Vector subtraction. Does not modify but returns new VectorRef
     def __sub__(self, other: 'VectorRef') -> 'VectorRef':
-        return VectorRef(Ref.FIELD, math_functions.subtractTuples(self.fieldRef, other.fieldRef))
+        return VectorRef._fromField(self._vxf - other._vxf, self._vyf - other._vyf)
 
     # Scales vector by some scalar. Does not modify but returns new VectorRef
     def __mul__(self, scalar: float) -> 'VectorRef':
-        return VectorRef(Ref.FIELD, math_functions.scaleTuple(self.fieldRef, scalar))
+        return VectorRef._fromField(self._vxf * scalar, self._vyf * scalar)
     
     # Divides vector by some scalar. Does not modify but returns new VectorRef
     def __truediv__(self, scalar: float) -> 'VectorRef':
-        return VectorRef(Ref.FIELD, math_functions.divideTuple(self.fieldRef, scalar))
+        return VectorRef._fromField(self._vxf / scalar, self._vyf / scalar)
+    
+    # In-place vector addition. Modifies and returns this object instead of creating a new one
+    def addInPlace(self, other: 'VectorRef') -> 'VectorRef':
+        self._vxf += other._vxf
+        self._vyf += other._vyf
+        return self
+
+    # In-place vector subtraction. Modifies and returns this object instead of creating a new one
+    def subtractInPlace(self, other: 'VectorRef') -> 'VectorRef':
+        self._vxf -= other._vxf
+        self._vyf -= other._vyf
+        return self
+
+    # In-place scaling. Modifies and returns this object instead of creating a new one
+    def scaleInPlace(self, scalar: float) -> 'VectorRef':
+        self._vxf *= scalar
+        self._vyf *= scalar
+        return self
+
+    # Create an immutable, hashable copy of the object
+    def freeze(self) -> 'FrozenVectorRef':
+        return FrozenVectorRef(Ref.FIELD, self.fieldRef)
+
+"""
+An immutable, hashable VectorRef. Arithmetic returns regular (mutable) VectorRef objects
+"""
+class FrozenVectorRef(VectorRef):
+
+    __slots__ = ()
+
+    def __init__(self, referenceMode: Ref, vector: tuple = (0,0), magnitude: float = None, heading: float = None):
+        
+        # compute the value with a regular VectorRef, then copy it over
+        value = VectorRef(referenceMode, vector, magnitude, heading)
+        object.__setattr__(self, "transform", transform)
+        object.__setattr__(self, "_vxf", value._vxf)
+        object.__setattr__(self, "_vyf", value._vyf)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FrozenVectorRef is immutable")
+
+    def addInPlace(self, other: 'VectorRef'):
+        raise AttributeError("FrozenVectorRef is immutable")
+
+    def subtractInPlace(self, other: 'VectorRef'):
+        raise AttributeError("FrozenVectorRef is immutable")
+
+    def scaleInPlace(self, scalar: float):
+        raise AttributeError("FrozenVectorRef is immutable")
+
+    # compared by value, unlike regular VectorRefs
+    def __eq__(self, other):
+
+        if not isinstance(other, VectorRef):
+            return False
+
+        return self._vxf == other._vxf and self._vyf == other._vyf
+
+    def __hash__(self):
+        return hash((self._vxf, self._vyf))
+
+    # already immutable
+    def freeze(self) -> 'FrozenVectorRef':
+        return self
+
+"""
+A list of points stored as a single (N,2) float64 array in the field reference frame. Used instead of
+a list of PointRefs for large numbers of points (ie. the sampled points of a bezier curve), so that
+converting to the screen reference frame is a single vectorized affine transform instead of one
+conversion per point.
+
+The screen reference frame array is cached until either the points or the field transform change:
+    points = PointArray(Ref.FIELD, [(0,0), (10,10), (20,0)])
+    points.screenRef # computed
+    points.screenRef # cached, as long as the transform version has not changed
+"""
+class PointArray:
+
+    def __init__(self, referenceMode: Ref = None, points = ()):
+
+        self.transform = transform
+        self._screenVersion = None
+        self._screen: np.ndarray = None
+
+        if referenceMode == Ref.SCREEN:
+            self.screenRef = points
+        else:
+            self.fieldRef = points
+
+    # Vectorized PointRef._fieldToScreen()
+    def _fieldToScreen(self, pointsF: np.ndarray) -> np.ndarray:
+        transform = self.transform
+        return pointsF * transform.scale + np.array((transform.offsetX, transform.offsetY))
+
+    # Vectorized PointRef._screenToField()
+    def _screenToField(self, pointsS: np.ndarray) -> np.ndarray:
+        transform = self.transform
+        return (pointsS - np.array((transform.offsetX, transform.offsetY))) / transform.scale
+
+    def _setFieldRef(self, pointsF) -> None:
+        self._field = np.asarray(pointsF, dtype = np.float64).reshape(-1, 2)
+        self._screenVersion = None
+
+    def _getFieldRef(self) -> np.ndarray:
+        return self._field
+
+    # getter and setter for the (N,2) array of points in field reference frame
+    fieldRef = property(_getFieldRef, _setFieldRef)
+
+    def _setScreenRef(self, pointsS) -> None:
+        self.fieldRef = self._screenToField(np.asarray(pointsS, dtype = np.float64).reshape(-1, 2))
+
+    # Only recompute the screen points if the field transform changed since they were last computed
+    def _getScreenRef(self) -> np.ndarray:
+        if self._screenVersion != self.transform.version:
+            self._screen = self._fieldToScreen(self._field)
+            self._screenVersion = self.transform.version
+        return self._screen
+
+    # getter and setter for the (N,2) array of points in screen reference frame
+    screenRef = property(_getScreenRef, _setScreenRef)
+
+    # Return the array of points with specified reference frame
+    def get(self, referenceMode: Ref) -> np.ndarray:
+        return self.fieldRef if referenceMode == Ref.FIELD else self.screenRef
+
+    def __len__(self) -> int:
+        return len(self._field)
+
+    # A single point as a PointRef
+    def __getitem__(self, index: int) -> PointRef:
+        return PointRef(Ref.FIELD, tuple(self._field[index].tolist()))
+
+    def copy(self) -> 'PointArray':
+        return PointArray(Ref.FIELD, self._field.copy())
 
 class ScalarRef:
 
+    __slots__ = ("transform", "fieldRef")
+
     def __init__(self, referenceMode: Ref, value: float):
         self.transform: FieldTransform = transform
         self.fieldRef = value
@@ -219,17 +434,6 @@ class ScalarRef:
 
     # Given we only store the point in the field reference frame, we need to convert it to return as screen reference frame
     def _getScreenRef(self):
-        scalar = self.transform.zoom * dimensions.FIELD_SIZE_IN_PIXELS_NO_MARGIN / dimensions.FIELD_SIZE_IN_INCHES
-        return self.fieldRef * scalar
-
-    screenRef = property(_getScreenRef, _getScreenRef)
+        return self.fieldRef * self.transform.scale
 
-
-# Testing code
-if __name__ == "__main__":
-    f = FieldTransform(2, (0,0))
-    p = PointRef(f, Ref.FIELD, (10,10))
-    p.screenRef = (0,0)
-    print(p)
-    p.fieldRef = (0,0)
-    print(p)
\ No newline at end of file
+    screenRef = property(_getScreenRef, _setScreenRef)
@@ -0,0 +1,52 @@
+"""
+Fenwick tree (binary indexed tree) over a list of numbers. Changing a single value and
+getting the sum of all values before an index are both O(log n), so the position of
+an item in a long list of variable-sized items can be kept up to date without walking
+the whole list every time one item changes size.
+"""
+
+class FenwickTree:
+
+    def __init__(self, values: list[float] = None):
+        self.build(values or [])
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    # Replace all values. O(n)
+    def build(self, values: list[float]):
+        self.values = list(values)
+        self.tree = [0] + self.values
+
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+        self.total = sum(self.values)
+
+    def get(self, index: int) -> float:
+        return self.values[index]
+
+    # Set the value at index. O(log n)
+    def set(self, index: int, value: float):
+        delta = value - self.values[index]
+        if delta == 0:
+            return
+
+        self.values[index] = value
+        self.total += delta
+
+        i = index + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    # Sum of all values before index. O(log n)
+    def prefixSum(self, index: int) -> float:
+        result = 0
+        i = index
+        while i > 0:
+            result += self.tree[i]
+            i -= i & -i
+        return result
@@ -1,6 +1,34 @@
-from typing import TypeVar, Generic
+from typing import Iterator, TypeVar, Generic
 from entity_base.entity import Entity
 
+"""
+A doubly linked list that also keeps an order label for every node, so that membership and
+"is A before B" queries are O(1) instead of walking the list.
+
+Labels are integers that increase along the list. A new node gets a label between its
+neighbors, and when there is no room left between them, the smallest surrounding range of
+labels that is sparse enough is relabeled evenly (the order maintenance scheme from Bender
+et al., "Two Simplified Algorithms for Maintaining Order in a List"). This is O(log n)
+amortized per insertion.
+
+Iteration uses a generator that reads the next node before yielding the current one, so
+nested loops over the same list are safe, and so is removing the current node while iterating.
+
+Removing a node does not clear its own next/prev pointers, so callers can still find
+where it was right after removing it.
+"""
+
+# labels are in [0, 2^LABEL_BITS)
+LABEL_BITS = 62
+LABEL_LIMIT = 1 << LABEL_BITS
+
+# the space left between a new node at either end of the list and its neighbor, so that
+# building a list from one end does not need relabeling
+LABEL_SPACING = 1 << 32
+
+# a range of 2^i labels is sparse enough to relabel if it holds less than 2^i / DENSITY^i nodes
+DENSITY = 1.5
+
 T = TypeVar('T')
 class LinkedListNode(Generic[T]):
     def __init__(self):
@@ -9,7 +37,7 @@ class LinkedListNode(Generic[T]):
 
     def getPrevious(self) -> T | 'LinkedListNode':
         return self._prev
-    
+
     def getNext(self) -> T | 'LinkedListNode':
         return self._next
 
@@ -19,37 +47,104 @@ class LinkedList(Generic[T]):
         self.head: LinkedListNode | T = None
         self.tail: LinkedListNode | T = None
 
-    def __iter__(self):
-        self.iteratorPointer = self.head
-        return self
-    
-    def __next__(self):
-        if self.iteratorPointer is None:
-            raise StopIteration
+        # incremented whenever nodes are added or removed, so that users can tell
+        # whether anything cached about the order of the list is still valid
+        self.version = 0
+
+        # order label of every node in the list. Also answers membership
+        self._labels: dict[LinkedListNode | T, int] = {}
+
+        # index of every node, rebuilt on demand when the version changes
+        self._indices: dict[LinkedListNode | T, int] = {}
+        self._indicesVersion: int = None
+
+    def __iter__(self) -> Iterator[T]:
+        current = self.head
+        while current is not None:
+            following = current._next
+            yield current
+            current = following
+
+    def __len__(self) -> int:
+        return len(self._labels)
+
+    def __contains__(self, node: LinkedListNode) -> bool:
+        return node in self._labels
+
+    # Give newNode a label between its neighbors, which are already linked to it
+    def _label(self, newNode: LinkedListNode):
+        before = -1 if newNode._prev is None else self._labels[newNode._prev]
+        after = LABEL_LIMIT if newNode._next is None else self._labels[newNode._next]
+        gap = after - before
+
+        if gap >= 2 and newNode._prev is None:
+            self._labels[newNode] = after - min(gap // 2, LABEL_SPACING)
+        elif gap >= 2:
+            self._labels[newNode] = before + min(gap // 2, LABEL_SPACING)
         else:
-            current = self.iteratorPointer
-            self.iteratorPointer = self.iteratorPointer._next
-            return current
+            # no room. Share the label of the node before for now, and spread out the labels around it
+            self._labels[newNode] = max(before, 0)
+            self._relabelAround(newNode)
+
+    # Find the smallest aligned range of labels around the node that is sparse enough, and
+    # spread out the labels of the nodes in it evenly
+    def _relabelAround(self, node: LinkedListNode):
+        label = self._labels[node]
+        first = last = node
+        count = 1
+
+        for i in range(1, LABEL_BITS + 1):
+            size = 1 << i
+            low = label & ~(size - 1)
+            high = low + size
+
+            while first._prev is not None and self._labels[first._prev] >= low:
+                first = first._prev
+                count += 1
+            while last._next is not None and self._labels[last._next] < high:
+                last = last._next
+                count += 1
+
+            if count < size / DENSITY ** i:
+                spacing = size // count
+                current = first
+                for k in range(count):
+                    self._labels[current] = low + k * spacing
+                    current = current._next
+                return
+
+        # the list is too large to spread out. Never happens with fewer than ~10^7 nodes
+        raise OverflowError("LinkedList has too many nodes to label")
 
     def addToBeginning(self, node: LinkedListNode):
-        
+        self.version += 1
+
         if self.head is None:
+            node._next = None
+            node._prev = None
             self.head = node
             self.tail = node
         else:
             node._next = self.head
+            node._prev = None
             self.head._prev = node
             self.head = node
+        self._label(node)
 
     def addToEnd(self, node: LinkedListNode):
+        self.version += 1
 
         if self.head is None:
+            node._next = None
+            node._prev = None
             self.head = node
             self.tail = node
         else:
             self.tail._next = node
             node._prev = self.tail
+            node._next = None
             self.tail = node
+        self._label(node)
 
     def insertBeforeEnd(self, node: LinkedListNode):
         self.insertBefore(self.tail, node)
@@ -61,26 +156,34 @@ class LinkedList(Generic[T]):
         if self.head is node:
             self.addToBeginning(newNode)
             return
-                
+
+        assert(self.contains(node))
+
+        self.version += 1
         newNode._prev = node._prev
         node._prev._next = newNode
         newNode._next = node
         node._prev = newNode
+        self._label(newNode)
 
     def insertAfter(self, node: LinkedListNode, newNode: LinkedListNode):
 
         if self.tail is node or node is None:
             self.addToEnd(newNode)
             return
-        
+
         assert(self.contains(node))
 
+        self.version += 1
         newNode._next = node._next
         node._next._prev = newNode
         node._next = newNode
         newNode._prev = node
+        self._label(newNode)
 
     def remove(self, node: LinkedListNode):
+        self.version += 1
+        self._labels.pop(node, None)
 
         if self.head is self.tail:
             self.head = None
@@ -95,13 +198,20 @@ class LinkedList(Generic[T]):
             node._prev._next = node._next
             node._next._prev = node._prev
 
-    def contains(self, node: LinkedListNode):
-        current = self.head
-        while current is not None:
-            if current is node:
-                return True
-            current = current.getNext()
-        return False
+    # O(1)
+    def contains(self, node: LinkedListNode) -> bool:
+        return node in self._labels
+
+    # Whether a comes before b in the list. Both must be in the list. O(1)
+    def isBefore(self, a: LinkedListNode, b: LinkedListNode) -> bool:
+        return self._labels[a] < self._labels[b]
+
+    # Index of the node in the list. O(n) the first time after the list changes, and O(1) after that
+    def indexOf(self, node: LinkedListNode) -> int:
+        if self._indicesVersion != self.version:
+            self._indices = {current: i for i, current in enumerate(self)}
+            self._indicesVersion = self.version
+        return self._indices[node]
 
     def printList(self):
 
@@ -113,4 +223,4 @@ class LinkedList(Generic[T]):
             print(current)
             current = current._next
 
-        print()
\ No newline at end of file
+        print()
@@ -1,4 +1,5 @@
 from typing import Callable
+from contextlib import contextmanager
 from enum import Enum, auto
 
 # observer design pattern
@@ -31,15 +32,63 @@ class Observer:
 
 class _ObserverState:
 
-    def __init__(self, observer: Observer, id = NotifyType.DEFAULT, onNotify: Callable = lambda : None):
+    def __init__(self, observer: Observer, id = NotifyType.DEFAULT, onNotify: Callable = lambda : None, coalesce: bool = False):
         self.observer = observer
         self.id = id
         self.onNotify = onNotify
+        self.coalesce = coalesce
 
+"""
+Notifications for subscriptions made with coalesce = True are not sent right away, but queued
+until NotificationQueue.flush(), which EntityManager calls every tick. However many times the
+observable notifies before then, the observer is notified once.
+
+By then the observable no longer knows what each notification was about, so if it notifies with
+a set of changes, the changes are collected and passed to onNotify(changes) when flushed. If any
+of the notifications did not say what changed, onNotify() is called with no arguments.
+"""
+class NotificationQueue:
+
+    # subscriptions waiting to be notified, in the order they were first notified,
+    # and everything that changed since, or None if not known
+    _pending: dict[_ObserverState, set | None] = {}
+
+    @staticmethod
+    def defer(state: _ObserverState, changes: set | None = None):
+        pending = NotificationQueue._pending
+        if state not in pending:
+            pending[state] = None if changes is None else set(changes)
+        elif changes is None:
+            pending[state] = None
+        elif pending[state] is not None:
+            pending[state] |= changes
+
+    @staticmethod
+    def discard(state: _ObserverState):
+        NotificationQueue._pending.pop(state, None)
+
+    # Notify every queued subscription. Notifications queued while flushing are sent as well
+    @staticmethod
+    def flush():
+        while len(NotificationQueue._pending) > 0:
+            pending = NotificationQueue._pending
+            NotificationQueue._pending = {}
+            for state, changes in pending.items():
+                if changes is None:
+                    state.onNotify()
+                else:
+                    state.onNotify(changes)
+
+"""
+Subscriptions are stored by NotifyType, so notifying only visits the observers for that type.
+Inside "with observable.batch():", notifications are held back and each type that was notified
+is sent once when the outermost batch ends.
+"""
 class Observable:
 
-    # object should pass its own reference to subscribe() as a first argument
-    def subscribe(self, yourself: Observer, id = NotifyType.DEFAULT, onNotify: Callable = lambda : None):
+    # object should pass its own reference to subscribe() as a first argument.
+    # If coalesce is true, onNotify is called at most once per tick, see NotificationQueue
+    def subscribe(self, yourself: Observer, id = NotifyType.DEFAULT, onNotify: Callable = lambda : None, coalesce: bool = False):
 
         if not isinstance(yourself, Observer):
             raise Exception("you must pass a reference to yourself as the first argument")
@@ -53,23 +102,56 @@ class Observable:
         yourself.onSubscribe(self)
         
         if "observers" not in self.__dict__:
-            self.observers: list[_ObserverState] = []
-        self.observers.append(_ObserverState(yourself, id, onNotify))
+            self.observers: dict[NotifyType, list[_ObserverState]] = {}
+        self.observers.setdefault(id, []).append(_ObserverState(yourself, id, onNotify, coalesce))
         return True
     
     def unsubscribe(self, observer: Observer):
         if "observers" not in self.__dict__:
             return
         
-        i = 0
-        while i < len(self.observers):
-            if self.observers[i].observer is observer:
-                del self.observers[i]
-            else:
-                i += 1
-
-    def notify(self, id = NotifyType.DEFAULT):
-        if "observers" in self.__dict__:
-            for observer in self.observers:
-                if id == observer.id:
-                    observer.onNotify()
\ No newline at end of file
+        for id in self.observers:
+            states = self.observers[id]
+            for state in states:
+                if state.observer is observer:
+                    NotificationQueue.discard(state)
+            self.observers[id] = [state for state in states if state.observer is not observer]
+
+    # changes optionally describes what changed, for coalesced subscriptions. See NotificationQueue
+    def notify(self, id = NotifyType.DEFAULT, changes: set | None = None):
+
+        if self.isBatching():
+            self.batchPending[id] = None
+            return
+
+        if "observers" in self.__dict__ and id in self.observers:
+            # copied, since observers may unsubscribe while being notified
+            for observer in list(self.observers[id]):
+                if observer.coalesce:
+                    NotificationQueue.defer(observer, changes)
+                else:
+                    observer.onNotify()
+
+    def isBatching(self) -> bool:
+        return self.__dict__.get("batchDepth", 0) > 0
+
+    # Hold back notifications until the end of the with block, then notify once per NotifyType.
+    # Batches can be nested
+    @contextmanager
+    def batch(self):
+
+        if self.__dict__.get("batchDepth", 0) == 0:
+            self.batchDepth = 0
+            self.batchPending: dict[NotifyType, None] = {}
+
+        self.batchDepth += 1
+        try:
+            yield self
+        finally:
+            self.batchDepth -= 1
+
+        if self.batchDepth == 0:
+            pending = self.batchPending
+            self.batchPending = {}
+            for id in pending:
+                self.notify(id)
@@ -0,0 +1,86 @@
+from typing import TypeVar, Generic
+import math
+
+"""
+Uniform grid over screen space. Each item is stored in every cell its bounding
+rect overlaps, so a point query only needs to look at a single cell instead
+of every item. Items without a known bounding rect are stored separately and
+are always returned as candidates.
+Rects are [x, y, width, height], same as Entity.RECT. Edges are inclusive.
+"""
+
+T = TypeVar('T')
+class SpatialGrid(Generic[T]):
+
+    def __init__(self, cellSize: int = 64):
+        self.cellSize = cellSize
+
+        self.cells: dict[tuple[int, int], set[T]] = {}
+        self.unbounded: set[T] = set()
+
+        # item -> (rect, cells the item is stored in)
+        self.items: dict[T, tuple[tuple, list[tuple[int, int]]]] = {}
+
+    def __contains__(self, item: T) -> bool:
+        return item in self.items or item in self.unbounded
+
+    def __len__(self) -> int:
+        return len(self.items) + len(self.unbounded)
+
+    # get the range of cells spanned by the rect, inclusive of the far edges
+    def _getCells(self, rect: tuple) -> list[tuple[int, int]]:
+        x, y, width, height = rect
+        x1, x2 = min(x, x + width), max(x, x + width)
+        y1, y2 = min(y, y + height), max(y, y + height)
+
+        cx1, cx2 = math.floor(x1 / self.cellSize), math.floor(x2 / self.cellSize)
+        cy1, cy2 = math.floor(y1 / self.cellSize), math.floor(y2 / self.cellSize)
+
+        return [(cx, cy) for cx in range(cx1, cx2 + 1) for cy in range(cy1, cy2 + 1)]
+
+    # Insert or move an item. Pass rect = None if the item has no bounding rect,
+    # in which case it is a candidate for every query
+    def update(self, item: T, rect: tuple | None):
+
+        if rect is None:
+            self.remove(item)
+            self.unbounded.add(item)
+            return
+
+        rect = tuple(rect)
+
+        # no need to touch any cells if the rect has not changed
+        if item in self.items and self.items[item][0] == rect:
+            return
+
+        self.remove(item)
+
+        cells = self._getCells(rect)
+        for cell in cells:
+            if cell not in self.cells:
+                self.cells[cell] = set()
+            self.cells[cell].add(item)
+
+        self.items[item] = (rect, cells)
+
+    def remove(self, item: T):
+
+        self.unbounded.discard(item)
+
+        if item not in self.items:
+            return
+
+        rect, cells = self.items.pop(item)
+        for cell in cells:
+            bucket = self.cells[cell]
+            bucket.discard(item)
+            if len(bucket) == 0:
+                del self.cells[cell]
+
+    # Return all items that may contain the point. It is up to the caller to do exact tests
+    def query(self, point: tuple) -> set[T]:
+        cell = (math.floor(point[0] / self.cellSize), math.floor(point[1] / self.cellSize))
+
+        if cell in self.cells:
+            return self.cells[cell] | self.unbounded
+        return set(self.unbounded)
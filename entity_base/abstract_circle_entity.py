@@ -5,6 +5,9 @@ import pygame
 
 class AbstractCircleEntity(Entity):
 
+    # how far outside the circle the mouse still counts as touching
+    TOUCH_MARGIN = 4
+
     # NO CONSTRUCTOR. FOR SUBCLASSES, WORKAROUND IS TO CALL ENTITY CONSTRUCTOR DIRECTLY
     # PYTHON IS CURSED
 
@@ -32,8 +35,16 @@ class AbstractCircleEntity(Entity):
         return hitbox
 
     def isTouching(self, position: tuple) -> bool:
-        MARGIN = 4
-        return self.distanceTo(position) <= self._radius() + MARGIN
+        return self.distanceTo(position) <= self._radius() + self.TOUCH_MARGIN
+    
+    # square around the circle, including the touch margin. Use the larger of the
+    # hovered and unhovered radius so the bound holds either way
+    def getTouchBounds(self) -> list:
+        r = max(self._radius(), self._radius(True)) + self.TOUCH_MARGIN
+        return [self.CENTER_X - r, self.CENTER_Y - r, r * 2, r * 2]
+    
+    def getDrawBounds(self) -> list:
+        return self.getTouchBounds()
 
     def draw(self, screen: pygame.Surface, isActive: bool, isHovered: bool) -> bool:
         r = self._radius(isHovered)
@@ -10,6 +10,7 @@ if TYPE_CHECKING:
     from common.image_manager import ImageManager
     from common.dimensions import Dimensions
     from common.field_transform import FieldTransform
+    from entity_base.render_cache import RenderCache
 
 
 from abc import ABC, abstractmethod
@@ -61,6 +62,10 @@ def setRootContainer(rootContainer):
 
 class Entity(ABC, Observable):
 
+    # Set in subclasses whose defineBefore()/defineAfter() define how their children are laid out,
+    # so that the layout pass recomputes the children even when this entity's rect did not change
+    definesChildrenInHooks = False
+
     # drawOrder is a number, in which the lowest number is drawn in the front (highest number is drawn first)
     def __init__(self, parent: 'Entity' | None,
                  drag: DragListener = None,
@@ -84,6 +89,9 @@ class Entity(ABC, Observable):
         self._LOCAL_VISIBLE = initiallyVisible
         self.recomputeWhenInvisible = recomputeWhenInvisible
 
+        # cached result of isVisible(), or None if not known
+        self._VISIBLE: bool = None
+
 
         self.entities = _entities
         self.interactor = _interactor
@@ -92,10 +100,14 @@ class Entity(ABC, Observable):
         self.dimensions = _dimensions
         self.transform = _transform
 
+        # set by entities that render their subtree into a cached surface
+        self.renderCache: RenderCache = None
+
         self._children: list[Entity] = []
         self._parent: Entity = parent
 
-        if self._parent is not None and self not in self._parent._children:
+        # a new entity cannot already be a child of its parent
+        if self._parent is not None:
             self._parent._children.append(self)
 
         self.entities._addEntity(self)
@@ -105,6 +117,8 @@ class Entity(ABC, Observable):
             self._parent._children.remove(self)
         self._parent = newParent
         self._parent._children.append(self)
+        self.entities.invalidateDrawOrder()
+        self._invalidateVisibility()
 
     def distanceTo(self, position: tuple) -> float:
         return distance(*position, self.CENTER_X, self.CENTER_Y)
@@ -152,12 +166,38 @@ class Entity(ABC, Observable):
     # DO NOT OVERRIDE. Call setVisible() and setInvisible() instead.
     # Through this function, a parent entity that is invisible
     # will make all its children invisible as well, and prevent redundant computation
+    #
+    # The result is cached until setVisible()/setInvisible() is called on this entity or an
+    # ancestor. Entities that do override this (ie. nodes only shown when selected) are never
+    # cached, and neither are their descendants, since their visibility can change at any time.
+    # The exception is an entity that is invisible itself, which is invisible regardless of its parent
     def isVisible(self) -> bool:
 
+        if self._VISIBLE is not None:
+            return self._VISIBLE
+
         if self._parent is None:
+            self._VISIBLE = True
             return True
 
-        return self._LOCAL_VISIBLE and self._parent.isVisible()
+        if not self._LOCAL_VISIBLE:
+            self._VISIBLE = False
+            return False
+
+        visible = self._parent.isVisible()
+
+        # only cache if the parent result is cached too
+        if self._parent._VISIBLE is not None:
+            self._VISIBLE = visible
+        return visible
+
+    # Clear the cached isVisible() of this entity and its descendants. Any descendant whose
+    # cache is already clear has no cached descendants that depend on this entity
+    def _invalidateVisibility(self):
+        self._VISIBLE = None
+        for child in self._children:
+            if child._VISIBLE is not None:
+                child._invalidateVisibility()
     
     def setVisible(self, recompute: bool = True):
 
@@ -166,6 +206,8 @@ class Entity(ABC, Observable):
             return
 
         self._LOCAL_VISIBLE = True
+        self._invalidateVisibility()
+        self._invalidateRenderCaches()
 
         if recompute:
             if not self._parent.isVisible():
@@ -180,7 +222,11 @@ class Entity(ABC, Observable):
         if not self._LOCAL_VISIBLE:
             return
 
+        # the area this subtree was drawn on needs to be repainted
+        self.markSubtreeDirty()
+
         self._LOCAL_VISIBLE = False
+        self._invalidateVisibility()
 
     
     def isSelfOrChildrenHovering(self):
@@ -203,10 +249,73 @@ class Entity(ABC, Observable):
         self._isTouching = isInsideBox2(*mouse, *self.RECT)
         return self._isTouching
     
+    # override if isTouching() is not bounded by RECT.
+    # Returns a rect [x, y, width, height] that contains every point where isTouching()
+    # could be true, or None if there is no such bound (always hit-tested).
+    # Used by EntityManager to only hit-test the entities near the mouse
+    def getTouchBounds(self) -> list | None:
+        return self.RECT
+
     # override
-    # with entities of equal DrawOrder, the largest number is drawn in the front 
+    # with entities of equal DrawOrder, the largest number is drawn in the front.
+    # Draw order is cached, so call onDrawOrderTiebreakerChange() whenever
+    # something this depends on changes
     def drawOrderTiebreaker(self) -> float:
         return None
+    
+    def onDrawOrderTiebreakerChange(self):
+        self.entities.onDrawOrderTiebreakerChange(self)
+
+    # override if draw() paints outside of RECT.
+    # Returns a rect [x, y, width, height] that contains everything draw() paints,
+    # or None if unknown (always redrawn, and marking it dirty repaints the whole screen).
+    # Used for dirty-rect rendering
+    def getDrawBounds(self) -> list | None:
+        return self.RECT
+    
+    # rect of the field area. For entities that can draw anywhere on the field
+    def _fieldBounds(self) -> list:
+        return [0, 0, self.dimensions.FIELD_WIDTH, self.dimensions.SCREEN_HEIGHT]
+
+    # Call this whenever the appearance of the entity changes without its rect changing, so that
+    # the area gets repainted in dirty-rect rendering mode and any cached render of it is discarded.
+    # Changes in rect are handled automatically
+    def markDirty(self):
+        self._invalidateRenderCaches()
+        if self.entities.dirtyRectMode and "RECT" in self.__dict__:
+            self.entities.markDirty(self.getDrawBounds())
+
+    def markSubtreeDirty(self):
+        self._invalidateRenderCaches()
+        if self.entities.dirtyRectMode:
+            self._markSubtreeDirtyRects()
+
+    def _markSubtreeDirtyRects(self):
+        if "RECT" in self.__dict__:
+            self.entities.markDirty(self.getDrawBounds())
+        for child in self._children:
+            child._markSubtreeDirtyRects()
+
+    # the cached render of any subtree containing this entity is now out of date
+    def _invalidateRenderCaches(self):
+        current = self
+        while current is not None:
+            if current.renderCache is not None:
+                current.renderCache.invalidate()
+            current = current._parent
+
+    # cached renders of subtrees containing this entity depend on where it is relative to their owner
+    def _onRectChange(self):
+        current = self._parent
+        while current is not None:
+            if current.renderCache is not None:
+                current.renderCache.onDescendantMoved(self)
+            current = current._parent
+
+    # override. For entities with a renderCache, whether the cached surface can be used right now
+    # instead of drawing the subtree live (ie. false while animating)
+    def isRenderCacheable(self) -> bool:
+        return True
 
     # override
     def draw(self, screen: pygame.Surface, isActive: bool, isHovered: bool) -> bool:
@@ -228,6 +337,15 @@ class Entity(ABC, Observable):
         self.HEIGHT = self.defineHeight()
 
     def recomputePosition(self):
+
+        oldRect = self.__dict__.get("RECT")
+
+        # for dirty-rect rendering, the area the entity was drawn on before
+        if self.entities.dirtyRectMode and oldRect is not None:
+            oldDrawBounds = self.getDrawBounds()
+        else:
+            oldDrawBounds = None
+
         self.CENTER_X, self.CENTER_Y = self.defineCenter()
         self.LEFT_X, self.TOP_Y = self.defineTopLeft()
         self.RIGHT_X = self.defineRightX()
@@ -279,9 +397,26 @@ class Entity(ABC, Observable):
 
         self.RECT = [self.LEFT_X, self.TOP_Y, self.WIDTH, self.HEIGHT]
 
+        # keep the hit-testing index up to date with the new rect
+        self.entities._updateTouchBounds(self)
+
+        if self.RECT != oldRect:
+            self._onRectChange()
+
+        # repaint both the old and new area if the entity moved or resized
+        if self.entities.dirtyRectMode:
+            newDrawBounds = self.getDrawBounds()
+            if newDrawBounds != oldDrawBounds:
+                if oldDrawBounds is not None:
+                    self.entities.markDirty(oldDrawBounds)
+                self.entities.markDirty(newDrawBounds)
+
     # Must call recomputePosition every time the entity changes its position or dimensions
     def recomputeEntity(self, excludeChildIf: Callable[['Entity'], bool] = lambda entity: False, skipRecomputeSize: bool = False):
 
+        # any deferred recompute of this entity is covered by this one
+        self.entities.layout.onRecompute(self)
+
         # only recompute when visible. Otherwise, the position is not defined
         # When the entity is made visible, it will recompute its position
         if not self.isVisible() and not self.recomputeWhenInvisible:
@@ -303,6 +438,76 @@ class Entity(ABC, Observable):
             else:
                 child.recomputeEntity()
 
+    # Same as recomputeEntity(), but deferred to the layout pass at the end of the frame.
+    # Calling this many times in a frame only recomputes once. Use when the rect is not
+    # needed right away, ie. in response to notifications. Children are only recomputed
+    # if this entity's rect changes, unless recomputeChildren is true
+    def requestRecompute(self, recomputeChildren: bool = False):
+        self.entities.layout.request(self, recomputeChildren)
+
+    # Called by the layout pass. Recompute this entity, then only the children whose inputs
+    # may have changed: all children if this entity's rect changed or definesChildrenInHooks
+    # is set, none otherwise
+    def _recomputeLayout(self, recomputeChildren: bool):
+
+        if not self.isVisible() and not self.recomputeWhenInvisible:
+            return
+
+        # the parent has not been laid out yet. This entity is recomputed along with it
+        if self._parent is not None and "RECT" not in self._parent.__dict__:
+            return
+
+        layout = self.entities.layout
+        layout.onRecompute(self)
+        layout.recomputed += 1
+
+        oldRect = self.__dict__.get("RECT")
+
+        self.defineBefore()
+        self.recomputeSize()
+        self.recomputePosition()
+        self.defineAfter()
+
+        if not recomputeChildren and self.RECT == oldRect and not self.definesChildrenInHooks:
+            layout.pruned += len(self._children)
+            return
+
+        for child in self._children:
+            child._recomputeLayout(recomputeChildren)
+
+    # Move this entity and its subtree by an offset without redefining anything.
+    # Only valid when nothing in the subtree would define itself differently other than
+    # being offset along with its parent, ie. when scrolling. Override to recompute instead
+    # if the entity is positioned independently of its parent
+    def translateEntity(self, dx: int, dy: int):
+
+        # same as recomputeEntity(), the rect of an invisible entity is recomputed when made visible
+        if not self.isVisible() and not self.recomputeWhenInvisible:
+            return
+
+        if "RECT" not in self.__dict__:
+            return
+
+        if self.entities.dirtyRectMode:
+            self.entities.markDirty(self.getDrawBounds())
+
+        self.LEFT_X += dx
+        self.CENTER_X += dx
+        self.RIGHT_X += dx
+        self.TOP_Y += dy
+        self.CENTER_Y += dy
+        self.BOTTOM_Y += dy
+        self.RECT = [self.LEFT_X, self.TOP_Y, self.WIDTH, self.HEIGHT]
+
+        self.entities._updateTouchBounds(self)
+
+        if self.entities.dirtyRectMode:
+            self.entities.markDirty(self.getDrawBounds())
+
+        # the whole subtree moves together, so cached renders stay valid
+        for child in self._children:
+            child.translateEntity(dx, dy)
+
     # THESE ARE UTILITY METHODS THAT CAN BE USED TO SPECIFY RELATIVE POSITIONS ABOVE
 
     # get relative x as a percent of parent horizontal span
@@ -114,8 +114,8 @@ class ImageEntity(Entity, TooltipOwner):
         
         image = self.getCurrentState().getSurface(self.isOn(), isHovered and self.dimOnHover)
 
-        if self.getOpacity() != 1:
-            image.set_alpha(self.getOpacity() * 255)
+        # the surface is shared between draws, so reset the alpha even at full opacity
+        image.set_alpha(self.getOpacity() * 255)
 
         drawSurface(screen, image, self.CENTER_X, self.CENTER_Y)
             
\ No newline at end of file
@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
 
-# onTick() is called every tick
+# onKeyDown() and onKeyUp() are called when the entity is focused or selected, or for every
+# key if isGlobal. Returning True captures the key, so that no other entity receives it
 
 class KeyListener(ABC):
 
-    def __init__(self, entity):
+    def __init__(self, entity, isGlobal: bool = False):
         self.entity = entity
+        self.isGlobal = isGlobal
 
     @abstractmethod
     def onKeyDown(self, key):
@@ -18,14 +20,14 @@ class KeyListener(ABC):
 
 class KeyLambda(KeyListener):
 
-    def __init__(self, entity, FonKeyDown = lambda key: None, FonKeyUp = lambda key: None):
-        super().__init__(entity)
+    def __init__(self, entity, FonKeyDown = lambda key: None, FonKeyUp = lambda key: None, isGlobal: bool = False):
+        super().__init__(entity, isGlobal)
 
         self.FonKeyDown = FonKeyDown
         self.FonKeyUp = FonKeyUp
 
     def onKeyDown(self, key):
-        self.FonKeyDown(key)
+        return self.FonKeyDown(key)
 
     def onKeyUp(self, key):
-        self.FonKeyUp(key)
\ No newline at end of file
+        return self.FonKeyUp(key)
\ No newline at end of file
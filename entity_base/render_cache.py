@@ -0,0 +1,106 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from entity_base.entity import Entity
+
+from entity_handler.entity_traversal import getTraversalGeneration
+import pygame
+
+"""
+Retained-mode rendering for an entity subtree. The owner and all its descendants are rendered
+once into a cached surface, which is then blitted every frame until something invalidates it.
+Since the cache does not depend on the owner position, moving the whole subtree (ie. scrolling)
+only blits the surface at the new position.
+
+The cache is invalidated when:
+- any entity in the subtree is marked dirty (Entity.markDirty() or Entity.markSubtreeDirty())
+- any entity in the subtree moves relative to the owner, or the owner is resized
+- the tree structure or draw order changes
+EntityManager draws the subtree live instead of using the cache while the user is
+interacting with it, or while the owner says it is not cacheable (ie. while animating).
+"""
+
+class RenderCache:
+
+    # extra room around the owner rect for anti-aliasing and borders drawn slightly outside it
+    MARGIN = 3
+
+    def __init__(self, owner: Entity):
+        self.owner = owner
+
+        self.surface: pygame.Surface = None
+        self.key: tuple = None
+
+        # position of each rendered entity relative to the owner at the time of rendering
+        self.layout: dict[Entity, tuple] = {}
+
+        # true if the subtree draws outside the cached area, so it must be drawn live until invalidated
+        self.uncacheable = False
+
+    def invalidate(self):
+        self.surface = None
+        self.key = None
+        self.layout.clear()
+        self.uncacheable = False
+
+    # the cache only depends on the owner size and draw order, not the owner position
+    def _getKey(self) -> tuple:
+        return (self.owner.WIDTH, self.owner.HEIGHT, getTraversalGeneration())
+
+    # the screen area the cached surface covers
+    def getRect(self) -> pygame.Rect:
+        return pygame.Rect(self.owner.RECT).inflate(self.MARGIN * 2, self.MARGIN * 2)
+
+    def _getRelativeRect(self, entity: Entity) -> tuple:
+        return (entity.LEFT_X - self.owner.LEFT_X, entity.TOP_Y - self.owner.TOP_Y, entity.WIDTH, entity.HEIGHT)
+
+    # Called when the rect of a descendant is recomputed. Invalidates the cache if the
+    # descendant moved relative to the owner
+    def onDescendantMoved(self, entity: Entity):
+        if entity in self.layout and self.layout[entity] != self._getRelativeRect(entity):
+            self.invalidate()
+
+    # Make sure the cached surface is up to date, rendering the subtree if needed.
+    # subtree is the owner followed by all its descendants in draw order.
+    # scratch is a transparent, screen-sized surface that the subtree is rendered on.
+    # Returns false if the cache cannot be used, in which case the subtree should be drawn live
+    def update(self, subtree: list[Entity], scratch: pygame.Surface) -> bool:
+
+        key = self._getKey()
+        if key == self.key:
+            return not self.uncacheable
+
+        self.invalidate()
+
+        # entities draw in screen coordinates, so the subtree can only be rendered if fully on screen
+        rect = self.getRect()
+        if not scratch.get_rect().contains(rect):
+            return False
+
+        self.key = key
+
+        # anything drawn outside the cached area would be cut off
+        for entity in subtree:
+            if not entity.isVisible():
+                continue
+            bounds = entity.getDrawBounds()
+            if bounds is not None:
+                bounds = pygame.Rect(bounds)
+                bounds.normalize()
+            if bounds is None or not rect.contains(bounds):
+                self.uncacheable = True
+                return False
+
+        scratch.set_clip(rect)
+        scratch.fill((0, 0, 0, 0), rect)
+        for entity in subtree:
+            if entity.isVisible():
+                entity.draw(scratch, False, False)
+                self.layout[entity] = self._getRelativeRect(entity)
+        scratch.set_clip(None)
+
+        self.surface = scratch.subsurface(rect).copy()
+        return True
+
+    def draw(self, screen: pygame.Surface):
+        screen.blit(self.surface, self.getRect().topleft)
@@ -20,6 +20,10 @@ class StaticEntity(entity.Entity):
 
     def isTouching(self, position: tuple) -> bool:
         return False
+    
+    # could draw anything anywhere
+    def getDrawBounds(self) -> list | None:
+        return None
 
     def draw(self, screen: pygame.Surface, isActive: bool, isHovered: bool) -> bool:
         self.Fdraw()
\ No newline at end of file
@@ -38,7 +38,7 @@ class TextEntity(Entity, Observer):
         self.textFunction = textFunction
 
         self.font: DynamicFont = self.fonts.getDynamicFont(fontID, fontSize)
-        self.font.subscribe(self, onNotify = self.recomputeEntity)
+        self.font.subscribe(self, onNotify = self.requestRecompute)
 
 
     def defineAfter(self):
@@ -56,6 +56,23 @@ class TextEntity(Entity, Observer):
     
     def isTouching(self, mouse: tuple) -> float:
         return False
+    
+    # text is drawn aligned to the rect, but can be larger than it
+    def getDrawBounds(self) -> list:
+        if "surface" not in self.__dict__:
+            return self.RECT
+        
+        width, height = self.surface.get_size()
+        if self.align == TextAlign.CENTER:
+            x = self.CENTER_X - width / 2
+        elif self.align == TextAlign.LEFT:
+            x = self.LEFT_X
+        else:
+            x = self.RIGHT_X - width
+
+        x += self._awidth(self.dx)
+        y = self.CENTER_Y + self._aheight(self.dy) - height / 2
+        return [x, y, width, height]
 
     # Draw text at the center. opacity set to parent opacity
     def draw(self, screen: pygame.Surface, isActive: bool, isHovered: bool) -> bool:
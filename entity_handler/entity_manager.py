@@ -1,7 +1,11 @@
 from typing import Iterator
-from data_structures.observer import Observer
+from data_structures.observer import NotificationQueue, Observer
+from data_structures.spatial_grid import SpatialGrid
 from entity_base.entity import Entity
-from entity_handler.entity_traversal import traverseEntities, TraversalOrder
+from entity_handler.layout_scheduler import LayoutScheduler
+from entity_handler.entity_registry import EntityRegistry
+from entity_handler.input_router import InputRouter
+from entity_handler.entity_traversal import getTraversal, getTraversalIndex, getSubtreeEnd, updateSubtreeInfo, canSkipInvisibleSubtree, invalidateTraversalOrder, onSortKeyChange, TraversalOrder
 from root_container.root_container import RootContainer
 from entity_ui.tooltip import TooltipOwner
 from common.dimensions import Dimensions
@@ -16,10 +20,32 @@ class EntityManager:
 
     def __init__(self):
 
-        self.entities: list[Entity] = []
+        # every entity, indexed by the listeners it has
+        self.entities: EntityRegistry = EntityRegistry()
 
-        self.keyEntities: list[Entity] = []        
-        self.clickEntities: list[Entity] = []
+        # delivers keys and "any mouse down/up" events only to the entities that should get them
+        self.input: InputRouter = InputRouter(self.entities)
+
+        # index of entity touch bounds, so that hit-testing only considers entities near the mouse
+        self.touchIndex: SpatialGrid[Entity] = SpatialGrid()
+
+        # Opt-in dirty-rect rendering. Only the regions marked dirty are repainted and presented
+        self.dirtyRectMode = False
+        self.dirtyRects: list[pygame.Rect] = []
+        self.allDirty = True
+
+        # interaction state at the last draw, to find what needs to be repainted
+        self.lastHoveredEntity: Entity = None
+        self.lastHoverState: tuple = None
+        self.lastSelected: list[Entity] = []
+        self.lastTooltipRect: pygame.Rect = None
+        self.lastBoxEnabled = False
+
+        # transparent screen-sized surface that cached subtrees are rendered on
+        self.renderScratch: pygame.Surface = None
+
+        # recomputes deferred with Entity.requestRecompute(), handled once per tick
+        self.layout = LayoutScheduler()
 
     def initRootContainer(self):
         self.rootContainer = RootContainer()
@@ -30,61 +56,91 @@ class EntityManager:
     # SHOULD ONLY BE CALLED WITHIN BASE ENTITY CLASS
     def _addEntity(self, entity: Entity):
         
-        self.entities.append(entity)
-
-        if entity.key is not None:
-            self.keyEntities.append(entity)
-        if entity.click is not None:
-            self.clickEntities.append(entity)
+        self.entities.add(entity)
+        invalidateTraversalOrder()
 
     def removeEntity(self, entity: Entity, excludeChildrenIf = lambda child : False):
 
-        i = 0
-        while i < len(entity._children):
-            child = entity._children[i]
-            
-            if not excludeChildrenIf(child):
-                self.removeEntity(child)
-                continue
-            i += 1
+        # children removed along with this entity do not need to be detached from it one at a time
+        keptChildren = []
+        for child in entity._children:
+            if excludeChildrenIf(child):
+                keptChildren.append(child)
+            else:
+                self._removeSubtree(child)
+        entity._children[:] = keptChildren
 
-        if entity in entity._parent._children:
+        if entity._parent is not None and entity in entity._parent._children:
             entity._parent._children.remove(entity)
+        invalidateTraversalOrder()
+
+        self._unregister(entity)
+
+    # Remove the entity and everything under it, leaving it in its parent's list of children
+    def _removeSubtree(self, entity: Entity):
+        for child in entity._children:
+            self._removeSubtree(child)
+        entity._children.clear()
+        self._unregister(entity)
+
+    def _unregister(self, entity: Entity):
+
+        entity.markDirty()
 
         self.entities.remove(entity)
+        self.input.forget(entity)
 
-        if entity in self.keyEntities:
-            self.keyEntities.remove(entity)
-        if entity in self.clickEntities:
-            self.clickEntities.remove(entity)
+        self.touchIndex.remove(entity)
+        self.layout.discard(entity)
 
         # entity unsubscribes to any observables
         if isinstance(entity, Observer):
             entity.unsubscribeAll()
 
+    # Call when the entity tree structure changes outside of adding/removing entities
+    def invalidateDrawOrder(self):
+        invalidateTraversalOrder()
+
+    # Call when an input to the entity's drawOrderTiebreaker() may have changed
+    def onDrawOrderTiebreakerChange(self, entity: Entity):
+        onSortKeyChange(entity)
+
+    # SHOULD ONLY BE CALLED WITHIN BASE ENTITY CLASS, whenever the entity rect is recomputed
+    def _updateTouchBounds(self, entity: Entity):
+        self.touchIndex.update(entity, entity.getTouchBounds())
+
     def getEntityAtPosition(self, position: tuple) -> Entity:
 
         parent = None
         drawOrder: DrawOrder = None
         tiebreaker = None
 
-        self.touching: list[Entity] = []
-        for entity in traverseEntities(TraversalOrder.POSTFIX):
+        # Only entities whose touch bounds contain the mouse can be touching.
+        # Order them the same way a full postfix traversal would
+        candidates: list[tuple[int, Entity]] = []
+        for entity in self.touchIndex.query(position):
             if entity.isVisible() and entity.isTouching(position):
+                index = getTraversalIndex(entity, TraversalOrder.POSTFIX)
+                if index is not None:
+                    candidates.append((index, entity))
+        candidates.sort(key = lambda candidate: candidate[0])
 
-                currentTiebreaker = entity.drawOrderTiebreaker()
-                if currentTiebreaker is None:
-                    currentTiebreaker = 0
+        self.touching: list[Entity] = []
+        for key, entity in candidates:
 
-                if drawOrder is None:
-                    parent = entity._parent
-                    drawOrder = entity.drawOrder
-                    tiebreaker = currentTiebreaker
+            currentTiebreaker = entity.drawOrderTiebreaker()
+            if currentTiebreaker is None:
+                currentTiebreaker = 0
 
-                elif parent != entity._parent or entity.drawOrder != drawOrder or tiebreaker != currentTiebreaker:
-                    break
-                
-                self.touching.append(entity)
+            if drawOrder is None:
+                parent = entity._parent
+                drawOrder = entity.drawOrder
+                tiebreaker = currentTiebreaker
+
+            elif parent != entity._parent or entity.drawOrder != drawOrder or tiebreaker != currentTiebreaker:
+                break
+            
+            self.touching.append(entity)
 
         # Now we find the winning entity from the list.
         if len(self.touching) == 0:
@@ -104,10 +160,157 @@ class EntityManager:
                     closest = entity
             return closest
     
-    def drawEntities(self, interactor, screen: pygame.Surface, mousePosition: tuple, dimensions: Dimensions):
-        for entity in traverseEntities(TraversalOrder.PREFIX):
-            if entity.isVisible():
-                selected = entity in interactor.selected.entities
+    def setDirtyRectMode(self, enabled: bool):
+        self.dirtyRectMode = enabled
+        self.markAllDirty()
+
+    # Mark a rect [x, y, width, height] as needing a repaint next frame.
+    # None means the whole screen
+    def markDirty(self, rect: list | None):
+        if not self.dirtyRectMode or self.allDirty:
+            return
+        
+        if rect is None:
+            self.markAllDirty()
+        else:
+            # margin for anti-aliasing and borders drawn slightly outside the rect
+            self.dirtyRects.append(pygame.Rect(rect).inflate(self.DIRTY_MARGIN * 2, self.DIRTY_MARGIN * 2))
+
+    def markAllDirty(self):
+        self.allDirty = True
+        self.dirtyRects.clear()
+
+    DIRTY_MARGIN = 3
+    MAX_DIRTY_REGIONS = 8
+
+    # Mark the areas whose appearance depends on hover, selection, tooltip and selection box state
+    def _markInteractionChanges(self, interactor, mousePosition: tuple, dimensions: Dimensions):
+
+        # selection changes affect many entities (ie node lines, segments), so repaint everything
+        if interactor.selected.entities != self.lastSelected:
+            self.lastSelected = list(interactor.selected.entities)
+            self.markAllDirty()
+
+        # the selection box moves with the mouse
+        boxEnabled = interactor.box.isEnabled()
+        if boxEnabled or self.lastBoxEnabled:
+            self.markAllDirty()
+        self.lastBoxEnabled = boxEnabled
+
+        # repaint the old and new hovered entities
+        hoverState = (interactor.hoveredEntity, interactor.greedyEntity, interactor.leftDragging, interactor.rightDragging)
+        if hoverState != self.lastHoverState:
+            if self.lastHoveredEntity is not None:
+                self.lastHoveredEntity.markSubtreeDirty()
+            if interactor.hoveredEntity is not None:
+                interactor.hoveredEntity.markSubtreeDirty()
+            self.lastHoveredEntity = interactor.hoveredEntity
+            self.lastHoverState = hoverState
+
+        # the tooltip follows the mouse, so repaint where it was and where it will be
+        if self.lastTooltipRect is not None:
+            self.markDirty(self.lastTooltipRect)
+        self.lastTooltipRect = None
+
+        entity = interactor.hoveredEntity
+        if isinstance(entity, TooltipOwner) and entity.isVisible():
+            self.lastTooltipRect = entity.getTooltipRect(mousePosition, dimensions)
+            if self.lastTooltipRect is not None:
+                self.markDirty(self.lastTooltipRect)
+
+    # Combine dirty rects into a few regions to repaint
+    def _getDirtyRegions(self, screenRect: pygame.Rect) -> list[pygame.Rect]:
+
+        if self.allDirty:
+            return [screenRect]
+        
+        regions: list[pygame.Rect] = []
+        for rect in self.dirtyRects:
+            rect = rect.clip(screenRect)
+            if rect.width == 0 or rect.height == 0:
+                continue
+
+            # merge with any overlapping regions
+            i = rect.collidelist(regions)
+            while i != -1:
+                rect.union_ip(regions.pop(i))
+                i = rect.collidelist(regions)
+            regions.append(rect)
+
+        # past a certain point, a single traversal is cheaper than many
+        if len(regions) > self.MAX_DIRTY_REGIONS:
+            return [regions[0].unionall(regions[1:])]
+        return regions
+    
+    # whether the entity may draw inside the region. None region means the whole screen
+    def _isInsideRegion(self, entity: Entity, region: pygame.Rect | None) -> bool:
+        if region is None:
+            return True
+        
+        bounds = entity.getDrawBounds()
+        if bounds is None:
+            return True
+        
+        bounds = pygame.Rect(bounds)
+        bounds.normalize()
+        return region.colliderect(bounds.inflate(self.DIRTY_MARGIN * 2, self.DIRTY_MARGIN * 2))
+
+    # Entities the user is interacting with, and all their ancestors. Subtrees containing
+    # any of these are drawn live instead of from their render cache
+    def _getInteractionBranches(self, interactor) -> set[Entity]:
+        branches: set[Entity] = set()
+        for entity in [interactor.hoveredEntity, interactor.greedyEntity, *interactor.selected.entities]:
+            while entity is not None and entity not in branches:
+                branches.add(entity)
+                entity = entity._parent
+        return branches
+
+    def _getRenderScratch(self, screen: pygame.Surface) -> pygame.Surface:
+        if self.renderScratch is None or self.renderScratch.get_size() != screen.get_size():
+            self.renderScratch = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
+        return self.renderScratch
+
+    # Draw the subtree from its render cache if possible. Returns false if it should be drawn live instead
+    def _drawRenderCache(self, entity: Entity, index: int, screen: pygame.Surface, region: pygame.Rect | None, branches: set[Entity]) -> bool:
+
+        cache = entity.renderCache
+
+        # anything could change while the user is interacting with the subtree, so render again afterwards
+        if entity in branches or not entity.isRenderCacheable():
+            cache.invalidate()
+            return False
+        
+        subtree = getTraversal(TraversalOrder.PREFIX)[index : getSubtreeEnd(entity)]
+        if not cache.update(subtree, self._getRenderScratch(screen)):
+            return False
+        
+        if region is None or region.colliderect(cache.getRect()):
+            cache.draw(screen)
+        return True
+
+    def _drawRegion(self, interactor, screen: pygame.Surface, mousePosition: tuple, dimensions: Dimensions, region: pygame.Rect | None):
+
+        branches = self._getInteractionBranches(interactor)
+
+        traversal = getTraversal(TraversalOrder.PREFIX)
+        updateSubtreeInfo()
+        i = 0
+        while i < len(traversal):
+            entity = traversal[i]
+            visible = entity.isVisible()
+
+            # nothing in the subtree is visible either
+            if not visible and canSkipInvisibleSubtree(entity):
+                i = getSubtreeEnd(entity)
+                continue
+
+            # the whole subtree is drawn at once from the cached surface
+            if entity.renderCache is not None and visible and self._drawRenderCache(entity, i, screen, region, branches):
+                i = getSubtreeEnd(entity)
+                continue
+
+            if visible and self._isInsideRegion(entity, region):
+                selected = interactor.selected.contains(entity)
                 hovering = entity is interactor.hoveredEntity and (selected or not (interactor.leftDragging or interactor.rightDragging))
 
                 if interactor.greedyEntity is not None and interactor.greedyEntity is not entity:
@@ -115,37 +318,70 @@ class EntityManager:
 
                 entity.draw(screen, selected, hovering)
                 #entity.drawRect(screen)
+            i += 1
 
-        # draw tooltips on top of the entities
-        for entity in self.entities:
-            if isinstance(entity, TooltipOwner) and entity.isVisible() and entity is interactor.hoveredEntity:
-                entity.drawTooltip(screen, mousePosition, dimensions)
+        # draw tooltips on top of the entities. Only the hovered entity can show a tooltip
+        entity = interactor.hoveredEntity
+        if isinstance(entity, TooltipOwner) and entity.isVisible():
+            entity.drawTooltip(screen, mousePosition, dimensions)
+
+    # Draw and present the frame. In dirty-rect mode, only dirty regions are repainted,
+    # and nothing is done at all if nothing changed
+    def drawEntities(self, interactor, screen: pygame.Surface, mousePosition: tuple, dimensions: Dimensions):
+
+        if not self.dirtyRectMode:
+            self._drawRegion(interactor, screen, mousePosition, dimensions, None)
+            pygame.display.flip()
+            return
+        
+        self._markInteractionChanges(interactor, mousePosition, dimensions)
+        regions = self._getDirtyRegions(screen.get_rect())
+
+        for region in regions:
+            screen.set_clip(region)
+            self._drawRegion(interactor, screen, mousePosition, dimensions, region)
+        screen.set_clip(None)
+
+        if len(regions) > 0:
+            pygame.display.update(regions)
+
+        self.dirtyRects.clear()
+        self.allDirty = False
 
     """
     Tick callbacks are invoked on a recursive manner. onTickStart() callbacks
     are invoked on the parent entities before children, while onTickEnd() callbacks
     are invoked on the children before the parent.
     """
+    # Recomputes requested while handling events are done before ticking, and
+    # recomputes requested while ticking are done before drawing. Coalesced
+    # notifications are sent before each, since they usually request recomputes
     def tick(self):
+        NotificationQueue.flush()
+        self.layout.recomputePending()
         self._tick(self.rootContainer)
+        NotificationQueue.flush()
+        self.layout.recomputePending()
 
     def _tick(self, entity: Entity):
 
-        tickable = (entity.tick is not None) and (entity.isVisible() or entity.recomputeWhenInvisible)
+        visible = entity.isVisible()
+        tickable = (entity.tick is not None) and (visible or entity.recomputeWhenInvisible)
 
         if tickable:
             entity.tick.onTickStart()
         
-        for child in entity._children:
-            self._tick(child)
+        # nothing in an invisible subtree ticks, unless it is ticked while invisible.
+        # Uses the subtree info from the last draw, since new entities may not have a rect to sort by yet
+        if visible or not canSkipInvisibleSubtree(entity, forTick = True):
+            for child in entity._children:
+                self._tick(child)
 
         if tickable:
             entity.tick.onTickEnd()
 
-    def onKeyDown(self, key):
-        for entity in self.keyEntities:
-            entity.key.onKeyDown(key)
+    def onKeyDown(self, interactor, key):
+        self.input.onKeyDown(interactor, key)
 
-    def onKeyUp(self, key):
-        for entity in self.keyEntities:
-            entity.key.onKeyUp(key)
\ No newline at end of file
+    def onKeyUp(self, interactor, key):
+        self.input.onKeyUp(interactor, key)
\ No newline at end of file
@@ -0,0 +1,57 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from enum import Enum, auto
+
+if TYPE_CHECKING:
+    from entity_base.entity import Entity
+
+"""
+The set of all entities, in the order they were added, with O(1) add, remove and membership.
+Also indexes entities by the listeners they have, so that delivering an event to every
+entity that can handle it does not need to go through all entities.
+
+Iterating returns a snapshot, since handling an event often adds or removes entities.
+"""
+
+class Capability(Enum):
+    GLOBAL_KEY = auto()
+    SELECT = auto()
+
+class EntityRegistry:
+
+    def __init__(self):
+
+        # dicts are insertion-ordered, so these double as ordered sets
+        self._entities: dict[Entity, None] = {}
+        self._indexes: dict[Capability, dict[Entity, None]] = {capability: {} for capability in Capability}
+
+    def _getCapabilities(self, entity: Entity) -> list[Capability]:
+        capabilities = []
+        if entity.key is not None and entity.key.isGlobal:
+            capabilities.append(Capability.GLOBAL_KEY)
+        if entity.select is not None:
+            capabilities.append(Capability.SELECT)
+        return capabilities
+
+    def add(self, entity: Entity):
+        self._entities[entity] = None
+        for capability in self._getCapabilities(entity):
+            self._indexes[capability][entity] = None
+
+    def remove(self, entity: Entity):
+        del self._entities[entity]
+        for index in self._indexes.values():
+            index.pop(entity, None)
+
+    def __contains__(self, entity: Entity) -> bool:
+        return entity in self._entities
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+    def __iter__(self):
+        return iter(list(self._entities))
+
+    # Snapshot of the entities with the capability, in the order they were added
+    def withCapability(self, capability: Capability) -> list[Entity]:
+        return list(self._indexes[capability])
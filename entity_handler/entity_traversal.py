@@ -11,13 +11,19 @@ class TraversalOrder(Enum):
     PREFIX = 0
     POSTFIX = 1
 
+# sort key for children of the same parent. Lower drawOrder is drawn in front,
+# and with equal drawOrder, the largest tiebreaker is drawn in front
+def _childSortKey(entity: entity.Entity) -> tuple:
+    tiebreaker = entity.drawOrderTiebreaker()
+    return (entity.drawOrder, 0 if tiebreaker is None else -tiebreaker)
+
 def _traverseEntities(current: entity.Entity, order: TraversalOrder) -> Iterator[entity.Entity]:
 
     if order == TraversalOrder.PREFIX:
         yield current
 
     current._children.sort(
-        key = lambda entity: (entity.drawOrder, 0 if entity.drawOrderTiebreaker() is None else (-entity.drawOrderTiebreaker())),
+        key = _childSortKey,
         reverse = (order == TraversalOrder.PREFIX)
     )
 
@@ -27,7 +33,110 @@ def _traverseEntities(current: entity.Entity, order: TraversalOrder) -> Iterator
     if order == TraversalOrder.POSTFIX:
         yield current
 
-# A generator for all entities in the tree
+"""
+The flattened traversal of the whole tree is cached, since the tree rarely changes
+compared to how often it is traversed (hit-testing and drawing every frame).
+The cache must be invalidated whenever a child is added or removed, an entity changes
+parent, or the sort key (drawOrder or drawOrderTiebreaker()) of an entity changes.
+"""
+_cachedTraversals: dict[TraversalOrder, list[entity.Entity]] = {}
+_cachedIndices: dict[TraversalOrder, dict[entity.Entity, int]] = {}
+
+# the sort key of each entity at the time the cache was built
+_cachedSortKeys: dict[entity.Entity, tuple] = {}
+
+# index one past the last descendant of each entity in the prefix traversal
+_cachedSubtreeEnds: dict[entity.Entity, int] = {}
+
+# whether the subtree of each entity can be skipped when the entity is invisible,
+# when drawing and when ticking
+_cachedSkipDraw: dict[entity.Entity, bool] = {}
+_cachedSkipTick: dict[entity.Entity, bool] = {}
+
+# incremented whenever the cache is invalidated, so that anything depending
+# on the draw order can tell when it changed
+_generation: int = 0
+
+def invalidateTraversalOrder():
+    global _generation
+    _generation += 1
+
+    _cachedTraversals.clear()
+    _cachedIndices.clear()
+    _cachedSortKeys.clear()
+    _cachedSubtreeEnds.clear()
+    _cachedSkipDraw.clear()
+    _cachedSkipTick.clear()
+
+def getTraversalGeneration() -> int:
+    return _generation
+
+# Call when an input to the entity's drawOrderTiebreaker() may have changed.
+# Only invalidates the cache if the sort key is different from when the cache was built
+def onSortKeyChange(current: entity.Entity):
+    if current in _cachedSortKeys and _cachedSortKeys[current] != _childSortKey(current):
+        invalidateTraversalOrder()
+
+# Returns the cached traversal as a list. Do not modify it
+def getTraversal(order: TraversalOrder) -> list[entity.Entity]:
+
+    if order not in _cachedTraversals:
+        traversal = list(_traverseEntities(entity.ROOT_CONTAINER, order))
+        _cachedTraversals[order] = traversal
+        _cachedIndices[order] = {current: i for i, current in enumerate(traversal)}
+
+        for current in traversal:
+            _cachedSortKeys[current] = _childSortKey(current)
+
+    return _cachedTraversals[order]
+
+# An iterator for all entities in the tree
 # Either postfix or prefix
 def traverseEntities(order: TraversalOrder) -> Iterator[entity.Entity]:
-    yield from _traverseEntities(entity.ROOT_CONTAINER, order)
\ No newline at end of file
+    return iter(getTraversal(order))
+
+# An entity that overrides isVisible() can be visible even if its parent is not
+def _overridesVisibility(current: entity.Entity) -> bool:
+    return type(current).isVisible is not entity.Entity.isVisible
+
+# Make sure the subtree ends and skip flags of the prefix traversal are cached
+def updateSubtreeInfo():
+
+    traversal = getTraversal(TraversalOrder.PREFIX)
+
+    if len(_cachedSubtreeEnds) > 0:
+        return
+
+    # children come after their parent, so compute subtree sizes from the back
+    sizes: dict[entity.Entity, int] = {}
+    for i in range(len(traversal) - 1, -1, -1):
+        node = traversal[i]
+        size = 1 + sum(sizes.get(child, 0) for child in node._children)
+        sizes[node] = size
+        _cachedSubtreeEnds[node] = i + size
+
+        _cachedSkipDraw[node] = all(
+            not _overridesVisibility(child) and _cachedSkipDraw.get(child, True)
+            for child in node._children)
+        _cachedSkipTick[node] = all(
+            not _overridesVisibility(child) and not child.recomputeWhenInvisible and _cachedSkipTick.get(child, True)
+            for child in node._children)
+
+# In the prefix traversal, an entity is followed by all its descendants. Returns the index
+# one past its last descendant, so that the whole subtree can be skipped while iterating
+def getSubtreeEnd(current: entity.Entity) -> int:
+    updateSubtreeInfo()
+    return _cachedSubtreeEnds[current]
+
+# Whether nothing in the subtree of an invisible entity can be drawn (or ticked, if forTick).
+# Does not rebuild the cache, so it is safe to call while the tree is being modified.
+# Returns false if not known. Call updateSubtreeInfo() beforehand
+def canSkipInvisibleSubtree(current: entity.Entity, forTick: bool = False) -> bool:
+    return (_cachedSkipTick if forTick else _cachedSkipDraw).get(current, False)
+
+# Returns the position of the entity in traverseEntities(order).
+# Useful when only a handful of entities need to be ordered.
+# Returns None if the entity is not attached to the root container
+def getTraversalIndex(current: entity.Entity, order: TraversalOrder) -> int | None:
+    getTraversal(order)
+    return _cachedIndices[order].get(current)
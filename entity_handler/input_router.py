@@ -0,0 +1,97 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+from entity_handler.entity_registry import Capability, EntityRegistry
+
+if TYPE_CHECKING:
+    from entity_base.entity import Entity
+    from entity_handler.interactor import Interactor
+
+"""
+Decides which entities a key press or an "any mouse down/up" event is delivered to,
+so that these events do not go through every entity that could handle them.
+
+Keys go to the focused entity first, then to the selected and dragged entities, and then to the
+entities whose key listener is global. If any of them returns True from onKeyDown(),
+the key is captured and the rest do not receive it. Every entity receives a key at
+most once. The keys currently held down are tracked here, so entities that only need
+to know whether a key is pressed (like shift while dragging) can ask instead of listening.
+
+"Any mouse down/up" callbacks, which are called wherever the mouse is pressed or released,
+only go to the entities that asked for them, like a dropdown while it is expanded.
+"""
+
+class InputRouter:
+
+    def __init__(self, registry: EntityRegistry):
+        self.registry = registry
+
+        # the entity that receives keys before anything else, like a text editor being typed in
+        self.focused: Entity = None
+
+        self.pressedKeys: set[int] = set()
+
+        # dicts are insertion-ordered, so these double as ordered sets
+        self.mouseDownListeners: dict[Entity, None] = {}
+        self.mouseUpListeners: dict[Entity, None] = {}
+
+    def setFocus(self, entity: Entity):
+        self.focused = entity
+
+    # Only clears focus if the entity still has it
+    def clearFocus(self, entity: Entity):
+        if self.focused is entity:
+            self.focused = None
+
+    def isKeyPressed(self, key) -> bool:
+        return key in self.pressedKeys
+
+    def listenMouseDownAny(self, entity: Entity):
+        self.mouseDownListeners[entity] = None
+
+    def stopMouseDownAny(self, entity: Entity):
+        self.mouseDownListeners.pop(entity, None)
+
+    def listenMouseUpAny(self, entity: Entity):
+        self.mouseUpListeners[entity] = None
+
+    def stopMouseUpAny(self, entity: Entity):
+        self.mouseUpListeners.pop(entity, None)
+
+    # Called when the entity is removed
+    def forget(self, entity: Entity):
+        self.clearFocus(entity)
+        self.stopMouseDownAny(entity)
+        self.stopMouseUpAny(entity)
+
+    # The entities a key is delivered to, in order
+    def _getKeyTargets(self, interactor: Interactor) -> list[Entity]:
+        targets: dict[Entity, None] = {}
+        if self.focused is not None:
+            targets[self.focused] = None
+        for entity in interactor.selected.entities:
+            targets[entity] = None
+        for entity in interactor.draggingEntities:
+            targets[entity] = None
+        for entity in self.registry.withCapability(Capability.GLOBAL_KEY):
+            targets[entity] = None
+        return [entity for entity in targets if entity.key is not None and entity in self.registry]
+
+    def onKeyDown(self, interactor: Interactor, key):
+        self.pressedKeys.add(key)
+        for entity in self._getKeyTargets(interactor):
+            if entity.key.onKeyDown(key):
+                return
+
+    def onKeyUp(self, interactor: Interactor, key):
+        self.pressedKeys.discard(key)
+        for entity in self._getKeyTargets(interactor):
+            if entity.key.onKeyUp(key):
+                return
+
+    def onMouseDownAny(self, mouse: tuple):
+        for entity in list(self.mouseDownListeners):
+            entity.click.onMouseDownAny(mouse)
+
+    def onMouseUpAny(self, mouse: tuple):
+        for entity in list(self.mouseUpListeners):
+            entity.click.onMouseUpAny(mouse)
@@ -59,7 +59,8 @@ class Interactor:
 
     # objects in list A but not B
     def setDifference(self, listA, listB):
-        return [obj for obj in listA if obj not in listB]
+        setB = set(listB)
+        return [obj for obj in listA if obj not in setB]
 
     def setSelectedEntities(self, newSelected: list[Entity]):
         add = self.setDifference(newSelected, self.selected.entities)
@@ -126,9 +127,7 @@ class Interactor:
         if self.leftDragging or self.rightDragging:
             return
         
-        for entity in entities.entities:
-            if entity.click is not None:
-                entity.click.onMouseDownAny(mouse)
+        entities.input.onMouseDownAny(mouse)
 
         self.didMove = False
         self.mouseStartDrag = mouse
@@ -166,14 +165,14 @@ class Interactor:
         if shiftKey and self.hoveredEntity is not None and self.hoveredEntity.select is not None:
 
             # If already in selected entities, remove
-            if self.hoveredEntity in self.selected.entities:
+            if self.selected.contains(self.hoveredEntity):
                 self.removeEntity(self.hoveredEntity)
                 self.leftDragging = False
             else: # otherwise, add
                 self.addEntity(self.hoveredEntity)
 
         # if there's a group selected but the mouse is not clicking on the group, deselect
-        elif self.hoveredEntity is None or self.hoveredEntity not in self.selected.entities:
+        elif self.hoveredEntity is None or not self.selected.contains(self.hoveredEntity):
             if self.hoveredEntity is not self.fieldContainer and self.hoveredEntity.select is not None:
 
                 doNotRemove = None
@@ -200,7 +199,7 @@ class Interactor:
                     toSelect = toSelect()
                 self.addEntity(toSelect)
         
-        elif self.hoveredEntity in self.selected.entities:
+        elif self.selected.contains(self.hoveredEntity):
             self.draggingEntities = self.selected.entities[:]
             for entity in self.draggingEntities:
                 if entity.drag is not None:
@@ -224,9 +223,7 @@ class Interactor:
 
     def onMouseUp(self, entities: EntityManager, mouse: tuple):
 
-        for entity in entities.entities:
-            if entity.click is not None:
-                entity.click.onMouseUpAny(mouse)
+        entities.input.onMouseUpAny(mouse)
 
         isRight = self.rightDragging
         self.leftDragging = False
@@ -0,0 +1,81 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from entity_base.entity import Entity
+
+"""
+Deferred layout. Instead of calling recomputeEntity() every time something an entity depends on
+changes (font size, path adapter, field transform...), the entity calls requestRecompute(), and
+all requests are handled together once per frame by EntityManager. An entity that requests
+a recompute many times in a frame (ie. once per mouse motion event while dragging) is
+only recomputed once, and requests inside a subtree that gets recomputed anyway are dropped.
+
+By default, the deferred recompute only visits children if their inputs may have changed:
+a child is recomputed if its parent rect changed, or if the parent sets definesChildrenInHooks
+because it lays out its children in defineBefore()/defineAfter(). Entities whose children depend on something other than
+the parent rect (ie. the field transform) should request with recomputeChildren = True.
+"""
+
+class LayoutScheduler:
+
+    def __init__(self):
+
+        # entity -> whether to recompute all children regardless of whether they changed
+        self.pending: dict[Entity, bool] = {}
+
+        # counters, to see how much work deferring saves
+        self.requested = 0 # number of calls to requestRecompute()
+        self.merged = 0 # requests already pending, or covered by a recompute before the pass
+        self.recomputed = 0 # entities recomputed by the pass
+        self.pruned = 0 # children not recomputed because nothing they depend on changed
+
+    def request(self, entity: Entity, recomputeChildren: bool):
+        self.requested += 1
+        if entity in self.pending:
+            self.merged += 1
+            recomputeChildren = recomputeChildren or self.pending[entity]
+        self.pending[entity] = recomputeChildren
+
+    # called whenever the entity is recomputed, so a pending request for it is no longer needed
+    def onRecompute(self, entity: Entity):
+        if entity in self.pending:
+            self.merged += 1
+            del self.pending[entity]
+
+    # the entity was removed, so it should not be recomputed
+    def discard(self, entity: Entity):
+        self.pending.pop(entity, None)
+
+    def hasPending(self) -> bool:
+        return len(self.pending) > 0
+
+    def _getDepth(self, entity: Entity) -> int:
+        depth = 0
+        while entity._parent is not None:
+            entity = entity._parent
+            depth += 1
+        return depth
+
+    # Handle all pending requests. Ancestors go first, so that requests inside their
+    # subtrees are dropped if the ancestor recomputed them
+    def recomputePending(self):
+
+        # recomputing may request more recomputes, so repeat until nothing is left
+        while len(self.pending) > 0:
+
+            requests = sorted(self.pending.items(), key = lambda request: self._getDepth(request[0]))
+
+            for entity, recomputeChildren in requests:
+                if entity not in self.pending:
+                    continue # already recomputed by an ancestor
+                del self.pending[entity]
+                entity._recomputeLayout(recomputeChildren)
+
+    def resetCounters(self):
+        self.requested = 0
+        self.merged = 0
+        self.recomputed = 0
+        self.pruned = 0
+
+    def __repr__(self) -> str:
+        return f"LayoutScheduler(requested={self.requested}, merged={self.merged}, recomputed={self.recomputed}, pruned={self.pruned})"
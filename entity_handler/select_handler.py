@@ -22,7 +22,9 @@ class SelectHandler:
 
     def __init__(self):
 
+        # selected entities in the order they were selected, and the same entities as a set for membership checks
         self.entities: list[Entity] = []
+        self.entitySet: set[Entity] = set()
         
         self.activeMenu: SelectorMenuEntity = None
 
@@ -32,7 +34,7 @@ class SelectHandler:
     # return true if successful add
     def add(self, entity: Entity, forceAdd: bool = False) -> bool:
 
-        if entity in self.entities:
+        if entity in self.entitySet:
             return False
         
         if not forceAdd and entity.select.type == SelectorType.SOLO and not self.isEmpty():
@@ -43,6 +45,7 @@ class SelectHandler:
             return False
 
         self.entities.append(entity)
+        self.entitySet.add(entity)
 
         # If menu already open, close it
         if self.activeMenu is not None:
@@ -64,6 +67,7 @@ class SelectHandler:
             return False
 
         self.entities.remove(entity)
+        self.entitySet.discard(entity)
 
         # If menu already open, close it
         if self.activeMenu is not None:
@@ -73,6 +77,10 @@ class SelectHandler:
         return True
 
 
+    # O(1)
+    def contains(self, entity: Entity) -> bool:
+        return entity in self.entitySet
+
     def hasOnly(self, entity: Entity) -> bool:
         return len(self.entities) == 1 and entity is self.entities[0]
     
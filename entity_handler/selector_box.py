@@ -1,5 +1,6 @@
 from entity_base.entity import Entity
 from entity_handler.entity_manager import EntityManager
+from entity_handler.entity_registry import Capability
 from utility.pygame_functions import drawTransparentRect
 from utility.math_functions import isInsideBox
 
@@ -39,11 +40,7 @@ class SelectorBox:
         x2, y2 = end
 
         self.selected: list[Entity] = []
-        for entity in entities.entities:
-
-            # not a multi-selectable entitity
-            if entity.select is None:
-                continue
+        for entity in entities.entities.withCapability(Capability.SELECT):
 
             if self.isSelecting(entity, x2, y2):
                 self.selected.append(entity)
@@ -30,6 +30,9 @@ Whenever the option is changed, it sends a notification to all subscribers.
 
 class DropdownContainer(Container, Observable):
 
+    # option sizes are measured in defineBefore()
+    definesChildrenInHooks = True
+
     # In addition to setting option text, update the other options
     # to include the old selected option but exclude the new selected option
     def setSelectedText(self, selectedText: str, recompute: bool = True):
@@ -198,14 +201,17 @@ class DropdownContainer(Container, Observable):
             self.borderProfile.forceToEndValue()
         
 
+    # only listens for mouse presses elsewhere while expanded, so that they can collapse it
     def expand(self):
         self.expanded = True
+        self.entities.input.listenMouseDownAny(self)
         for option in self.options[1:]:
             option.setVisible()
         self.updateProfiles()
         
     def collapse(self):
         self.expanded = False
+        self.entities.input.stopMouseDownAny(self)
         self.stillVisibleWhileCollapsing = True
         self.updateProfiles()
     
@@ -229,6 +235,10 @@ class DropdownContainer(Container, Observable):
         self.widthProfile.tick()
         self.borderProfile.tick()
 
+        # the border fades in and out without the rect changing
+        if self.borderProfile.wasChange():
+            self.markDirty()
+
         width = self.widthProfile.get()
         height = self.heightProfile.get()
         self.surface = pygame.Surface((width, height-1), pygame.SRCALPHA).convert_alpha()
@@ -298,6 +308,11 @@ class DropdownContainer(Container, Observable):
     
     def defineAfter(self):
         self.updateProfiles()
+
+        # tiebreakers depend on y position
+        self.onDrawOrderTiebreakerChange()
+        for option in self.options:
+            option.onDrawOrderTiebreakerChange()
     
     
     def draw(self, screen, a, b):
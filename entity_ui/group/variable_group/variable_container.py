@@ -38,9 +38,15 @@ class VariableContainer(Container, LinkedListNode['VariableContainer'], ABC, Gen
         super().changeParent(newParent)
         self.group = newParent
     
+    # let the VariableGroupContainer know which container changed size, so that
+    # it only has to recompute the containers affected by the change
+    def propagateChange(self):
+        self.group.propagateContainerChange(self)
+
     # set by VariableGroupContainer. Size refers to x if isHorizontal, else y
     def setPosition(self, position: int):
         self._POSITION_FROM_VGC = position
+        self.onDrawOrderTiebreakerChange()
 
     def defineLeftX(self) -> float:
         if self.isHorizontal:
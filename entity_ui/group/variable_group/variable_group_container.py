@@ -1,4 +1,5 @@
 from typing import Callable, Generic, TypeVar
+from data_structures.fenwick_tree import FenwickTree
 from data_structures.linked_list import LinkedList
 from data_structures.observer import Observable
 from entity_base.container_entity import Container
@@ -30,10 +31,22 @@ Calling recomputePosition() on this class does the following things in this orde
 3. Update width/height of VGC
 3. Call recomputePosition() on all VariableContainers as specified in Entity class
 It is an expensive operation. Attempt not to call this more than once per tick.
+
+Container sizes are cached in a Fenwick tree in list order, so the position of any container
+and the total size are O(log n). When only some containers changed size in a tick (ie. command
+blocks animating their expansion), onTickEnd() does not recompute the whole VGC. It recomputes
+the containers that changed size, and only moves the containers after them whose position
+actually changed. Anything else (containers added or removed, or propagateChange() called on the
+VGC itself) falls back to the full recomputePosition().
 """
 T = TypeVar('T')
 class VariableGroupContainer(Container, Generic[T], Observable):
 
+    # containers are positioned in defineBefore()
+    definesChildrenInHooks = True
+
+    POSITION_TOLERANCE = 1e-6
+
     def __init__(self, parent: Entity, isHorizontal: bool, innerMargin: int = 0, outerMargin: int = 0,
                  name: str = ""):
 
@@ -45,23 +58,46 @@ class VariableGroupContainer(Container, Generic[T], Observable):
         self.innerMargin = innerMargin
         self.outerMargin = outerMargin
 
+        # container sizes in list order, and the index of each container in that order
+        self.sizes = FenwickTree()
+        self.order: list[VariableContainer[T]] = []
+        self.indices: dict[VariableContainer[T], int] = {}
+
+        # containers.version when sizes were last built. If different, the list has changed
+        self.layoutVersion: int = None
+
+        # containers that changed size since the last tick end
+        self.changedContainers: set[VariableContainer[T]] = set()
+        self.needFullRecompute = True
+
         super().__init__(parent = parent, tick = TickLambda(self, FonTickEnd = self.onTickEnd))
         self.needToRecompute = False
 
 
-    # VariableContainer should call this whenever its size changes. O(1), so call as many
+    # Call whenever something other than a single container's size changes. O(1), so call as many
     # times as you want in a single tick
     def propagateChange(self):
         # Instead of calling updateContainerPositions() directly, set a flag
         # so it will be called on tick end
         self.needToRecompute = True
+        self.needFullRecompute = True
+        super().propagateChange()
+
+    # VariableContainer calls this whenever its size changes. O(1), so call as many
+    # times as you want in a single tick
+    def propagateContainerChange(self, container: VariableContainer[T]):
+        self.needToRecompute = True
+        self.changedContainers.add(container)
         super().propagateChange()
         
     # onTickEnd guarantees that, if there's nesting, children VGCs will update
     # before parent VGCs
     def onTickEnd(self):
         if self.needToRecompute:
-            self.recomputeEntity() # this calls updateContainerPositions() at some point
+            if not self.updateChangedContainers():
+                self.needFullRecompute = True
+                self.recomputeEntity() # this calls updateContainerPositions() at some point
+            self.changedContainers.clear()
             self.needToRecompute = False
             self.notify()
 
@@ -72,7 +108,10 @@ class VariableGroupContainer(Container, Generic[T], Observable):
         self.updateContainerPositions()
 
 
-    # Iteratively update the position of each VariableContainer
+    def _defineContainerSize(self, container: VariableContainer[T]) -> float:
+        return container.defineWidth() if self.isHorizontal else container.defineHeight()
+
+    # Iteratively update the position of each VariableContainer, and rebuild the cached sizes
     def updateContainerPositions(self):
 
         inner = self._getMargin(self.innerMargin)
@@ -83,39 +122,139 @@ class VariableGroupContainer(Container, Generic[T], Observable):
         # add upper outer margin
         pos = startPos + outer
 
-        container = self.containers.head
-        while container is not None:
+        self.order = list(self.containers)
+        self.indices = {container: i for i, container in enumerate(self.order)}
+        sizes = []
+
+        for container in self.order:
 
             # set the position of the container
             container.setPosition(pos)
             
             # use container size to find position of next container
-            pos += container.defineWidth() if self.isHorizontal else container.defineHeight()
+            size = self._defineContainerSize(container)
+            sizes.append(size)
+            pos += size + inner
+
+        self.sizes.build(sizes)
+        self.layoutVersion = self.containers.version
+        self.changedContainers.clear()
+        self.needFullRecompute = False
+
+    # Position of the container at the given index in the list. O(log n)
+    def getContainerPosition(self, index: int) -> float:
+        inner = self._getMargin(self.innerMargin)
+        outer = self._getMargin(self.outerMargin)
+        startPos = self.LEFT_X if self.isHorizontal else self.TOP_Y
+        return startPos + outer + self.sizes.prefixSum(index) + index * inner
+
+    # Recompute only the containers that changed size since the last tick end, and move the
+    # containers whose position changed as a result. Returns false if the whole VGC needs
+    # to be recomputed instead
+    def updateChangedContainers(self) -> bool:
+
+        if self.needFullRecompute or self.layoutVersion != self.containers.version:
+            return False
+        if "RECT" not in self.__dict__ or not self.isVisible():
+            return False
+        if any(container not in self.indices for container in self.changedContainers):
+            return False
+
+        changed = sorted(self.indices[container] for container in self.changedContainers)
+        for i in changed:
+            self.sizes.set(i, self._defineContainerSize(self.order[i]))
+        self.changedContainers.clear()
 
-            # Go to next container, if any
-            container = container.getNext()
+        # the size of this VGC may have changed. Containers are positioned from the VGC, so
+        # recompute it first, but without recomputing all the containers
+        self.recomputeSize()
+        self.recomputePosition()
 
-            if container is None:
+        last = changed[-1]
+        changed = set(changed)
+        for i in range(min(changed), len(self.order)):
+            container = self.order[i]
+            position = self.getContainerPosition(i)
+            delta = position - container._POSITION_FROM_VGC
+
+            # sums are not added up in the same order as a full recompute, so ignore rounding errors
+            moved = abs(delta) > self.POSITION_TOLERANCE
+
+            if i in changed:
+                container.setPosition(position)
+                container.recomputeEntity()
+            elif moved:
+                container.setPosition(position)
+                self._translateContainer(container, position)
+            elif i > last:
+                # nothing after the last changed container moves either
                 break
+
+        return True
+
+    # The containers that overlap [low, high], in list order, found by binary searching the cached
+    # positions. O(log^2 n) plus the number of containers returned. Positions are the ones from the
+    # last layout, which is where the containers are drawn. None if containers were added or removed
+    # since then, in which case the VGC notifies once they are laid out
+    def getContainersInRange(self, low: float, high: float) -> list[VariableContainer[T]] | None:
+
+        if self.layoutVersion != self.containers.version:
+            return None
+        if "RECT" not in self.__dict__:
+            return None
+
+        inner = self._getMargin(self.innerMargin)
+        count = len(self.order)
+
+        # first container that ends at or after low
+        first, last = 0, count
+        while first < last:
+            middle = (first + last) // 2
+            if self.getContainerPosition(middle + 1) - inner < low:
+                first = middle + 1
+            else:
+                last = middle
+
+        # first container that starts after high
+        start = first
+        last = count
+        while start < last:
+            middle = (start + last) // 2
+            if self.getContainerPosition(middle) <= high:
+                start = middle + 1
             else:
-                pos += inner
+                last = middle
+
+        return self.order[first:start]
+
+    # Move the container and its subtree to the position. The rect is rounded the same way
+    # recomputePosition() rounds it, so that it ends up exactly where a full recompute puts it
+    def _translateContainer(self, container: VariableContainer, position: float):
+
+        if "RECT" not in container.__dict__:
+            return
+
+        if self.isHorizontal:
+            delta = int(round(position)) - container.LEFT_X
+            if delta != 0:
+                container.translateEntity(delta, 0)
+        else:
+            delta = int(round(position)) - container.TOP_Y
+            if delta != 0:
+                container.translateEntity(0, delta)
 
     def getSize(self):
 
         inner = self._getMargin(self.innerMargin)
         outer = self._getMargin(self.outerMargin)
 
-        size = 2 * outer
-        container = self.containers.head
-        while container is not None:
-            size += container.defineWidth() if self.isHorizontal else container.defineHeight()
-            container = container.getNext()
+        # cached sizes are only up to date once pending changes are handled at tick end
+        if self.changedContainers or self.needFullRecompute or self.layoutVersion != self.containers.version:
+            sizes = [self._defineContainerSize(container) for container in self.containers]
+            return 2 * outer + sum(sizes) + max(0, len(sizes) - 1) * inner
 
-            if container is None:
-                break
-            else:
-                size += inner
-        return size
+        count = len(self.sizes)
+        return 2 * outer + self.sizes.total + max(0, count - 1) * inner
 
     def defineLeftX(self) -> float:
         if self.isHorizontal:
@@ -11,7 +11,19 @@ class ScrollingContentContainer(Container, Observer):
         super().__init__(parent = parentContainer, drawOrder = drawOrder)
 
         self.scrollbar = scrollbarContainer.scrollbar
-        self.scrollbar.subscribe(self, onNotify = self.recomputeEntity)
+        self.scrollbar.subscribe(self, onNotify = self.onScroll)
+
+    # Scrolling only changes the y offset of the content, so move the already computed
+    # rects instead of recomputing every entity inside the container
+    def onScroll(self):
+
+        # a full recompute is still needed if this container was never laid out or was resized
+        if "RECT" not in self.__dict__ or self.defineWidth() != self.WIDTH or self.defineHeight() != self.HEIGHT:
+            self.recomputeEntity()
+            return
+
+        x, y = self.defineTopLeft()
+        self.translateEntity(int(round(x)) - self.LEFT_X, int(round(y)) - self.TOP_Y)
 
     def defineTopLeft(self) -> tuple:
         return self._px(0), self._py(0) + self.scrollbar.getScrollOffset()
@@ -25,10 +25,12 @@ class InvertDirectionAction(MenuClickAction[PathSegmentEntity]):
     def onClick(self, targetEntity: PathSegmentEntity, mouse: tuple):
         targetEntity.toggleDirection()
 
-# When clicked, splits segment and creates temporary node that follows mouse
+# When clicked, splits segment and creates temporary node that follows mouse.
+# The node starts out exactly on the curve, at the point closest to the mouse
 class InsertNodeAction(MenuClickAction[PathSegmentEntity]):
     def onClick(self, targetEntity: PathSegmentEntity, mouse: tuple):
-        newNode = targetEntity.path.insertNode(targetEntity, PointRef(Ref.SCREEN, mouse), isTemporary = True)
+        closest = targetEntity.project(PointRef(Ref.SCREEN, mouse).fieldRef).point
+        newNode = targetEntity.path.insertNode(targetEntity, PointRef(Ref.FIELD, closest), isTemporary = True)
         return newNode
     
 # When clicked, splits segment and creates temporary node that follows mouse
@@ -30,6 +30,14 @@ class MenuLineEntity(Entity):
 
     def isTouching(self, mouse: tuple) -> float:
         return False
+    
+    # bounding box of the curve
+    def getDrawBounds(self) -> list:
+        if "points" not in self.__dict__:
+            return self.RECT
+        xs = [point[0] for point in self.points]
+        ys = [point[1] for point in self.points]
+        return [min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)]
 
     # Draws the background of the menu
     def draw(self, screen: pygame.Surface, isActive: bool, isHovered: bool):
@@ -42,6 +50,10 @@ class MenuLineEntity(Entity):
 
     # calculate bezier curve
     def defineAfter(self):
+
+        # repaint where the old curve was
+        self.markDirty()
+
         # first and third point is the closest corner on the menu to the entity
         # second point is the closest corner plus delta in that direction
         ep = [self.entity.CENTER_X, self.entity.CENTER_Y]
@@ -79,3 +91,4 @@ class MenuLineEntity(Entity):
         self.p2 = (x2, y2)
         self.p3 = (self.entity.CENTER_X, self.entity.CENTER_Y)
         self.points = generate_quadratic_points(self.p1, self.p2, self.p3, 2)
+        self.markDirty()
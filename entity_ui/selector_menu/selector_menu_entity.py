@@ -42,7 +42,7 @@ class SelectorMenuEntity(Entity, Observer):
         self.BORDER_RADIUS = 5
 
         self.selectedEntity = selectedEntity
-        selectedEntity.subscribe(self, onNotify = self.recomputeEntity)
+        selectedEntity.subscribe(self, onNotify = self.requestRecompute)
 
         # Both this object and the individual menu images have this lambda.
         # So, when either the menu background or menu buttons are dragged,
@@ -8,11 +8,13 @@ from entity_ui.text.text_border import TextBorder
 
 from entity_base.listeners.click_listener import ClickLambda
 from entity_base.listeners.key_listener import KeyLambda
+from entity_base.listeners.tick_listener import TickLambda
 from entity_base.listeners.select_listener import SelectLambda, SelectorType
 
 from common.font_manager import DynamicFont, FontID
 from utility.math_functions import isInsideBox2
 from common.draw_order import DrawOrder
+from common.frame_scheduler import FrameScheduler
 
 from enum import Enum, auto
 import pygame
@@ -67,7 +69,8 @@ class TextEditorEntity(Entity, Observer, Observable):
                 FonSelect = self.onSelect,
                 FonDeselect = self.onDeselect
             ),
-            hover = HoverLambda(self))
+            hover = HoverLambda(self),
+            tick = TickLambda(self, FonTickStart = self.onTick))
         self.font = self.fonts.getDynamicFont(fontID, fontSize)
         
         self.dynamic = isDynamic # whether to grow vertically
@@ -103,9 +106,15 @@ class TextEditorEntity(Entity, Observer, Observable):
 
 
 
+    # the blinking cursor needs to be repainted every frame while writing
+    def onTick(self):
+        if self.mode == TextEditorMode.WRITE:
+            self.markDirty()
+            FrameScheduler.requestFrame()
+
     def onFontUpdate(self):
         self.textHandler.update()
-        self.recomputeEntity()
+        self.requestRecompute()
 
     def setRows(self, rows):
         self.rows = rows
@@ -152,6 +161,14 @@ class TextEditorEntity(Entity, Observer, Observable):
     def getText(self) -> str:
         return self.textHandler.getText()
 
+    # Set the text without notifying observers, like restoring a stored value
+    def setText(self, text: str):
+        if text == self.getText():
+            return
+        self.textHandler.setText(text.split("\n"))
+        self.markDirty()
+        self.propagateChange()
+
     def isTouching(self, position: tuple) -> bool:
         return isInsideBox2(*position, *self.RECT)
 
@@ -206,19 +223,27 @@ class TextEditorEntity(Entity, Observer, Observable):
 
         # notify observers on text change
         if self.getText() != oldText:
+            self.markDirty()
             self.notify()
 
         if self.defineHeight() != oldHeight:
             self.propagateChange()
 
+        # captured, so that typing does not reach anything else
+        return True
+
     def onKeyUp(self, key):
-        pass
+        return self.mode == TextEditorMode.WRITE
 
+    # takes keyboard focus while being written in
     def onSelect(self, interactor):
         self.setMode(TextEditorMode.WRITE)
+        self.entities.input.setFocus(self)
 
     def onDeselect(self, interactor):
         self.setMode(TextEditorMode.READ)
+        self.entities.input.clearFocus(self)
 
     def setMode(self, mode: TextEditorMode):
-        self.mode = mode
\ No newline at end of file
+        self.mode = mode
+        self.markDirty()
\ No newline at end of file
@@ -31,6 +31,13 @@ class TextHandler:
 
         self.update()
 
+    # Replace all the text, and move the cursor to the end
+    def setText(self, text: list[str]):
+        self.text = text.copy() if len(text) > 0 else [""]
+        self.cursorY = len(self.text) - 1
+        self.cursorX = len(self.text[self.cursorY])
+        self.update()
+
     def getCursor(self) -> tuple:
         return self.cursorX, self.cursorY
  
@@ -183,7 +190,7 @@ class TextHandler:
         self.fullText = ""
         for textLine in self.text:
             self.fullText += textLine + "\n"
-        self.fullText = self.fullText[-1]
+        self.fullText = self.fullText[:-1]
 
         self.maxSurfaceWidth = max(surface.get_width() for surface in self.textSurfaces)
 
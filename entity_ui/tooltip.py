@@ -64,8 +64,8 @@ class Tooltip(Observer):
 
         self.tooltip = tooltipSurface
 
-    # Draw the tooltip approximately where the mouse position is
-    def draw(self, screen: pygame.Surface, mousePosition: tuple, dimensions: Dimensions):
+    # Get the rect the tooltip is drawn in, approximately where the mouse position is
+    def getRect(self, mousePosition: tuple, dimensions: Dimensions) -> pygame.Rect:
 
         Y_SEPARATION_FROM_MOUSE: int = -45
         
@@ -80,7 +80,11 @@ class Tooltip(Observer):
         if y + self.tooltip.get_height() > dimensions.SCREEN_HEIGHT:
             y = int(mousePosition[1] - self.tooltip.get_height() - 10)
 
-        screen.blit(self.tooltip, (x,y))
+        return pygame.Rect(x, y, self.tooltip.get_width(), self.tooltip.get_height())
+
+    # Draw the tooltip approximately where the mouse position is
+    def draw(self, screen: pygame.Surface, mousePosition: tuple, dimensions: Dimensions):
+        screen.blit(self.tooltip, self.getRect(mousePosition, dimensions))
 
 # Entities that have tooltips should implement this
 class TooltipOwner(ABC):
@@ -92,4 +96,10 @@ class TooltipOwner(ABC):
     def drawTooltip(self, screen: pygame.Surface, mousePosition: tuple, dimensions: Dimensions):
         tooltip = self.getTooltip()
         if tooltip is not None:
-            tooltip.draw(screen, mousePosition, dimensions)
\ No newline at end of file
+            tooltip.draw(screen, mousePosition, dimensions)
+
+    def getTooltipRect(self, mousePosition: tuple, dimensions: Dimensions) -> pygame.Rect | None:
+        tooltip = self.getTooltip()
+        if tooltip is None:
+            return None
+        return tooltip.getRect(mousePosition, dimensions)
\ No newline at end of file
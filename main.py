@@ -35,6 +35,7 @@ from common.reference_frame import PointRef, Ref, initReferenceframe, VectorRef
 from common.field_transform import FieldTransform
 from common.dimensions import Dimensions
 from common.draw_order import DrawOrder
+from common.frame_scheduler import FrameScheduler
 from utility.pygame_functions import getGradientSurface
 from utility.math_functions import isInsideBox2
 import pygame, random, threading, time, json
@@ -61,6 +62,9 @@ def io_handler(database: CommandDefinitionDatabase):
         elif cmd == "forward":
             database.registerDefinition(goToPoint())
 
+        # the main loop may be blocked waiting for input, so wake it up to show the change
+        FrameScheduler.wake()
+
 
 
 def main():
@@ -83,6 +87,10 @@ def main():
     # Initialize entities
     interactor = Interactor(dimensions, fieldTransform)
     entities = EntityManager()
+
+    # opt-in: only repaint the parts of the screen that changed
+    entities.setDirtyRectMode("--dirty-rects" in sys.argv)
+
     initEntityClass(entities, interactor, images, fontManager, dimensions, fieldTransform)
     rootContainer = entities.initRootContainer()
     setRootContainer(rootContainer)
@@ -105,13 +113,16 @@ def main():
     # create tabs
     tabHandler = TabHandler(panelContainer, database)
 
+    # opt-in: only create the widgets of commands near the viewport
+    tabHandler.blockContainer.commandHandler.setVirtualized("--virtualize-commands" in sys.argv)
+
     # Create path
     path = Path(fieldContainer, tabHandler.blockContainer, database, PointRef(Ref.FIELD, (24,24)))
     fieldContainer.initPath(path)
 
     # initialize pygame artifacts
     pygame.display.set_caption("Pathogen 4.0 (Ansel Chang)")
-    clock = pygame.time.Clock()
+    scheduler = FrameScheduler()
 
     # initialize everything
     rootContainer.recomputeEntity()
@@ -123,8 +134,13 @@ def main():
     io_thread.start()
 
     # Main game loop
+    lastCaptionState = None
+    FrameScheduler.requestFrame() # draw the first frame immediately
     while True:
 
+        # block until there is input or something to animate
+        events = scheduler.waitForEvents(interactor.leftDragging or interactor.rightDragging)
+
         dimensions.RESIZED_THIS_FRAME = False
 
         mouse = pygame.mouse.get_pos()
@@ -133,15 +149,30 @@ def main():
         mouseRef = PointRef(Ref.SCREEN, mouse)
         hoveredEntity = entities.getEntityAtPosition(mouse)
 
-        if hoveredEntity is not None:
-            parent = f", {str(hoveredEntity._parent)}"
-        else:
-            parent = ""
-        pygame.display.set_caption(f"({mouse[0]}, {mouse[1]}), {str(hoveredEntity)}" + parent)
+        # layout work done for the previous frame
+        layoutCounters = str(entities.layout)
+        entities.layout.resetCounters()
+
+        # only rebuild the debug caption when it would actually change
+        if (mouse, hoveredEntity, layoutCounters) != lastCaptionState:
+            lastCaptionState = (mouse, hoveredEntity, layoutCounters)
+            if hoveredEntity is not None:
+                parent = f", {str(hoveredEntity._parent)}"
+            else:
+                parent = ""
+            pygame.display.set_caption(f"({mouse[0]}, {mouse[1]}), {str(hoveredEntity)}" + parent + f", {layoutCounters}")
 
         interactor.setHoveredEntity(hoveredEntity, mouse)
         # handle events and call callbacks
-        for event in pygame.event.get():
+        for event in events:
+
+            scheduler.onEvent(event)
+
+            # discrete events (clicks, keys, resizing, zooming, window events) can change
+            # the appearance of anything, so repaint everything. Mouse motion is handled incrementally
+            if event.type != pygame.MOUSEMOTION:
+                entities.markAllDirty()
+
             if event.type == pygame.QUIT:
                 pygame.quit()
                 sys.exit()
@@ -162,20 +193,16 @@ def main():
             elif event.type == pygame.MOUSEMOTION:
                 interactor.onMouseMove(entities, mouse)
             elif event.type == pygame.KEYDOWN:
-                entities.onKeyDown(event.key)
+                entities.onKeyDown(interactor, event.key)
             elif event.type == pygame.KEYUP:
-                entities.onKeyUp(event.key)
+                entities.onKeyUp(interactor, event.key)
 
         # Perform calculations
         entities.tick()
 
-        # Draw everything
+        # Draw everything and update display
         entities.drawEntities(interactor, screen, mouse, dimensions)
-
-        # Update display and maintain frame rate
-        pygame.display.flip()
-        clock.tick(60) # fps
-        #print(clock.get_fps())
+        #print(scheduler.clock.get_fps())
 
 if __name__ == "__main__":
     #cProfile.run('main()', sort='cumtime')
@@ -40,8 +40,9 @@ class FieldContainer(entity.Entity, Observer):
             drawOrder = DrawOrder.FIELD_BACKGROUND)
         self.fieldTransform = fieldTransform
 
-        # Whenever field is dragged, update entities on field
-        self.fieldTransform.subscribe(self, onNotify = self.recomputeEntity)
+        # Whenever field is dragged, update entities on field. Entities on the field depend on
+        # the transform and not on the field rect, so the whole subtree must be recomputed
+        self.fieldTransform.subscribe(self, onNotify = lambda: self.requestRecompute(recomputeChildren = True))
 
 
     def initPath(self, path: Path):
@@ -49,6 +50,10 @@ class FieldContainer(entity.Entity, Observer):
 
     def defineTopLeft(self) -> tuple:
         return 0, 0
+    
+    # field image depends on pan and zoom, not just the rect
+    def defineAfter(self):
+        self.markDirty()
 
     # must impl both of these if want to contain other entity
     def defineWidth(self) -> float:
@@ -78,7 +78,7 @@ class ArcCurveNode(AbstractCircleEntity, Observable):
         # Theta from M to P (position)
         theta = (self.B - self.A).theta() + math.pi/2
         self.positionRef = self.segmentMidpoint + VectorRef(Ref.FIELD, magnitude = self.perpDistance, heading = theta)
-        self.recomputeEntity()
+        self.requestRecompute()
 
     # return cached position in screen coordinates
     def defineCenter(self) -> tuple:
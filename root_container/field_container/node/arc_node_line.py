@@ -25,6 +25,10 @@ class ArcNodeLine(Entity):
 
     def isTouching(self, point: tuple) -> bool:
         return False
+    
+    # lines can extend across the whole field
+    def getDrawBounds(self) -> list:
+        return self._fieldBounds()
 
     # draw from self.a to self.b, which is from the arcCurveNode to the midpoint
     def draw(self, screen: pygame.Surface, isActive: bool, isHovered: bool):
@@ -29,6 +29,10 @@ class BezierLines(Entity):
     def isTouching(self, point: tuple) -> bool:
         return False
     
+    # lines can extend across the whole field
+    def getDrawBounds(self) -> list:
+        return self._fieldBounds()
+    
     def isVisible(self):
 
         if self.segment.getSegmentType() != PathSegmentType.BEZIER:
@@ -48,23 +48,34 @@ class Constraints(Entity):
 
     def clearThetaConstraints(self):
         self.thetaConstraints.clear()
+        self.markDirty()
 
     def clearPositionConstraints(self):
         self.positionConstraints.clear()
+        self.markDirty()
 
     def showPosition(self):
+        if not self.visiblePosition:
+            self.markDirty()
         self.visiblePosition = True
 
     def hidePosition(self):
+        if self.visiblePosition:
+            self.markDirty()
         self.visiblePosition = False
 
     def showTheta(self):
+        if not self.visibleTheta:
+            self.markDirty()
         self.visibleTheta = True
 
     def hideTheta(self):
+        if self.visibleTheta:
+            self.markDirty()
         self.visibleTheta = False  
 
     def resetPositionConstraints(self, mouse: PointRef):
+        self.markDirty()
         self.mouse = mouse
         self.positionConstraints.clear()
         self.thetaConstraints.clear()
@@ -117,6 +128,7 @@ class Constraints(Entity):
         return PointRef(Ref.FIELD, new)
     
     def resetThetaConstraints(self, myTheta: float, position: PointRef):
+        self.markDirty()
         self.myTheta = myTheta
         self.position = position
         self.thetaConstraintFound = False
@@ -158,6 +170,10 @@ class Constraints(Entity):
     def isTouching(self, position: PointRef) -> bool:
         return False
     
+    # constraint lines can extend across the whole field
+    def getDrawBounds(self) -> list:
+        return self._fieldBounds()
+    
     def _point(self, startPoint, distance, theta):
         return startPoint[0] + distance * math.cos(theta), startPoint[1] + distance * math.sin(theta)
 
@@ -27,6 +27,10 @@ class NodeLine(Entity):
 
     def isTouching(self, point: tuple) -> bool:
         return False
+    
+    # lines can extend across the whole field
+    def getDrawBounds(self) -> list:
+        return self._fieldBounds()
 
     # draw the two lines if conditions are met.
     # In addition, check if there is already a constraint. if so, don't draw
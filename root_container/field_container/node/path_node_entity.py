@@ -70,7 +70,7 @@ class PathNodeEntity(AbstractCircleEntity, AdapterInterface, PathElement[PathSeg
             ),
             select = SelectLambda(self, "path node", FgetHitbox = self.getHitbox),
             hover = HoverLambda(self, FonHoverOff = self.onHoverOff, FonHoverOn = self.onHoverOn),
-            key = KeyLambda(self, FonKeyDown = self.onKeyDown, FonKeyUp = self.onKeyUp),
+            key = KeyLambda(self, FonKeyDown = self.onKeyDown),
             drawOrder = DrawOrder.NODE
             )
         
@@ -88,13 +88,15 @@ class PathNodeEntity(AbstractCircleEntity, AdapterInterface, PathElement[PathSeg
         self.temporary = temporary
         self.lastDragPositionValid = False
 
+        # the position computed by canDrag(), reused by onDrag() for the same mouse position
+        self.dragGoalMouse: tuple = None
+        self.dragGoalPosition: PointRef = None
+
 
         self.dragging = True
         SNAPPING_POWER = 5 # in pixels
         self.constraints = Constraints(fieldContainer, SNAPPING_POWER)
 
-        self.shiftKeyPressed = False
-
         self.updateAdapter()
 
         NodeLine(self)
@@ -145,16 +147,20 @@ class PathNodeEntity(AbstractCircleEntity, AdapterInterface, PathElement[PathSeg
             start, end = 0,0
 
         self.START_THETA, self.END_THETA = start, end
-            
-        self.adapter.set(PathAttributeID.THETA1, start, formatDegrees(start, 1))
-        self.adapter.set(PathAttributeID.THETA2, end, formatDegrees(end, 1))
 
-        direction = deltaInHeading(start, end)
-        self.adapter.setIconStateID(TurnDirection.RIGHT if direction >= 0 else TurnDirection.LEFT)
+        with self.adapter.batch():
+            self.adapter.setValues({
+                PathAttributeID.THETA1: (start, lambda theta: formatDegrees(theta, 1)),
+                PathAttributeID.THETA2: (end, lambda theta: formatDegrees(theta, 1))
+            })
+
+            direction = deltaInHeading(start, end)
+            self.adapter.setIconStateID(TurnDirection.RIGHT if direction >= 0 else TurnDirection.LEFT)
 
-        self.adapter.setTurnEnabled(self.isTurnEnabled())
+            self.adapter.setTurnEnabled(self.isTurnEnabled())
 
-        self.recomputeEntity()
+        # called for every neighbor on every drag event, so only recompute once per frame
+        self.requestRecompute(recomputeChildren = True)
 
     # gets the start theta, adjusted for segment direction.
     # returns None if there is no previous node
@@ -244,20 +250,29 @@ class PathNodeEntity(AbstractCircleEntity, AdapterInterface, PathElement[PathSeg
         if self.getPrevious() is not None:
             self.getPrevious().onNodeStopDrag()
 
-    def canDrag(self, mouseTuple: tuple) -> bool:
+    # The node position if dragged to the mouse position
+    def getDragPosition(self, mouseTuple: tuple) -> PointRef:
         mouse = PointRef(Ref.SCREEN, mouseTuple)
-        pos: PointRef = self.startPosition + (mouse - self.mouseStartDrag)
+        return self.startPosition + (mouse - self.mouseStartDrag)
+
+    def canDrag(self, mouseTuple: tuple) -> bool:
+        pos = self.getDragPosition(mouseTuple)
+        self.dragGoalMouse, self.dragGoalPosition = mouseTuple, pos
         self.lastDragPositionValid = False # See if canDrag() is matched with onDrag() after. If so, valid
         return isInsideBox(*pos.fieldRef, 0, 0, 144, 144) and isInsideBox(*mouseTuple, *self.fieldContainer.RECT)
 
     def onDrag(self, mouseTuple: PointRef):
         self.lastDragPositionValid = True
 
-        mouse = PointRef(Ref.SCREEN, mouseTuple)
-        self.position = self.startPosition + (mouse - self.mouseStartDrag)
+        # canDrag() is called with the same mouse position right before, so its position can be reused
+        if self.dragGoalPosition is not None and self.dragGoalMouse == mouseTuple:
+            self.position = self.dragGoalPosition
+        else:
+            self.position = self.getDragPosition(mouseTuple)
+        self.dragGoalMouse, self.dragGoalPosition = None, None
 
         # if the only one being dragged and shift key not pressed, constrain with snapping
-        if self.interactor.selected.hasOnly(self) and not self.shiftKeyPressed:
+        if self.interactor.selected.hasOnly(self) and not self.entities.input.isKeyPressed(pygame.K_LSHIFT):
             self.constraints.resetPositionConstraints(self.position)
             self.constrainPosition()
             self.position = self.constraints.getPosition()
@@ -283,10 +298,10 @@ class PathNodeEntity(AbstractCircleEntity, AdapterInterface, PathElement[PathSeg
             raise ValueError("Segment is not connected to this node")
         
 
+    # Only called while selected. Whether shift is held is read from the input router
     def onKeyDown(self, key):
         if key == pygame.K_LSHIFT:
             self.constraints.clear()
-            self.shiftKeyPressed = True
 
         # delete node if temporary
         if (key == pygame.K_ESCAPE or key == pygame.K_BACKSPACE) and self.temporary:
@@ -295,10 +310,6 @@ class PathNodeEntity(AbstractCircleEntity, AdapterInterface, PathElement[PathSeg
             self.interactor.disableUntilMouseUp = False
             self.interactor.leftDragging = False
 
-    def onKeyUp(self, key):
-        if key == pygame.K_LSHIFT:
-            self.shiftKeyPressed = False
-
     # "Snaps" to neighbors. Documentation in ConstraintManager
     def constrainPosition(self):
 
@@ -9,8 +9,11 @@ from root_container.field_container.segment.segment_direction import SegmentDire
 from root_container.field_container.segment.segment_type import PathSegmentType
 from utility.angle_functions import deltaInHeading, headingDiff
 from utility.format_functions import formatDegrees, formatInches
-from utility.math_functions import arcCenterFromTwoPointsAndTheta, arcFromThreePoints, distancePointToLine, distanceTuples, getArcMidpoint, pointTouchingLine, thetaFromArc, thetaFromPoints
-from utility.pygame_functions import drawArcFromCenterAngles, drawLine, drawVector
+from utility.math_functions import arcCenterFromTwoPointsAndTheta, arcFromThreePoints, distancePointToLine, distanceTuples, getArcMidpoint, thetaFromArc, thetaFromPoints
+from utility.projection_functions import CurveProjection, arcBoundingBox, projectOntoArc
+from utility.pygame_functions import drawPolyline
+from utility.segment_geometry import SegmentGeometry, arcGeometry
+from utility.tessellation import tessellateArc
 if TYPE_CHECKING:
     from root_container.field_container.segment.path_segment_entity import PathSegmentEntity
     from root_container.field_container.node.path_node_entity import PathNodeEntity
@@ -93,6 +96,7 @@ class ArcSegmentState(PathSegmentState):
             self.THETA1 = ct1 - math.pi/2
             self.THETA2 = ct3 - math.pi/2
 
+        self.recomputeBoundingBox()
         self.notify()
 
     # attempt to constraint self.THETA1 and self.THETA2 to the opposing thetas for their nodes
@@ -173,10 +177,12 @@ class ArcSegmentState(PathSegmentState):
             deltaAngle = (-deltaAngle) % (math.pi*2)
         self.ARC_LENGTH = ScalarRef(Ref.FIELD, deltaAngle * self.RADIUS.fieldRef)
 
+        self.recomputeBoundingBox()
+
         # brute force finding which direction it is
         p2Theta = ct1 + deltaInHeading(ct3, ct1) / 2
         self.p2 = self.CENTER + VectorRef(Ref.FIELD, magnitude = self.RADIUS.fieldRef, heading = p2Theta)
-        if not self.isTouching(self.p2.screenRef):
+        if not self.isAngleInside(p2Theta):
             self.p2 = self.CENTER + VectorRef(Ref.FIELD, magnitude = self.RADIUS.fieldRef, heading = p2Theta + math.pi)
 
         # now, force ArcCurveNode to this new position
@@ -199,20 +205,18 @@ class ArcSegmentState(PathSegmentState):
 
         self.recalculateArcFromArcCurveNode()
 
-        # Set positions
-        self.adapter.set(PathAttributeID.X1, self.p1.fieldRef[0], formatInches(self.p1.fieldRef[0]))
-        self.adapter.set(PathAttributeID.Y1, self.p1.fieldRef[1], formatInches(self.p1.fieldRef[1]))
-        self.adapter.set(PathAttributeID.X2, self.p3.fieldRef[0], formatInches(self.p3.fieldRef[0]))
-        self.adapter.set(PathAttributeID.Y2, self.p3.fieldRef[1], formatInches(self.p3.fieldRef[1]))
-
-        self.adapter.set(PathAttributeID.XCENTER, self.CENTER.fieldRef[0], formatInches(self.CENTER.fieldRef[0]))
-        self.adapter.set(PathAttributeID.YCENTER, self.CENTER.fieldRef[1], formatInches(self.CENTER.fieldRef[1]))
-        self.adapter.set(PathAttributeID.RADIUS, self.RADIUS.fieldRef, formatInches(self.RADIUS.fieldRef))
-
-        self.adapter.set(PathAttributeID.ARC_LENGTH, self.ARC_LENGTH.fieldRef, formatInches(self.ARC_LENGTH.fieldRef))
-
-        self.adapter.set(PathAttributeID.THETA1, self.THETA1, formatDegrees(self.THETA1))
-        self.adapter.set(PathAttributeID.THETA2, self.THETA2, formatDegrees(self.THETA2))
+        self.adapter.setValues({
+            PathAttributeID.X1: (self.p1.fieldRef[0], formatInches),
+            PathAttributeID.Y1: (self.p1.fieldRef[1], formatInches),
+            PathAttributeID.X2: (self.p3.fieldRef[0], formatInches),
+            PathAttributeID.Y2: (self.p3.fieldRef[1], formatInches),
+            PathAttributeID.XCENTER: (self.CENTER.fieldRef[0], formatInches),
+            PathAttributeID.YCENTER: (self.CENTER.fieldRef[1], formatInches),
+            PathAttributeID.RADIUS: (self.RADIUS.fieldRef, formatInches),
+            PathAttributeID.ARC_LENGTH: (self.ARC_LENGTH.fieldRef, formatInches),
+            PathAttributeID.THETA1: (self.THETA1, formatDegrees),
+            PathAttributeID.THETA2: (self.THETA2, formatDegrees)
+        })
 
         if self.segment.getDirection() == SegmentDirection.FORWARD:
             icon = ArcIconID.FORWARD_LEFT if self.POSITIVE else ArcIconID.FORWARD_RIGHT
@@ -227,25 +231,28 @@ class ArcSegmentState(PathSegmentState):
         return self.THETA2
 
 
-    # Checks if it inside the start/stop angle range, and
-    # if screenRef of magnitudes are within some margin
-    def isTouching(self, mouse: tuple) -> bool:
-
-        ctm = thetaFromPoints(self.CENTER.screenRef, mouse)
-        rctm = (ctm - self.CT1) % (math.pi*2)
+    # Checks if the angle from the center is inside the start/stop angle range
+    def isAngleInside(self, angle: float) -> bool:
+        rctm = (angle - self.CT1) % (math.pi*2)
         rtc3 = (self.CT3 - self.CT1) % (math.pi*2)
         angleInside = rtc3 < rctm
 
         if self.POSITIVE:
             angleInside = not angleInside
+        return angleInside
 
-        if not angleInside:
-            return False
+    def recomputeBoundingBox(self):
+        self.BOUNDING_BOX = arcBoundingBox(self.CENTER.fieldRef, self.RADIUS.fieldRef, self.START_ANGLE, self.STOP_ANGLE, self.POSITIVE)
 
-        # not in start/stop angle range
-        # check if mouse is within radius
-        dist = distanceTuples(self.CENTER.screenRef, mouse)
-        return abs(dist - self.RADIUS.screenRef) < self.segment.getThickness(True)
+    def getBoundingBox(self) -> tuple:
+        return self.BOUNDING_BOX
+
+    # The closest point is found analytically from the angle to the center
+    def project(self, position: tuple) -> CurveProjection:
+        return projectOntoArc(position, self.CENTER.fieldRef, self.RADIUS.fieldRef, self.START_ANGLE, self.STOP_ANGLE, self.POSITIVE)
+
+    def sampleGeometry(self) -> SegmentGeometry:
+        return arcGeometry(self.CENTER.fieldRef, self.RADIUS.fieldRef, self.START_ANGLE, self.STOP_ANGLE, self.POSITIVE)
 
     # for now, return midpoint between previous and next nodes. But
     # this should be changed to a point on the arc itself
@@ -255,18 +262,17 @@ class ArcSegmentState(PathSegmentState):
 
         return self.p2.screenRef
 
-    # Draw an arc given arc calculations in updateAdapter()
+    # Draw an arc given arc calculations in updateAdapter(), with as many lines as needed at the current zoom,
+    # skipping the parts outside the field
     def draw(self, screen: pygame.Surface, isActive: bool, isHovered: bool) -> bool:
 
-        # how smooth the arc should be
-        RESOLUTION = 1
-
         color = self.segment.getColor(isActive, isHovered)
-        drawArcFromCenterAngles(screen, self.START_ANGLE, self.STOP_ANGLE, self.POSITIVE,
-                                color, self.CENTER.screenRef, self.RADIUS.screenRef, 
-                                width = self.segment.getThickness(),
-                                numSegments = self.ARC_LENGTH.screenRef * RESOLUTION
-                                )
+        thickness = self.segment.getThickness()
+        transform = self.segment.transform
+
+        for points in tessellateArc(self.CENTER.fieldRef, self.RADIUS.fieldRef, self.START_ANGLE, self.STOP_ANGLE, self.POSITIVE,
+                                    transform.scale, (transform.offsetX, transform.offsetY), self.getViewport(), thickness):
+            drawPolyline(screen, color, points, thickness)
 
 
 
@@ -1,8 +1,9 @@
 from __future__ import annotations
 from typing import TYPE_CHECKING
+from concurrent.futures import Future
 from adapter.bezier_adapter import BezierAdapter
+from common.background_worker import BackgroundWorker
 from common.image_manager import ImageID
-from data_structures.observer import Observer
 from entity_base.image.image_state import ImageState
 from root_container.field_container.segment.segment_direction import SegmentDirection
 import constants
@@ -10,20 +11,24 @@ from root_container.field_container.segment.segment_type import PathSegmentType
 from utility.bezier_functions import generate_cubic_points
 from utility.bezier_functions_2 import fast_points_cubic_bezier, normalized_points_cubic_bezier
 from utility.format_functions import formatDegrees, formatInches
-from utility.math_functions import pointTouchingLine, thetaFromPoints
-from utility.pygame_functions import drawLine
+from utility.math_functions import thetaFromPoints
+from utility.pygame_functions import drawPolyline
+from utility.segment_geometry import SegmentGeometry, bezierGeometry
+from utility.projection_functions import CurveProjection, bezierBoundingBox, bezierProjectionSamples, projectOntoBezier
+from utility.tessellation import tessellateBezier
 if TYPE_CHECKING:
     from root_container.field_container.segment.path_segment_entity import PathSegmentEntity
     from root_container.field_container.node.path_node_entity import PathNodeEntity
 
 from abc import ABC, abstractmethod
 from enum import Enum, auto
-from common.reference_frame import PointRef, Ref
+from common.reference_frame import PointArray, PointRef, Ref
 from entity_base.entity import Entity
 from data_structures.linked_list import LinkedListNode
 from adapter.path_adapter import PathAdapter, PathAttributeID
 from root_container.field_container.segment.path_segment_state import PathSegmentState
 
+import numpy as np
 import pygame
 
 """
@@ -33,26 +38,27 @@ A bezier segment is controlled by two nodes and their BezierThetaEntities
 class BezierIconID(Enum):
     BEZIER = auto()
 
-class BezierSegmentState(PathSegmentState, Observer):
+class BezierSegmentState(PathSegmentState):
     def __init__(self, segment: PathSegmentEntity | LinkedListNode) -> None:
         super().__init__(PathSegmentType.BEZIER, segment)
         self.adapter = BezierAdapter([
             ImageState(BezierIconID.BEZIER, ImageID.BEZIER),
         ])
 
-        self.points: list[PointRef] = None # the bezier points in fieldRef
-        self.MOUSE_DETECTION_POINTS = None # the mouse bezier points in screenRef
+        self.points: PointArray = None # the bezier points
 
+        # coarse samples of the curve, used as starting points when projecting onto the curve
+        self.projectionSamples: tuple[np.ndarray, np.ndarray] = None
 
         self.THETA1 = None
         self.THETA2 = None
 
         self.FAST_BEZIER_RESOLUTION = 1 # 5
-        self.MOUSE_BEZIER_RESOLUTION = 0.3
-        
 
-        # every time the screen shifts, recompute the mouse detection points
-        self.segment.transform.subscribe(self, onNotify = self.onScreenRefChange)
+        # the evenly spaced points are computed in the background. Until they are done,
+        # the fast points are shown. The control points are kept to discard stale results
+        self.normalizedJob: Future = None
+        self.normalizedJobControlPoints: tuple = None
 
     def getAdapter(self) -> PathAdapter:
         return self.adapter
@@ -62,35 +68,75 @@ class BezierSegmentState(PathSegmentState, Observer):
     def onNodeStopDrag(self):
         self.recomputeBezier(False)
         self.segment.recomputeEntity()
+
+    def _getControlPoints(self) -> tuple:
+        p0 = self.segment.getPrevious().getPositionRef().fieldRef
+        p1 = self.segment.bezierTheta1.getPositionRef().fieldRef
+        p2 = self.segment.bezierTheta2.getPositionRef().fieldRef
+        p3 = self.segment.getNext().getPositionRef().fieldRef
+        return p0, p1, p2, p3
+
+    # the result of any pending normalized recompute is out of date
+    def cancelNormalizedJob(self):
+        if self.normalizedJob is not None:
+            self.normalizedJob.cancel()
+            self.normalizedJob = None
+            self.normalizedJobControlPoints = None
+
+    # Swap in the evenly spaced points once the background job is done, as long as
+    # the curve has not changed since the job was submitted
+    def onTick(self):
+
+        job = self.normalizedJob
+        if job is None or not job.done():
+            return
+        
+        controlPoints = self.normalizedJobControlPoints
+        self.normalizedJob = None
+        self.normalizedJobControlPoints = None
+
+        if controlPoints != self._getControlPoints():
+            return
+
+        self._setPoints(job.result(), *controlPoints)
+        self.segment.requestRecompute()
     
-    # compute bezier curve purely through field ref. but store points as PointRef
+    # compute bezier curve purely through field ref. but store points as PointArray
     # fast is not normalized. Used when dragging
-    # slow is normalized. Used when mouse released
+    # slow is normalized. Used when mouse released. The fast points are shown
+    # until the normalized points are computed in the background
     def recomputeBezier(self, fast: bool = True):
         # sometimes redundant, but must guarantee that the bezier nodes are initialized
         self.segment.bezierTheta1.recomputeEntity()
         self.segment.bezierTheta2.recomputeEntity()
 
         # get the four control points
-        p0 = self.segment.getPrevious().getPositionRef().fieldRef
-        p1 = self.segment.bezierTheta1.getPositionRef().fieldRef
-        p2 = self.segment.bezierTheta2.getPositionRef().fieldRef
-        p3 = self.segment.getNext().getPositionRef().fieldRef
+        p0, p1, p2, p3 = self._getControlPoints()
+
+        # a pending normalized result is stale if the curve changed since it was submitted
+        if self.normalizedJobControlPoints != (p0, p1, p2, p3):
+            self.cancelNormalizedJob()
+
+        self._setPoints(fast_points_cubic_bezier(self.FAST_BEZIER_RESOLUTION, p0, p1, p2, p3), p0, p1, p2, p3)
+
+        if not fast and self.normalizedJob is None:
+            self.normalizedJob = BackgroundWorker.submit(normalized_points_cubic_bezier,
+                                                         constants.BEIZER_SEGMENT_LENGTH, p0, p1, p2, p3)
+            self.normalizedJobControlPoints = (p0, p1, p2, p3)
+
+    def _setPoints(self, points: list, p0: tuple, p1: tuple, p2: tuple, p3: tuple):
 
         self.START_POINT = p0
         self.END_POINT = p3
-
-        if fast:
-            points = fast_points_cubic_bezier(self.FAST_BEZIER_RESOLUTION, p0, p1, p2, p3)
-            # no need to update self.MOUSE_DETECTION_POINTS while dragging
-        else:
-            points = normalized_points_cubic_bezier(constants.BEIZER_SEGMENT_LENGTH, p0, p1, p2, p3)
+        self.CONTROL_POINTS = (p0, p1, p2, p3)
+        self.BOUNDING_BOX = bezierBoundingBox(p0, p1, p2, p3)
+        self.projectionSamples = bezierProjectionSamples(p0, p1, p2, p3)
 
         # to avoid null scenarios, set start and end location as points if length < 2
         if len(points) < 2:
             points = [p0, p3]
 
-        self.points = [PointRef(Ref.FIELD, point) for point in points]
+        self.points = PointArray(Ref.FIELD, points)
 
         # calculate start/end theta from control points
         self.THETA1 = thetaFromPoints(p0, p1)
@@ -98,33 +144,17 @@ class BezierSegmentState(PathSegmentState, Observer):
 
         self.MIDPOINT: PointRef = self.points[len(self.points) // 2]
 
-        if fast:
-            self.recomputeMouseDetectionPoints()
-
-    def onScreenRefChange(self):
-        if self.segment.getSegmentType() == PathSegmentType.BEZIER:
-            self.recomputeMouseDetectionPoints()
-
-    # called anytime the bezier nodes are shifted IN SCREEN COORDINATES
-    def recomputeMouseDetectionPoints(self):
-        # get the four control points
-        p0 = self.segment.getPrevious().getPositionRef().screenRef
-        p1 = self.segment.bezierTheta1.getPositionRef().screenRef
-        p2 = self.segment.bezierTheta2.getPositionRef().screenRef
-        p3 = self.segment.getNext().getPositionRef().screenRef
-
-        self.MOUSE_DETECTION_POINTS = fast_points_cubic_bezier(self.MOUSE_BEZIER_RESOLUTION, p0, p1, p2, p3)
-    
     def updateAdapter(self) -> None:
         self.recomputeBezier()
 
-        self.adapter.set(PathAttributeID.X1, self.START_POINT[0], formatInches(self.START_POINT[0]))
-        self.adapter.set(PathAttributeID.Y1, self.START_POINT[1], formatInches(self.START_POINT[1]))
-        self.adapter.set(PathAttributeID.X2, self.END_POINT[0], formatInches(self.END_POINT[0]))
-        self.adapter.set(PathAttributeID.Y2, self.END_POINT[1], formatInches(self.END_POINT[1]))
-
-        self.adapter.set(PathAttributeID.THETA1, self.THETA1, formatDegrees(self.THETA1))
-        self.adapter.set(PathAttributeID.THETA2, self.THETA2, formatDegrees(self.THETA2))
+        self.adapter.setValues({
+            PathAttributeID.X1: (self.START_POINT[0], formatInches),
+            PathAttributeID.Y1: (self.START_POINT[1], formatInches),
+            PathAttributeID.X2: (self.END_POINT[0], formatInches),
+            PathAttributeID.Y2: (self.END_POINT[1], formatInches),
+            PathAttributeID.THETA1: (self.THETA1, formatDegrees),
+            PathAttributeID.THETA2: (self.THETA2, formatDegrees)
+        })
 
         self.adapter.setIconStateID(BezierIconID.BEZIER)
 
@@ -136,40 +166,33 @@ class BezierSegmentState(PathSegmentState, Observer):
         return self.THETA2
 
 
-    # Use the low-res self.MOUSE_DETECTION_POINTS
-    # Check if mouse is touching any of those lines
-    def isTouching(self, position: tuple) -> bool:
-
-        # sliding window for making lines across points
-        # Increases effective hitbox size
-        WINDOW_SIZE = 5
+    def getBoundingBox(self) -> tuple:
+        return self.BOUNDING_BOX
 
-        # loop through each segment
-        for i in range(len(self.MOUSE_DETECTION_POINTS) - WINDOW_SIZE):
-            x1, y1 = self.MOUSE_DETECTION_POINTS[i]
-            x2, y2 = self.MOUSE_DETECTION_POINTS[i+WINDOW_SIZE]
-            if pointTouchingLine(*position, x1, y1, x2, y2, self.segment.getThickness(True)):
-                return True
+    # Newton's method from the nearest of the cached coarse samples
+    def project(self, position: tuple) -> CurveProjection:
+        return projectOntoBezier(position, *self.CONTROL_POINTS, self.projectionSamples)
 
-        return False
+    def sampleGeometry(self) -> SegmentGeometry:
+        return bezierGeometry(*self.CONTROL_POINTS)
 
     # The midpoint of the list of points in the bezier curve
     def getCenter(self) -> tuple:
         return self.MIDPOINT.screenRef
 
-    # Iterate through list of points and draw thick lines between them
+    # Draw the curve with as many lines as needed at the current zoom, skipping the parts outside the field
     def draw(self, screen: pygame.Surface, isActive: bool, isHovered: bool) -> bool:
         
         color = self.segment.getColor(isActive, isHovered)
+        thickness = self.segment.getThickness()
+        transform = self.segment.transform
 
-        for i in range(len(self.points) - 1):
-            x1, y1 = self.points[i].screenRef
-            x2, y2 = self.points[i+1].screenRef
-            drawLine(screen, color, x1, y1, x2, y2, self.segment.getThickness(), None)
+        for points in tessellateBezier(*self.CONTROL_POINTS, transform.scale, (transform.offsetX, transform.offsetY),
+                                       self.getViewport(), thickness):
+            drawPolyline(screen, color, points, thickness)
 
-        # Draw every point if selected
+        # Draw every point if selected. All points are converted to the screen reference frame at once
         if self.segment.isSelfOrNodesSelected():
-            for point in self.points:
-                x, y = point.screenRef
+            for x, y in self.points.screenRef.tolist():
                 pygame.draw.circle(screen, (0,0,0), (x, y), 1)
 
@@ -23,7 +23,8 @@ from adapter.straight_adapter import StraightAdapter
 from common.image_manager import ImageID
 
 from utility.pygame_functions import drawLine
-from utility.math_functions import pointTouchingLine
+from utility.projection_functions import CurveProjection, lineBoundingBox, projectOntoLine
+from utility.segment_geometry import SegmentGeometry, straightGeometry
 from enum import Enum, auto
 
 import pygame
@@ -48,15 +49,17 @@ class StraightSegmentState(PathSegmentState):
         posA = self.segment.getPrevious().getPositionRef()
         posB = self.segment.getNext().getPositionRef()
 
-        self.adapter.set(PathAttributeID.X1, posA.fieldRef[0], formatInches(posA.fieldRef[0]))
-        self.adapter.set(PathAttributeID.Y1, posA.fieldRef[1], formatInches(posA.fieldRef[1]))
-        self.adapter.set(PathAttributeID.X2, posB.fieldRef[0], formatInches(posB.fieldRef[0]))
-        self.adapter.set(PathAttributeID.Y2, posB.fieldRef[1], formatInches(posB.fieldRef[1]))
-
         distance = (posB - posA).magnitude(Ref.FIELD)
         if self.segment.getDirection() == SegmentDirection.REVERSE:
             distance *= -1
-        self.adapter.set(PathAttributeID.DISTANCE, distance, formatInches(distance))
+
+        self.adapter.setValues({
+            PathAttributeID.X1: (posA.fieldRef[0], formatInches),
+            PathAttributeID.Y1: (posA.fieldRef[1], formatInches),
+            PathAttributeID.X2: (posB.fieldRef[0], formatInches),
+            PathAttributeID.Y2: (posB.fieldRef[1], formatInches),
+            PathAttributeID.DISTANCE: (distance, formatInches)
+        })
 
         self.adapter.setIconStateID(self.segment.getDirection())
 
@@ -67,10 +70,14 @@ class StraightSegmentState(PathSegmentState):
     def getEndTheta(self) -> float:
         return self.getStartTheta()
 
-    def isTouching(self, position: tuple) -> bool:
-        x1, y1 = self.segment.getPrevious().getPositionRef().screenRef
-        x2, y2 = self.segment.getNext().getPositionRef().screenRef
-        return pointTouchingLine(*position, x1, y1, x2, y2, self.segment.getThickness(True))
+    def getBoundingBox(self) -> tuple:
+        return lineBoundingBox(self.segment.getPrevious().getPositionRef().fieldRef, self.segment.getNext().getPositionRef().fieldRef)
+
+    def project(self, position: tuple) -> CurveProjection:
+        return projectOntoLine(position, self.segment.getPrevious().getPositionRef().fieldRef, self.segment.getNext().getPositionRef().fieldRef)
+
+    def sampleGeometry(self) -> SegmentGeometry:
+        return straightGeometry(self.segment.getPrevious().getPositionRef().fieldRef, self.segment.getNext().getPositionRef().fieldRef)
 
 
     def getCenter(self) -> tuple:
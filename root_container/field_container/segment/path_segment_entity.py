@@ -14,6 +14,7 @@ if TYPE_CHECKING:
 from entity_base.listeners.drag_listener import DragLambda
 from root_container.field_container.segment.segment_direction import SegmentDirection
 from utility.math_functions import isInsideBox
+from utility.projection_functions import CurveProjection
 if TYPE_CHECKING:
     from root_container.field_container.node.path_node_entity import PathNodeEntity
 
@@ -69,7 +70,7 @@ class PathSegmentEntity(Entity, AdapterInterface, Observer, PathElement['PathNod
         }
         # on state update, recompute itself
         for stateID in self.states:
-            self.states[stateID].subscribe(self, onNotify = self.recomputeEntity)
+            self.states[stateID].subscribe(self, onNotify = self.onStateNotify)
 
         self.currentState: PathSegmentType = PathSegmentType.STRAIGHT
 
@@ -93,8 +94,11 @@ class PathSegmentEntity(Entity, AdapterInterface, Observer, PathElement['PathNod
 
         
     def tick(self):
-        return
-        print(self.getPrevious(), self.getNext())
+        self.getState().onTick()
+
+    def onStateNotify(self):
+        self.path.geometry.invalidate(self)
+        self.requestRecompute(recomputeChildren = True)
 
     def getState(self) -> PathSegmentState:
         return self.states[self.currentState]
@@ -138,7 +142,7 @@ class PathSegmentEntity(Entity, AdapterInterface, Observer, PathElement['PathNod
             node.position = self.nodeGoalPosition[i]
             node.constraints.resetPositionConstraints(node.position)
 
-        delta = VectorRef(Ref.FIELD, (0,0))
+        delta: VectorRef = None
         for node in [self.getPrevious(), self.getNext()]:
             node.constrainPosition()
             if node.constraints.snappable():
@@ -146,7 +150,8 @@ class PathSegmentEntity(Entity, AdapterInterface, Observer, PathElement['PathNod
                 break # can only snap one node at a time
 
         for node in [self.getPrevious(), self.getNext()]:
-            node.position += delta
+            if delta is not None: # no need to create new positions when not snapping
+                node.position += delta
             node.onNodeMove()
 
     def onStopDrag(self):
@@ -168,7 +173,6 @@ class PathSegmentEntity(Entity, AdapterInterface, Observer, PathElement['PathNod
 
     def onNodeMove(self, node: Entity):
         self.updateAdapter()
-        self.recomputeEntity()
         self.arcNode.recomputePositionRef()
         if node is self.getPrevious():
             self.getNext().onAngleChange()
@@ -177,7 +181,6 @@ class PathSegmentEntity(Entity, AdapterInterface, Observer, PathElement['PathNod
 
     def onReshape(self):
         self.updateAdapter()
-        self.recomputeEntity()
         self.getNext().onAngleChange()
         self.getPrevious().onAngleChange()
         
@@ -205,8 +208,13 @@ class PathSegmentEntity(Entity, AdapterInterface, Observer, PathElement['PathNod
 
             self.isFullyInitialized = True
 
-        self.getState().updateAdapter()
-        self.recomputeEntity()
+        # every attribute set notifies the adapter's observers, so only notify once at the end
+        with self.getAdapter().batch():
+            self.getState().updateAdapter()
+        self.path.geometry.invalidate(self)
+
+        # children (arc and bezier nodes) are positioned from the path nodes, not the segment rect
+        self.requestRecompute(recomputeChildren = True)
 
 
     def toggleDirection(self):
@@ -269,6 +277,21 @@ class PathSegmentEntity(Entity, AdapterInterface, Observer, PathElement['PathNod
     
     def isTouching(self, position: PointRef) -> bool:
         return self.getState().isTouching(position)
+    
+    # The closest point on the segment to the position, both in field reference frame
+    def project(self, position: tuple) -> CurveProjection:
+        return self.getState().project(position)
+    
+    # segment hitbox follows the curve, not the entity rect
+    def getTouchBounds(self) -> list | None:
+        return None
+
+    def getDrawBounds(self) -> list:
+        return self._fieldBounds()
+    
+    # the curve shape may have changed without the rect changing
+    def defineAfter(self):
+        self.markDirty()
 
     def defineCenter(self) -> tuple:
         return self.getState().getCenter()
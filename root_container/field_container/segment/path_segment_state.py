@@ -9,7 +9,9 @@ if TYPE_CHECKING:
 
 from abc import ABC, abstractmethod
 from enum import Enum
-from common.reference_frame import PointRef
+from common.reference_frame import PointRef, Ref
+from utility.projection_functions import CurveProjection, isInsideBoundingBox
+from utility.segment_geometry import SegmentGeometry
 from entity_base.entity import Entity
 from data_structures.linked_list import LinkedListNode
 from adapter.path_adapter import PathAdapter
@@ -45,8 +47,30 @@ class PathSegmentState(ABC, Observable):
         pass
 
 
+    # The (minX, minY, maxX, maxY) bounding box of the curve in field reference frame
     @abstractmethod
-    def isTouching(self, position: PointRef) -> bool:
+    def getBoundingBox(self) -> tuple:
+        pass
+
+    # The closest point on the curve to the position, both in field reference frame
+    @abstractmethod
+    def project(self, position: tuple) -> CurveProjection:
+        pass
+
+    # Whether the mouse is within the hitbox thickness of the curve. Most segments are far from
+    # the mouse, and are rejected by the bounding box before projecting onto the curve
+    def isTouching(self, position: tuple) -> bool:
+        mouse = PointRef(Ref.SCREEN, position).fieldRef
+        margin = self.segment.getThickness(True) / self.segment.transform.scale
+
+        if not isInsideBoundingBox(mouse, self.getBoundingBox(), margin):
+            return False
+        return self.project(mouse).distance <= margin
+
+    # Positions, headings, arc lengths and curvatures along the curve in field reference frame, in the
+    # direction of the curve (not accounting for segment direction). Cached by PathGeometry
+    @abstractmethod
+    def sampleGeometry(self) -> SegmentGeometry:
         pass
 
     @abstractmethod
@@ -57,6 +81,15 @@ class PathSegmentState(ABC, Observable):
     def draw(self, screen: pygame.Surface, isActive: bool, isHovered: bool) -> bool:
         pass
 
+    # The part of the screen showing the field as (x, y, width, height). Curves are not tessellated outside of it
+    def getViewport(self) -> tuple:
+        dimensions = self.segment.dimensions
+        return 0, 0, dimensions.FIELD_WIDTH, dimensions.SCREEN_HEIGHT
+
     # callback when a node attached to this segment has stopped dragging
     def onNodeStopDrag(self):
+        pass
+
+    # called every tick while this is the current state of the segment
+    def onTick(self):
         pass
\ No newline at end of file
@@ -18,6 +18,7 @@ if TYPE_CHECKING:
 
 
 from entity_base.entity import Entity
+from entity_base.render_cache import RenderCache
 from entity_base.listeners.click_listener import ClickLambda
 from entity_base.listeners.tick_listener import TickLambda
 from entity_base.listeners.drag_listener import DragLambda, DragListener
@@ -96,10 +97,14 @@ class CommandBlockEntity(Entity, Observer):
             recomputeWhenInvisible = True
         )
 
+        # the whole block is rendered once and blitted until something in it changes
+        self.renderCache = RenderCache(self)
+
         # whenever a global expansion flag is changed, recompute each individual command expansion
         self.commandExpansion = commandExpansion
 
         self.elementsContainer = None
+        self.elementsVirtualized = False
         self.mouseHoveringCommand = False
 
         self.elementsVisible = True
@@ -112,7 +117,13 @@ class CommandBlockEntity(Entity, Observer):
         and switching command definitions will not change the elements.
         This will be changed in the future.
         """
-        self.elementsContainer = createElementsContainer(self, self.getDefinition(), pathAdapter)
+        if self.handler.isVirtualized() and self.canVirtualizeElements():
+            # created by the handler once the command scrolls near the viewport
+            self.elementsContainer = None
+            self.elementsVirtualized = True
+        else:
+            self.elementsContainer = createElementsContainer(self, self.getDefinition(), pathAdapter)
+            self.elementsVirtualized = False
 
         # subscribe to changes in the database
         self.database.subscribe(self, onNotify = self.onCommandDefinitionChange)
@@ -140,13 +151,14 @@ class CommandBlockEntity(Entity, Observer):
         print("change")
         
         # only commands consisting of widgets and readouts can have their definition changed
-        assert(isinstance(self.elementsContainer, RowElementsContainer))
+        assert(self.elementsVirtualized or isinstance(self.elementsContainer, RowElementsContainer))
 
         self.onColorChange()
 
-        # update container with new database info
-        container: RowElementsContainer = self.elementsContainer
-        container.onDefinitionChange()
+        # update container with new database info. If virtualized, it is created with the new info later
+        if not self.elementsVirtualized:
+            container: RowElementsContainer = self.elementsContainer
+            container.onDefinitionChange()
 
         self.propagateChange()
     
@@ -166,8 +178,11 @@ class CommandBlockEntity(Entity, Observer):
         self.definitionID = self.database.getDefinitionIDByName(self.type, functionName)
 
         # Delete old elements container and assign new one
-        self.entities.removeEntity(self.elementsContainer)
+        if not self.elementsVirtualized:
+            self.entities.removeEntity(self.elementsContainer)
         self.elementsContainer = createElementsContainer(self, self.getDefinition(), self.pathAdapter)
+        self.elementsVirtualized = False
+        self.handler.onElementsMaterialized(self)
         self.elementsContainer.recomputeEntity()
 
         self.onColorChange()
@@ -188,17 +203,81 @@ class CommandBlockEntity(Entity, Observer):
 
         self.propagateChange()
 
+    # Whether the widgets and readouts can be removed while the command is away from the
+    # viewport. Their state is kept in ParameterState and the path adapter, so they can be
+    # recreated as-is. Tasks own nested commands and code blocks own their text, so they can't
+    def canVirtualizeElements(self) -> bool:
+        definition = self.getDefinition()
+        return not definition.isTask and not definition.isCode
+
+    # Create the elements container if it was virtualized, reusing a pooled one of the same
+    # definition if possible. Returns true if the elements exist afterwards
+    def materializeElements(self) -> bool:
+
+        if not self.elementsVirtualized:
+            return True
+        
+        container = self.handler.takePooledElements(self.getElementsPoolKey())
+        if container is None:
+            self.elementsContainer = createElementsContainer(self, self.getDefinition(), self.pathAdapter)
+        else:
+            container.rebind(self, self.pathAdapter)
+            self.elementsContainer = container
+        self.elementsVirtualized = False
+
+        # set initial visibility for new elements container
+        self.elementsVisible = not self.isFullyCollapsed()
+        if self.elementsVisible:
+            self.elementsContainer.setVisible(recompute = False)
+        else:
+            self.elementsContainer.setInvisible()
+
+        self.elementsContainer.recomputeEntity()
+        self.elementsContainer.markSubtreeDirty()
+        return True
+
+    # Pool the elements container, keeping only the command model (definition, parameters and adapter).
+    # Does nothing if the user is interacting with the elements. Returns true if the elements
+    # are virtualized afterwards
+    def dematerializeElements(self) -> bool:
+
+        if self.elementsVirtualized:
+            return True
+        if not self.canVirtualizeElements():
+            return False
+        
+        for entity in [self.interactor.hoveredEntity, *self.interactor.selected.entities]:
+            while entity is not None:
+                if entity is self.elementsContainer:
+                    return False
+                entity = entity._parent
+        
+        self.elementsContainer.markSubtreeDirty()
+        self.handler.poolElements(self.getElementsPoolKey(), self.elementsContainer)
+        self.elementsContainer = None
+        self.elementsVirtualized = True
+        return True
+
+    # Pooled elements containers can only be reused by commands of the same definition
+    def getElementsPoolKey(self) -> tuple:
+        return self.type, self.definitionID
+
     # Update animation every tick
     def onTick(self):
         # handle elements visibility
         if self.elementsVisible and self.isFullyCollapsed():
-            self.elementsContainer.setInvisible()
+            if not self.elementsVirtualized:
+                self.elementsContainer.setInvisible()
             self.elementsVisible = False
         elif not self.elementsVisible and not self.isFullyCollapsed():
-            self.elementsContainer.setVisible()
+            if not self.elementsVirtualized:
+                self.elementsContainer.setVisible()
             self.elementsVisible = True
 
-        self.mouseHoveringCommand = self.isSelfOrChildrenHovering()
+        mouseHoveringCommand = self.isSelfOrChildrenHovering()
+        if mouseHoveringCommand != self.mouseHoveringCommand:
+            self.markDirty()
+        self.mouseHoveringCommand = mouseHoveringCommand
 
         self.colorR.tick()
         self.colorG.tick()
@@ -206,6 +285,7 @@ class CommandBlockEntity(Entity, Observer):
         # handle color animation
         if self.colorR.wasChange() or self.colorG.wasChange() or self.colorB.wasChange():
             self.headerEntity.functionName.updateColor()
+            self.markSubtreeDirty()
 
         # handle expansion animation
         if not self.animatedExpansion.isDone():
@@ -222,6 +302,9 @@ class CommandBlockEntity(Entity, Observer):
     
     # how much the widgets stretch the command by. return the largest one
     def getElementStretch(self) -> int:
+        if self.elementsVirtualized:
+            # same height as the rows would have if they existed
+            return self._aheight(RowElementsContainer.ROW_HEIGHT * len(self.getDefinition().elements))
         if self.elementsContainer is None:
             return 0
         return self.elementsContainer.defineHeight()
@@ -346,6 +429,15 @@ class CommandBlockEntity(Entity, Observer):
     def isHighlighted(self) -> bool:
         return CommandBlockEntity.HIGHLIGHTED == self
     
+    # Only use the cached render while the block is at rest. While animating, dragging,
+    # hovered or highlighted, the block changes too often for the cache to help
+    def isRenderCacheable(self) -> bool:
+        if self.isDragging() or self.isHighlighted() or self.mouseHoveringCommand:
+            return False
+        if self.getOpacity() != 1:
+            return False
+        return self.isFullyCollapsed() or self.isFullyExpanded()
+    
     # Highlight the command block visually
     # Also, contract all commands except this one
     def highlight(self):
@@ -382,8 +474,12 @@ class CommandBlockEntity(Entity, Observer):
         # cache the existing inserters
         self.handler.updateActiveCommandInserters()
 
+        # dragged command is drawn in front of the others
+        self.container.variableContainer.onDrawOrderTiebreakerChange()
+
     def onStopDrag(self):
         self.dragPosition = None
+        self.container.variableContainer.onDrawOrderTiebreakerChange()
         self.recomputeEntity()
 
     def _getClosestInserter(self, mouse: tuple) -> CommandInserter | None:
@@ -437,6 +533,13 @@ class CommandBlockEntity(Entity, Observer):
             return self.dragPosition
         else:
             return None
+        
+    # while dragging, the block follows the mouse instead of scrolling with its parent
+    def translateEntity(self, dx: int, dy: int):
+        if self.drag.isDragging:
+            self.recomputeEntity()
+        else:
+            super().translateEntity(dx, dy)
     
     def getNextInserter(self) -> CommandInserter:
         return self.handler.getNext(self)
@@ -92,6 +92,8 @@ class CommandInserter(Entity):
     
 
     def setActive(self, isActive):
+        if self.isActive != isActive:
+            self.markDirty()
         self.isActive = isActive
         self.propagateChange()
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from enum import Enum
-from typing import TYPE_CHECKING, Iterator
+from typing import TYPE_CHECKING
 from command_creation.command_type import CommandType
 from common.draw_order import DrawOrder
 
@@ -17,6 +17,7 @@ from adapter.path_adapter import NullPathAdapter, PathAdapter
 from command_creation.command_block_entity_factory import CommandBlockEntityFactory
 from command_creation.command_definition_database import CommandDefinitionDatabase
 from data_structures.linked_list import LinkedList
+from entity_base.container_entity import Container
 from entity_ui.group.variable_group.variable_container import VariableContainer
 from entity_ui.group.variable_group.variable_group_container import VariableGroupContainer
 from root_container.panel_container.command_block.command_block_container import CommandBlockContainer
@@ -24,6 +25,7 @@ from root_container.panel_container.command_block.command_block_entity import Co
 from root_container.panel_container.command_block.command_inserter import CommandInserter
 from root_container.panel_container.command_expansion.command_expansion_container import CommandExpansionContainer
 from root_container.panel_container.command_scrolling.command_scrolling_handler import CommandScrollingHandler
+from root_container.panel_container.element.overall.row_elements_container import RowElementsContainer
 import math
 
 
@@ -34,6 +36,15 @@ Uses a VariableGroupContainer to position the commands.
 Handles scrolling and command expansion.
 
 Whenever a command is added or deleted, the inserter after it is added/deleted as well
+
+In virtualization mode, the widgets and readouts of commands away from the viewport are
+removed, and only the lightweight command model (definition, parameters and adapter) is kept.
+As a command scrolls near the viewport, it takes a pooled elements container of the same
+definition from a command that scrolled away, or creates one if there is none.
+
+Only the elements are virtualized. Every command still has its CommandBlockEntity, header and
+inserter, since the path, drag-reordering and the inserter list hold direct references to them,
+and their heights define the scroll extent.
 """
 
 Element =  CommandBlockContainer | CommandInserter
@@ -52,11 +63,24 @@ class CommandSequenceHandler(Observer):
         self.panel = panel
         self.database = database
 
+        self.virtualized = False
+
+        # commands whose elements exist only because they are near the viewport
+        self.materializedCommands: dict[CommandBlockEntity, None] = {}
+
+        # elements containers of virtualized commands by command type and definition ID, kept under an invisible
+        # container so they are not drawn, ticked or recomputed until reused
+        self.pooledElements: dict[tuple, list[RowElementsContainer]] = {}
+
         self.scrollHandler = CommandScrollingHandler(panel, DrawOrder.COMMANDS)
         scrollingContainer = self.scrollHandler.getScrollingContainer()
         self.vgc: VariableGroupContainer[CommandSection] = VariableGroupContainer(scrollingContainer, isHorizontal = False, name = "main")
 
-        self.vgc.subscribe(self, onNotify = lambda: self.scrollHandler.setContentHeight(self.vgc.HEIGHT))        
+        self.vgc.subscribe(self, onNotify = self.onLayoutChange)
+        self.scrollHandler.subscribe(self, onNotify = self.updateVirtualization)
+        self.database.subscribe(self, onNotify = self.onCommandDefinitionChange)
+
+        self.elementsPool = Container(scrollingContainer, initiallyVisible = False)
 
         # insert first inserter
         variableContainer = self._createInserter(self.vgc)
@@ -65,6 +89,97 @@ class CommandSequenceHandler(Observer):
         # Create first section
         self.addSection()
 
+    def onLayoutChange(self):
+        self.scrollHandler.setContentHeight(self.vgc.HEIGHT)
+        self.updateVirtualization()
+
+    # Must be set before any commands are created
+    def setVirtualized(self, virtualized: bool):
+        self.virtualized = virtualized
+
+    def isVirtualized(self) -> bool:
+        return self.virtualized
+    
+    # Add the commands in the VGC that overlap [low, high] and can be virtualized to commands,
+    # including ones inside tasks. Returns false if the layout of some VGC is out of date, in which case the result is incomplete
+    def _getCommandsInRange(self, vgc: VariableGroupContainer, low: float, high: float, commands: dict[CommandBlockEntity, None]) -> bool:
+
+        if not vgc.isVisible():
+            return True
+
+        containers = vgc.getContainersInRange(low, high)
+        if containers is None:
+            return False
+
+        complete = True
+        for container in containers:
+            child = container.child
+            if isinstance(child, CommandSection):
+                complete = self._getCommandsInRange(child.getVGC(), low, high, commands) and complete
+            elif isinstance(child, CommandBlockContainer) and child.commandBlock.isVisible():
+                command = child.commandBlock
+                if command.canVirtualizeElements():
+                    commands[command] = None
+                if command.isTask():
+                    taskContainer: TaskCommandsContainer = command.elementsContainer
+                    complete = self._getCommandsInRange(taskContainer.vgc, low, high, commands) and complete
+        return complete
+
+    # In virtualization mode, create the elements of commands entering the area near the viewport,
+    # and pool the elements of commands leaving it. Called whenever scrolling or the layout changes.
+    # The commands near the viewport are found with binary searches over the cached VGC positions,
+    # so this is O(visible) rather than O(all commands)
+    def updateVirtualization(self):
+
+        if not self.virtualized:
+            return
+        
+        viewport = self.scrollHandler.getViewport()
+        if viewport is None:
+            return
+        
+        # keep a viewport worth of commands on each side, so that they exist before scrolling into view
+        MARGIN = viewport.HEIGHT
+        nearby: dict[CommandBlockEntity, None] = {}
+        if not self._getCommandsInRange(self.vgc, viewport.TOP_Y - MARGIN, viewport.BOTTOM_Y + MARGIN, nearby):
+            return # handled again once the layout is updated
+
+        for command in list(self.materializedCommands):
+            if command not in nearby or command not in command.entities.entities:
+                if command.dematerializeElements():
+                    del self.materializedCommands[command]
+
+        for command in nearby:
+            if command not in self.materializedCommands and command.materializeElements():
+                self.materializedCommands[command] = None
+
+    # Called by commands that create their elements outside of updateVirtualization(), so that
+    # they are virtualized again once they leave the viewport
+    def onElementsMaterialized(self, command: CommandBlockEntity):
+        if self.virtualized and command.canVirtualizeElements():
+            self.materializedCommands[command] = None
+        else:
+            self.materializedCommands.pop(command, None)
+
+    # Park the elements container of a command being virtualized, so that it can be reused by
+    # another command of the same definition
+    def poolElements(self, key: tuple, elementsContainer: RowElementsContainer):
+        elementsContainer.changeParent(self.elementsPool)
+        self.pooledElements.setdefault(key, []).append(elementsContainer)
+
+    # A pooled elements container for the key, or None if there is none
+    def takePooledElements(self, key: tuple) -> RowElementsContainer | None:
+        pooled = self.pooledElements.get(key)
+        if not pooled:
+            return None
+        return pooled.pop()
+
+    # Pooled elements built from the old definition cannot be reused
+    def onCommandDefinitionChange(self):
+        key = (self.database.lastUpdatedCommandType, self.database.lastUpdatedCommandID)
+        for elementsContainer in self.pooledElements.pop(key, []):
+            self.panel.entities.removeEntity(elementsContainer)
+
     def _createSection(self) -> VariableContainer[CommandSection]:
         vc = VariableContainer(self.vgc, isHorizontal = False)
         section = CommandSection(vc, self)
@@ -194,6 +309,8 @@ class CommandSequenceHandler(Observer):
         return commandBlock
         
     def deleteCommand(self, command: CommandBlockEntity):
+        self.materializedCommands.pop(command, None)
+
         # remove from linked list
         self.getList(command).remove(command.container.variableContainer)
 
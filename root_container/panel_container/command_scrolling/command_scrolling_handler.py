@@ -8,7 +8,7 @@ from root_container.panel_container.command_scrolling.command_scrollbar import C
 from root_container.panel_container.command_scrolling.static_command_content_container import StaticCommandContentContainer
 from entity_ui.scrollbar.scrolling_content_container import ScrollingContentContainer
 
-from data_structures.observer import Observable
+from data_structures.observer import Observable, Observer
 
 """
 Deals with creating the command scrollbar, the scrolling container storing the commands,
@@ -16,7 +16,7 @@ and facilitating interaction between the two
 Subscribers recieve a notification when scroller moves
 """
 
-class CommandScrollingHandler(Observable):
+class CommandScrollingHandler(Observable, Observer):
     
     def __init__(self, panel: BlockTabContentsContainer, contentDrawOrder = DrawOrder.FRONT):
 
@@ -29,12 +29,21 @@ class CommandScrollingHandler(Observable):
 
         # Scrolling container starts off the same location as static container, but is y offset by scrollbar realtime
         self._scrollingContainer = ScrollingContentContainer(self._staticContainer, self._commandScrollbar)
+
+        # subscribed after the scrolling container, so subscribers are notified after the content has moved
+        self._commandScrollbar.scrollbar.subscribe(self, onNotify = self.notify)
         
     # Get the scrolling container, which should be set as parent of first CommandInserter
     # That way, the commands move with the scrolling container
     def getScrollingContainer(self) -> ScrollingContentContainer:
         return self._scrollingContainer
     
+    # The unmoving container that the commands are visible through. None if not laid out yet
+    def getViewport(self) -> StaticCommandContentContainer | None:
+        if not self._staticContainer.isVisible() or "RECT" not in self._staticContainer.__dict__:
+            return None
+        return self._staticContainer
+    
     # Call this to update the scrollbar with the new content height
     def setContentHeight(self, contentHeight: int):
         self._commandScrollbar.scrollbar.setContentHeight(contentHeight)
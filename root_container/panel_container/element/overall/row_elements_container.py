@@ -2,6 +2,7 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from root_container.panel_container.command_block.command_block_entity import CommandBlockEntity
+    from root_container.panel_container.element.row.element_entity import ElementContainer
 
 import random
 from root_container.panel_container.element.overall.abstract_elements_container import AbstractElementsContainer
@@ -19,6 +20,9 @@ Each row has a left column (label), and right column (widget or readout)
 """
 
 class RowElementsContainer(AbstractElementsContainer):
+
+    # height of each row in pixels
+    ROW_HEIGHT = 22
     
     def __init__(self, parentCommand: CommandBlockEntity, commandDefinition: CommandDefinition, pathAdapter: PathAdapter):
 
@@ -32,7 +36,10 @@ class RowElementsContainer(AbstractElementsContainer):
     def initRowElements(self):
 
         # Create the container that will store the rows
-        self.group = DynamicGroupContainer(self, False, entitySizePixels = 22)
+        self.group = DynamicGroupContainer(self, False, entitySizePixels = self.ROW_HEIGHT)
+
+        # kept so that the elements can be rebound if this container is pooled and reused
+        self.elements: list[ElementContainer] = []
 
         # Create the rows
         ROW_SPACING = 1
@@ -40,9 +47,18 @@ class RowElementsContainer(AbstractElementsContainer):
             row = LinearContainer(self.group, i, ROW_SPACING)
 
             # For each row, add label and widget/readout
-            # No need to store references after created for now. But could if neededs
             label = elementDefinition.makeLabel(row)
             element = elementDefinition.makeElement(row, self.parentCommand, self.pathAdapter)
+            self.elements.append(element)
+
+    # Move this container to another command of the same definition, which happens when the
+    # handler reuses a pooled container. The elements show the values of the new command
+    def rebind(self, parentCommand: CommandBlockEntity, pathAdapter: PathAdapter):
+        self.parentCommand = parentCommand
+        self.pathAdapter = pathAdapter
+        for element in self.elements:
+            element.rebind(parentCommand, pathAdapter)
+        self.changeParent(parentCommand)
 
     # Called when database entry for definition has changed
     def onDefinitionChange(self):
@@ -30,16 +30,34 @@ class ReadoutEntity(ElementContainer, Observer):
         self.border = TextBorder()
 
         self.font: DynamicFont = parentCommand.fonts.getDynamicFont(readoutDefinition.LABEL_FONT, readoutDefinition.LABEL_SIZE)
-        self.font.subscribe(self, onNotify = self.recomputeEntity)
+        self.font.subscribe(self, onNotify = self.requestRecompute)
 
         self.definition = readoutDefinition
         self.pathAdapter = pathAdapter
-        self.pathAdapter.subscribe(self, onNotify = self.recomputeEntity)
+        # the adapter changes on every drag event, but the text only needs to update once per tick
+        self.pathAdapter.subscribe(self, onNotify = self.onAdapterChange, coalesce = True)
 
         super().__init__(parent, parentCommand)
         
+    def rebind(self, parentCommand: CommandBlockEntity, pathAdapter: PathAdapter):
+        super().rebind(parentCommand, pathAdapter)
+        if pathAdapter is not self.pathAdapter:
+            self.pathAdapter.unsubscribe(self)
+            self.pathAdapter = pathAdapter
+            self.pathAdapter.subscribe(self, onNotify = self.onAdapterChange, coalesce = True)
+        self.requestRecompute()
+
+    # the adapter notifies when any of its attributes change, but only this readout's attribute matters.
+    # changedAttributes is None when the adapter did not say what changed
+    def onAdapterChange(self, changedAttributes: set = None):
+        if changedAttributes is None or self.definition.getPathAttributeID() in changedAttributes:
+            self.requestRecompute()
+
     def updateText(self) -> str:
-        self.textString = str(self.pathAdapter.getString(self.definition.getPathAttributeID()))
+        textString = str(self.pathAdapter.getString(self.definition.getPathAttributeID()))
+        if "textString" in self.__dict__ and textString != self.textString:
+            self.markDirty()
+        self.textString = textString
         textSurface = getText(self.font.get(), self.textString, (0,0,0), 1)
         self.textWidth = textSurface.get_width()
         self.textHeight = textSurface.get_height()
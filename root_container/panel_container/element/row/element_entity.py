@@ -3,6 +3,7 @@ from typing import TYPE_CHECKING
 from common.draw_order import DrawOrder
 from entity_base.listeners.hover_listener import HoverLambda
 if TYPE_CHECKING:
+    from adapter.path_adapter import PathAdapter
     from root_container.panel_container.command_block.command_block_entity import CommandBlockEntity
 
 from entity_base.container_entity import Container
@@ -20,6 +21,12 @@ class ElementContainer(Container):
         self.parameters = parentCommand.parameters
         super().__init__(parent, hover = HoverLambda(self))
 
+    # Called when a pooled element is reused for another command of the same definition.
+    # Subclasses refresh whatever they show from the new command
+    def rebind(self, parentCommand: CommandBlockEntity, pathAdapter: PathAdapter):
+        self.parentCommand = parentCommand
+        self.parameters = parentCommand.parameters
+
     def defineCenter(self) -> tuple:
         return self._px(0.75), self._py(0.5)
 
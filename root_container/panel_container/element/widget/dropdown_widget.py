@@ -37,8 +37,17 @@ class DropdownWidgetContainer(WidgetContainer['DropdownWidgetDefinition'], Obser
                                           colorSelectedHovered, colorSelected, colorHovered, colorOff,
                                           dynamicWidth = False, verticalTextPadding = 1)
         
+        # restore value if the widget was recreated
+        if self.getValue() in definition.options:
+            self.dropdown.setSelectedText(self.getValue(), recompute = False)
+
         self.dropdown.subscribe(self, onNotify = self.onDropdownChange)
 
+    def rebind(self, parentCommand: CommandBlockEntity, pathAdapter):
+        super().rebind(parentCommand, pathAdapter)
+        if self.getValue() in self.definition.options:
+            self.dropdown.setSelectedText(self.getValue(), recompute = False)
+
     def onDropdownChange(self):
         self.setValue(self.dropdown.getSelectedOptionText())
 
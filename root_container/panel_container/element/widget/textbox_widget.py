@@ -39,11 +39,15 @@ class TextboxWidgetContainer(WidgetContainer['TextboxWidgetDefinition'], Observe
             fontID, fontSize,
             isDynamic = definition.isDynamic,
             isNumOnly = definition.isNumOnly,
-            defaultText = definition.defaultValue
+            defaultText = str(self.getValue()).split("\n") # restore value if the widget was recreated
         )
 
         self.textEditor.subscribe(self, onNotify = self.onTextChange)
 
+    def rebind(self, parentCommand: CommandBlockEntity, pathAdapter):
+        super().rebind(parentCommand, pathAdapter)
+        self.textEditor.setText(str(self.getValue()))
+
     # for dynamic widgets. how much to stretch command height by
     def getCommandStretch(self) -> int:
         return self.textEditor.getHeightOffset()
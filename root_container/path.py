@@ -29,6 +29,7 @@ from common.reference_frame import PointRef
 
 import entity_base.entity as entity
 from root_container.path_command_linker import PathCommandLinker
+from root_container.path_geometry import PathGeometry
 
 """
 A class storing state for a segment and the node after it.
@@ -53,6 +54,9 @@ class Path(Observer):
         self.commandHandler.initPath(self)
         self.pathList = LinkedList[PathNodeEntity | PathSegmentEntity]() # linked list of nodes and segments
 
+        # sampled geometry of the whole path, shared by anything that needs positions along the path
+        self.geometry = PathGeometry(self.pathList)
+
         # store a dict that maintains a mapping from PathNodeEntity | PathSegmentEntity to CommandBlockEntity
         self.linker = PathCommandLinker()
 
@@ -0,0 +1,141 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+import numpy as np
+
+from data_structures.linked_list import LinkedList
+from root_container.field_container.segment.segment_direction import SegmentDirection
+from root_container.field_container.segment.path_segment_entity import PathSegmentEntity
+from utility.segment_geometry import SegmentGeometry
+
+if TYPE_CHECKING:
+    from root_container.field_container.node.path_node_entity import PathNodeEntity
+
+"""
+One continuous description of the whole path, so that drawing, code generation, trajectory and collision code
+can share sampled geometry instead of each recomputing it from the segment states.
+
+Each segment's SegmentGeometry is sampled lazily and cached until the segment is invalidated, which happens
+whenever the segment's adapter is updated (its nodes moved, its shape or type changed, or its direction was
+toggled). The concatenated whole-path arrays are rebuilt only when some segment was invalidated or the path
+changed, and queries over many distances at once are answered in one vectorized pass.
+
+Headings are the direction the robot faces, so they are turned around for reversed segments, the same way
+PathNodeEntity adjusts its start and stop thetas. Distances are measured along the path from the first node.
+"""
+
+class PathGeometry:
+    def __init__(self, pathList: LinkedList[PathNodeEntity | PathSegmentEntity]):
+        self.pathList = pathList
+
+        self._segmentGeometry: dict[PathSegmentEntity, SegmentGeometry] = {}
+
+        # the segments in path order, rebuilt when the path list changes
+        self._segments: list[PathSegmentEntity] = []
+        self._segmentsVersion: int = None
+
+        # concatenated arrays for the whole path. None when out of date
+        self._positions: np.ndarray = None
+        self._headings: np.ndarray = None
+        self._distances: np.ndarray = None
+        self._curvatures: np.ndarray = None
+        self._segmentStarts: np.ndarray = None # distance along the path at the start of each segment
+
+    # Called when the shape of a segment may have changed
+    def invalidate(self, segment: PathSegmentEntity):
+        self._segmentGeometry.pop(segment, None)
+        self._positions = None
+
+    def getSegments(self) -> list[PathSegmentEntity]:
+        if self._segmentsVersion != self.pathList.version:
+            self._segmentsVersion = self.pathList.version
+            self._segments = [element for element in self.pathList if isinstance(element, PathSegmentEntity)]
+
+            # forget segments that were removed from the path
+            segments = set(self._segments)
+            for segment in list(self._segmentGeometry):
+                if segment not in segments:
+                    del self._segmentGeometry[segment]
+            self._positions = None
+
+        return self._segments
+
+    # The sampled geometry of a single segment, with headings adjusted for segment direction
+    def getSegmentGeometry(self, segment: PathSegmentEntity) -> SegmentGeometry:
+        geometry = self._segmentGeometry.get(segment)
+        if geometry is None:
+            geometry = segment.getState().sampleGeometry()
+            if segment.getDirection() == SegmentDirection.REVERSE:
+                geometry = geometry.reversed()
+            self._segmentGeometry[segment] = geometry
+        return geometry
+
+    def _rebuild(self):
+
+        geometries = [self.getSegmentGeometry(segment) for segment in self.getSegments()]
+        if len(geometries) == 0:
+            start = self.pathList.head.getPositionRef().fieldRef
+            geometries = [SegmentGeometry(np.array([start, start], dtype = float), np.zeros(2), np.zeros(2), np.zeros(2))]
+
+        lengths = np.array([geometry.getLength() for geometry in geometries])
+        self._segmentStarts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+
+        self._positions = np.concatenate([geometry.positions for geometry in geometries])
+        self._headings = np.unwrap(np.concatenate([geometry.headings for geometry in geometries]))
+        self._distances = np.concatenate([geometry.distances + start for geometry, start in zip(geometries, self._segmentStarts)])
+        self._curvatures = np.concatenate([geometry.curvatures for geometry in geometries])
+
+    def _update(self):
+        self.getSegments()
+        if self._positions is None:
+            self._rebuild()
+
+    # The whole path as (positions, headings, distances, curvatures) arrays. Where two segments meet, both the
+    # end of one and the start of the next are included at the same distance
+    def getArrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        self._update()
+        return self._positions, self._headings, self._distances, self._curvatures
+
+    def getLength(self) -> float:
+        self._update()
+        return float(self._distances[-1])
+
+    # The distance along the path at the start of each segment
+    def getSegmentStarts(self) -> np.ndarray:
+        self._update()
+        return self._segmentStarts
+
+    # For each distance, the index of the sample at or before it, and how far it is towards the next sample.
+    # At a node, the start of the next segment is used
+    def _locate(self, distances: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        self._update()
+        distances = np.clip(np.asarray(distances, dtype = float), 0, self._distances[-1])
+
+        index = np.clip(np.searchsorted(self._distances, distances, side = "right") - 1, 0, len(self._distances) - 2)
+        start, end = self._distances[index], self._distances[index + 1]
+        span = end - start
+        fraction = np.divide(distances - start, span, out = np.ones_like(distances), where = span > 0)
+        return index, fraction
+
+    # The (N,2) positions and (N,) headings at each distance along the path, clamped to the ends of the path.
+    # Headings are in (-pi, pi]
+    def getPoses(self, distances: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        index, fraction = self._locate(distances)
+
+        positions = self._positions[index] + fraction[:, None] * (self._positions[index + 1] - self._positions[index])
+        headings = self._headings[index] + fraction * (self._headings[index + 1] - self._headings[index])
+        return positions, np.pi - (np.pi - headings) % (2*np.pi)
+
+    # (x, y, heading) at a single distance along the path
+    def getPose(self, distance: float) -> tuple[float, float, float]:
+        positions, headings = self.getPoses(np.array([distance]))
+        return float(positions[0, 0]), float(positions[0, 1]), float(headings[0])
+
+    # The signed curvature at each distance along the path
+    def getCurvatures(self, distances: np.ndarray) -> np.ndarray:
+        index, fraction = self._locate(distances)
+        return self._curvatures[index] + fraction * (self._curvatures[index + 1] - self._curvatures[index])
+
+    # Evenly spaced distances along the path, spacing apart, followed by the end of the path
+    def getEvenlySpacedDistances(self, spacing: float) -> np.ndarray:
+        length = self.getLength()
+        return np.append(np.arange(0, length, spacing), length)
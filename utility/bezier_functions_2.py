@@ -1,8 +1,20 @@
 import numpy as np
-from scipy.integrate import quad
-from scipy.optimize import root_scalar, brentq
 from utility.math_functions import distanceTuples
 
+# Arc length is integrated with Gauss-Legendre quadrature over each interval of a table of t values.
+# Nodes and weights are rescaled from [-1, 1] to [0, 1]
+GAUSS_LEGENDRE_ORDER = 8
+_gauss_nodes, _gauss_weights = np.polynomial.legendre.leggauss(GAUSS_LEGENDRE_ORDER)
+_gauss_nodes = (_gauss_nodes + 1) / 2
+_gauss_weights = _gauss_weights / 2
+
+# number of intervals in the arc length table
+ARC_LENGTH_TABLE_SIZE = 64
+
+# the arc length between consecutive normalized points is within this distance of segment_length
+ARC_LENGTH_TOLERANCE = 1e-6
+ARC_LENGTH_MAX_ITERATIONS = 8
+
 def cubic_bezier_point(t, p0, p1, p2, p3):
     t_inv = 1 - t
     return (t_inv ** 3) * p0 + 3 * (t_inv ** 2) * t * p1 + 3 * t_inv * (t ** 2) * p2 + (t ** 3) * p3
@@ -11,43 +23,90 @@ def cubic_bezier_derivative(t, p0, p1, p2, p3):
     t_inv = 1 - t
     return -3 * (t_inv ** 2) * p0 + 3 * (t_inv ** 2) * p1 - 6 * t_inv * t * p1 + 6 * t_inv * t * p2 - 3 * (t ** 2) * p2 + 3 * (t ** 2) * p3
 
-def arc_length_integrand(t, p0, p1, p2, p3):
-    derivative = cubic_bezier_derivative(t, p0, p1, p2, p3)
-    return np.linalg.norm(derivative)
+# power basis coefficients, so that B(t) = c0 + c1 t + c2 t^2 + c3 t^3
+def _cubic_bezier_coefficients(p0, p1, p2, p3):
+    return p0, 3 * (p1 - p0), 3 * (p0 - 2 * p1 + p2), p3 - p0 + 3 * (p1 - p2)
+
+# Evaluate the curve at an array of t values in one vectorized pass. Returns an (N, 2) array of points.
+# If derivatives is true, the first and second derivatives are returned after the points as (N, 2) arrays.
+# If curvature is true, the signed curvature is returned last as an (N,) array
+def cubic_bezier_points(t, p0, p1, p2, p3, derivatives = False, curvature = False):
+
+    p0, p1, p2, p3 = map(np.asarray, [p0, p1, p2, p3])
+    c0, c1, c2, c3 = _cubic_bezier_coefficients(p0, p1, p2, p3)
+    t = np.asarray(t, dtype = float)[:, None]
+
+    points = c0 + t * (c1 + t * (c2 + t * c3))
+    if not derivatives and not curvature:
+        return points
+
+    first = c1 + t * (2 * c2 + 3 * t * c3)
+    second = 2 * c2 + 6 * t * c3
+
+    result = [points]
+    if derivatives:
+        result += [first, second]
+    if curvature:
+        cross = first[:, 0] * second[:, 1] - first[:, 1] * second[:, 0]
+        speed = np.hypot(first[:, 0], first[:, 1])
+        result.append(cross / np.maximum(speed ** 3, 1e-12))
+    return tuple(result)
+
+def _cubic_bezier_speeds(t, p0, p1, p2, p3):
+    points, first, second = cubic_bezier_points(t, p0, p1, p2, p3, derivatives = True)
+    return np.hypot(first[:, 0], first[:, 1])
 
-def arc_length(t, p0, p1, p2, p3):
-    return quad(arc_length_integrand, 0, t, args=(p0, p1, p2, p3))[0]
+# arc length from each t_start to the corresponding t_end, integrated in one pass
+def _arc_lengths_between(t_start, t_end, p0, p1, p2, p3):
+    dt = t_end - t_start
+    sample_t = t_start[:, None] + dt[:, None] * _gauss_nodes[None, :]
+    speeds = _cubic_bezier_speeds(sample_t.ravel(), p0, p1, p2, p3).reshape(sample_t.shape)
+    return (speeds @ _gauss_weights) * dt
 
-def find_t_for_arc_length(target_arc_length, p0, p1, p2, p3):
-    def target_function(t):
-        return arc_length(t, p0, p1, p2, p3) - target_arc_length
+# Table of cumulative arc length at evenly-spaced values of t. Returns (t, arc length) arrays
+def arc_length_table(p0, p1, p2, p3, intervals = ARC_LENGTH_TABLE_SIZE):
+    t = np.linspace(0, 1, intervals + 1)
+    lengths = _arc_lengths_between(t[:-1], t[1:], p0, p1, p2, p3)
+    return t, np.concatenate(([0], np.cumsum(lengths)))
 
-    try:
-        result = brentq(target_function, 0, 1)
-    except ValueError:
-        result = 1.0
+# Find t for each target arc length. Interpolates the table for an initial guess,
+# then refines all guesses together with Newton's method
+def find_t_for_arc_lengths(targets, table_t, table_length, p0, p1, p2, p3):
 
-    return result
+    t = np.interp(targets, table_length, table_t)
 
+    for _ in range(ARC_LENGTH_MAX_ITERATIONS):
+
+        # arc length at t is the table entry before t plus the remainder of the interval
+        index = np.clip(np.searchsorted(table_t, t, side = "right") - 1, 0, len(table_t) - 2)
+        length = table_length[index] + _arc_lengths_between(table_t[index], t, p0, p1, p2, p3)
+
+        error = length - targets
+        if np.max(np.abs(error), initial = 0) < ARC_LENGTH_TOLERANCE:
+            break
+
+        speeds = _cubic_bezier_speeds(t, p0, p1, p2, p3)
+        t = np.clip(t - error / np.maximum(speeds, 1e-12), 0, 1)
+
+    return t
+
+# Points spaced segment_length apart along the curve, followed by the end point
 def normalized_points_cubic_bezier(segment_length, p0, p1, p2, p3):
 
     end = p3
     p0, p1, p2, p3 = map(np.array, [p0, p1, p2, p3])
 
-    points = [p0]
-    t = 0
+    table_t, table_length = arc_length_table(p0, p1, p2, p3)
+    total_length = table_length[-1]
 
-    while True:
-        current_arc_length = arc_length(t, p0, p1, p2, p3)
-        target_arc_length = current_arc_length + segment_length
-        t = find_t_for_arc_length(target_arc_length, p0, p1, p2, p3)
+    # always start with p0, even if the curve has no length
+    targets = np.arange(0, total_length, segment_length) if total_length > 0 else np.zeros(1)
 
-        if t >= 1:
-            points.append(end)
-            return points
+    t = find_t_for_arc_lengths(targets, table_t, table_length, p0, p1, p2, p3)
 
-        point = cubic_bezier_point(t, p0, p1, p2, p3)
-        points.append(point.tolist())
+    points = cubic_bezier_points(t, p0, p1, p2, p3).tolist()
+    points.append(end)
+    return points
 
     
 # Evenly-spaced values of t. Segments may not be equidistant
@@ -59,12 +118,5 @@ def fast_points_cubic_bezier(RESOLUTION, p0, p1, p2, p3):
     approximateDistance += distanceTuples(p2, p3)
     N = int(approximateDistance * RESOLUTION) # number of points
 
-    p0, p1, p2, p3 = map(np.array, [p0, p1, p2, p3])
-
-    points = []
-    for i in range(N):
-        t = i / (N-1)
-        point = cubic_bezier_point(t, p0, p1, p2, p3)
-        points.append(point.tolist())
-
-    return points
\ No newline at end of file
+    # a single array of points, converted to a list once instead of once per point
+    return cubic_bezier_points(np.linspace(0, 1, N), p0, p1, p2, p3).tolist()
\ No newline at end of file
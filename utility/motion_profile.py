@@ -1,3 +1,4 @@
+from common.frame_scheduler import FrameScheduler
 import math
 
 """
@@ -22,6 +23,10 @@ class MotionProfile:
     def setEndValue(self, endValue):
         self._endValue = endValue
 
+        # the profile starts moving on the next tick, so keep the main loop running
+        if abs(self._endValue - self._currentValue) >= self._threshold:
+            FrameScheduler.requestFrame()
+
     def getEndValue(self) -> float:
         return self._endValue
 
@@ -55,6 +60,9 @@ class MotionProfile:
             self._currentValue = self._endValue
             return self._currentValue
         
+        # still animating, so the next frame should not be skipped
+        FrameScheduler.requestFrame()
+
         self._currentValue += (self._endValue - self._currentValue) * self._speed
 
         return self._currentValue
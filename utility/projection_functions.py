@@ -0,0 +1,177 @@
+import math
+from typing import NamedTuple
+import numpy as np
+from utility.bezier_functions_2 import cubic_bezier_points
+
+"""
+Nearest point queries for the shapes a path segment can take. Every projection returns the distance from
+the point to the curve, the curve parameter t (from 0 at the start to 1 at the end), and the closest point
+on the curve itself. Bounding boxes are (minX, minY, maxX, maxY), so that most curves can be rejected
+without projecting onto them.
+
+Since the field to screen transform is a uniform scale plus offset, projecting in the field reference frame
+gives the same closest point as projecting in the screen reference frame.
+"""
+
+class CurveProjection(NamedTuple):
+    distance: float
+    t: float
+    point: tuple
+
+# number of intervals in the coarse sample along a bezier curve. The nearest sample bounds the projected distance
+BEZIER_PROJECTION_SAMPLES = 16
+BEZIER_PROJECTION_MAX_ITERATIONS = 8
+BEZIER_PROJECTION_MAX_HALVINGS = 8
+BEZIER_PROJECTION_TOLERANCE = 1e-9
+
+def isInsideBoundingBox(point: tuple, box: tuple, margin: float = 0) -> bool:
+    return box[0] - margin <= point[0] <= box[2] + margin and box[1] - margin <= point[1] <= box[3] + margin
+
+def lineBoundingBox(a: tuple, b: tuple) -> tuple:
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[0], b[0]), max(a[1], b[1])
+
+def projectOntoLine(point: tuple, a: tuple, b: tuple) -> CurveProjection:
+    dx, dy = b[0] - a[0], b[1] - a[1]
+    lengthSquared = dx*dx + dy*dy
+    t = 0 if lengthSquared == 0 else ((point[0] - a[0]) * dx + (point[1] - a[1]) * dy) / lengthSquared
+    t = min(1, max(0, t))
+    closest = (a[0] + t * dx, a[1] + t * dy)
+    return CurveProjection(math.hypot(point[0] - closest[0], point[1] - closest[1]), t, closest)
+
+# An arc from startAngle to stopAngle, going positively if isPositive and negatively otherwise.
+# Returns the arc as a start angle and a positive sweep, the same way drawArcFromCenterAngles() does
+def _normalizeArc(startAngle: float, stopAngle: float, isPositive: bool) -> tuple[float, float]:
+    startAngle = startAngle % (2*math.pi)
+    stopAngle = stopAngle % (2*math.pi)
+    if not isPositive:
+        startAngle, stopAngle = stopAngle, startAngle
+    return startAngle, (stopAngle - startAngle) % (2*math.pi)
+
+# The bounding box of the arc is the bounding box of its endpoints, plus wherever it crosses an axis
+def arcBoundingBox(center: tuple, radius: float, startAngle: float, stopAngle: float, isPositive: bool) -> tuple:
+    start, sweep = _normalizeArc(startAngle, stopAngle, isPositive)
+    angles = [start, start + sweep] + [k * math.pi / 2 for k in range(8) if 0 < (k * math.pi / 2 - start) < sweep]
+    xs = [center[0] + radius * math.cos(angle) for angle in angles]
+    ys = [center[1] + radius * math.sin(angle) for angle in angles]
+    return min(xs), min(ys), max(xs), max(ys)
+
+# If the direction to the point is within the arc, the closest point is along that direction. Otherwise,
+# it is one of the endpoints
+def projectOntoArc(point: tuple, center: tuple, radius: float, startAngle: float, stopAngle: float, isPositive: bool) -> CurveProjection:
+
+    start, sweep = _normalizeArc(startAngle, stopAngle, isPositive)
+    dx, dy = point[0] - center[0], point[1] - center[1]
+    fraction = ((math.atan2(dy, dx) - start) % (2*math.pi)) / sweep if sweep > 0 else 0
+
+    if fraction > 1:
+        # past the stop angle, so the closest point is whichever endpoint is nearer in angle
+        fraction = 1 if (fraction - 1) * sweep < 2*math.pi - fraction * sweep else 0
+
+    angle = start + fraction * sweep
+    closest = (center[0] + radius * math.cos(angle), center[1] + radius * math.sin(angle))
+    distance = math.hypot(point[0] - closest[0], point[1] - closest[1])
+
+    # t goes from the start angle to the stop angle given, which are swapped when going negatively
+    t = fraction if isPositive else 1 - fraction
+    return CurveProjection(distance, t, closest)
+
+# The curve stays inside the box of its endpoints and the points where dx/dt or dy/dt is 0
+def bezierBoundingBox(p0: tuple, p1: tuple, p2: tuple, p3: tuple) -> tuple:
+    ts = [0, 1]
+    for axis in [0, 1]:
+        # dB/dt / 3 = a t^2 + b t + c
+        a = -p0[axis] + 3*p1[axis] - 3*p2[axis] + p3[axis]
+        b = 2 * (p0[axis] - 2*p1[axis] + p2[axis])
+        c = p1[axis] - p0[axis]
+        if abs(a) < 1e-12:
+            if abs(b) > 1e-12:
+                ts.append(-c / b)
+        else:
+            discriminant = b*b - 4*a*c
+            if discriminant >= 0:
+                root = math.sqrt(discriminant)
+                ts += [(-b + root) / (2*a), (-b - root) / (2*a)]
+
+    points = cubic_bezier_points([t for t in ts if 0 <= t <= 1], p0, p1, p2, p3)
+    (minX, minY), (maxX, maxY) = points.min(axis = 0), points.max(axis = 0)
+    return float(minX), float(minY), float(maxX), float(maxY)
+
+# Coarse (t, point) samples along the curve. The nearest one is the fallback result of projectOntoBezier()
+def bezierProjectionSamples(p0: tuple, p1: tuple, p2: tuple, p3: tuple) -> tuple[np.ndarray, np.ndarray]:
+    t = np.linspace(0, 1, BEZIER_PROJECTION_SAMPLES + 1)
+    return t, cubic_bezier_points(t, p0, p1, p2, p3)
+
+# Distance from the point to B(t), given coefficients relative to the point
+def _bezierDistance(cx: tuple, cy: tuple, t: float) -> float:
+    return math.hypot(cx[0] + t * (cx[1] + t * (cx[2] + t * cx[3])), cy[0] + t * (cy[1] + t * (cy[2] + t * cy[3])))
+
+# Refine t with Newton's method on f(t) = (B(t) - P) . B'(t), which is zero where the line from the point
+# to the curve is perpendicular to the curve. A step that moves away from the point is halved until it does
+# not, so the result is never farther than where it started. Returns (distance, t)
+def _refineBezierProjection(cx: tuple, cy: tuple, t: float) -> tuple[float, float]:
+
+    distance = _bezierDistance(cx, cy, t)
+    for i in range(BEZIER_PROJECTION_MAX_ITERATIONS):
+        x = cx[0] + t * (cx[1] + t * (cx[2] + t * cx[3]))
+        y = cy[0] + t * (cy[1] + t * (cy[2] + t * cy[3]))
+        dx = cx[1] + t * (2 * cx[2] + t * 3 * cx[3])
+        dy = cy[1] + t * (2 * cy[2] + t * 3 * cy[3])
+        ddx = 2 * cx[2] + 6 * t * cx[3]
+        ddy = 2 * cy[2] + 6 * t * cy[3]
+
+        # not near a local minimum, so Newton's method would head towards a maximum
+        df = dx * dx + dy * dy + x * ddx + y * ddy
+        if df <= 0:
+            break
+
+        step = (x * dx + y * dy) / df
+        for halving in range(BEZIER_PROJECTION_MAX_HALVINGS):
+            newT = min(1, max(0, t - step))
+            newDistance = _bezierDistance(cx, cy, newT)
+            if newDistance <= distance:
+                break
+            step /= 2
+        else:
+            break
+
+        moved = abs(newT - t)
+        t, distance = newT, newDistance
+        if moved < BEZIER_PROJECTION_TOLERANCE:
+            break
+
+    return distance, t
+
+# The distance has a local minimum wherever f(t) = (B(t) - P) . B'(t) is zero. f is a quintic, so all of them
+# are found as its roots, then refined since the roots are not exact. The closest one wins, which handles
+# curves that pass near the point more than once or have a cusp near it. The result is never farther than
+# the nearest coarse sample, which includes both endpoints
+def projectOntoBezier(point: tuple, p0: tuple, p1: tuple, p2: tuple, p3: tuple, samples: tuple[np.ndarray, np.ndarray] = None) -> CurveProjection:
+
+    if samples is None:
+        samples = bezierProjectionSamples(p0, p1, p2, p3)
+    sampleT, samplePoints = samples
+
+    px, py = point
+
+    # power basis coefficients per axis relative to the point, so that B(t) - P = c0 + c1 t + c2 t^2 + c3 t^3
+    cx = (p0[0] - px, 3 * (p1[0] - p0[0]), 3 * (p0[0] - 2*p1[0] + p2[0]), p3[0] - p0[0] + 3 * (p1[0] - p2[0]))
+    cy = (p0[1] - py, 3 * (p1[1] - p0[1]), 3 * (p0[1] - 2*p1[1] + p2[1]), p3[1] - p0[1] + 3 * (p1[1] - p2[1]))
+
+    distances = np.hypot(samplePoints[:, 0] - px, samplePoints[:, 1] - py)
+    k = int(np.argmin(distances))
+    best = (float(distances[k]), float(sampleT[k]))
+
+    # coefficients of f, highest power first
+    f = np.convolve(cx[::-1], (3 * cx[3], 2 * cx[2], cx[1])) + np.convolve(cy[::-1], (3 * cy[3], 2 * cy[2], cy[1]))
+
+    # roots close to each other, like the minimum and maximum on either side of a cusp, can come out as a
+    # complex pair, so the real part of every root near [0, 1] is refined
+    margin = 1 / BEZIER_PROJECTION_SAMPLES
+    for root in (np.roots(f) if np.any(f) else []):
+        t = float(root.real)
+        if -margin <= t <= 1 + margin:
+            best = min(best, _refineBezierProjection(cx, cy, min(1, max(0, t))))
+
+    distance, t = best
+    closest = (px + cx[0] + t * (cx[1] + t * (cx[2] + t * cx[3])), py + cy[0] + t * (cy[1] + t * (cy[2] + t * cy[3])))
+    return CurveProjection(distance, t, closest)
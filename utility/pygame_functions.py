@@ -1,4 +1,5 @@
 import pygame, pygame.gfxdraw, math
+import numpy as np
 import utility.math_functions as math_functions
 
 def shade(color: tuple, scalar: float):
@@ -48,6 +49,83 @@ def drawLine(screen: pygame.Surface, color: tuple, x1: int, y1: int, x2: int, y2
     if borderColor is not None:
         pygame.gfxdraw.aapolygon(screen, (UL, UR, BR, BL), borderColor)
     
+# a miter longer than this multiple of half the thickness is replaced with a round join
+MITER_LIMIT = 2
+
+# a single stroke polygon turns at most this much in total, so that it never overlaps itself
+MAX_STROKE_TURN = math.pi * 0.75
+
+# gfxdraw fills a polygon by checking every edge on every row, so long strokes are split into a few shorter polygons
+MAX_STROKE_POINTS = 32
+
+# Draw a thick polyline through an (N,2) array of points as joined stroke polygons, instead of one polygon per
+# pair of points like drawLine(). The corners of each polygon are offset from the points along the miter
+# direction, all computed at once. Sharp corners get round joins instead of long miters. The outline of
+# each polygon is anti-aliased once
+def drawPolyline(screen: pygame.Surface, color: tuple, points, thickness: int = 1):
+
+    points = np.asarray(points, dtype = np.float64).reshape(-1, 2)
+
+    # repeated points have no direction
+    if len(points) > 1:
+        points = points[np.concatenate(([True], np.any(np.diff(points, axis = 0) != 0, axis = 1)))]
+    if len(points) < 2:
+        return
+
+    halfWidth = round(thickness) / 2
+    last = len(points) - 1
+
+    # unit direction and left normal of every line
+    directions = np.diff(points, axis = 0)
+    directions /= np.hypot(*directions.T)[:, None]
+    normals = np.column_stack((-directions[:, 1], directions[:, 0]))
+
+    # at every corner, the offset to the stroke edge is along the sum of the two normals, and longer the sharper
+    # it is. Corner i is points[i+1], between line i and line i+1
+    miters = normals[:-1] + normals[1:]
+    miterNormal = np.sum(miters * normals[1:], axis = 1)
+    sharp = miterNormal / np.maximum(np.hypot(*miters.T), 1e-12) < 1 / MITER_LIMIT
+    with np.errstate(divide = "ignore", invalid = "ignore"):
+        miters /= miterNormal[:, None]
+
+    # total turning so far at each corner
+    cross = directions[:-1, 0] * directions[1:, 1] - directions[:-1, 1] * directions[1:, 0]
+    totalTurn = np.cumsum(np.abs(np.arctan2(cross, np.sum(directions[:-1] * directions[1:], axis = 1))))
+    sharpCorners = np.flatnonzero(sharp)
+
+    # split into strokes at sharp corners, whenever a stroke has turned too much, and every MAX_STROKE_POINTS
+    breaks = []
+    corner, strokeStartTurn = 0, 0
+    while True:
+        nextTurn = np.searchsorted(totalTurn, strokeStartTurn + MAX_STROKE_TURN, side = "right")
+        i = np.searchsorted(sharpCorners, corner)
+        nextSharp = sharpCorners[i] if i < len(sharpCorners) else len(totalTurn)
+        corner = min(nextTurn, nextSharp, corner + MAX_STROKE_POINTS - 2)
+        if corner >= len(totalTurn):
+            break
+        breaks.append(corner + 1)
+        strokeStartTurn = totalTurn[corner]
+        corner += 1
+
+    for start, end in zip([0] + breaks, breaks + [last]):
+
+        # strokes are square at the ends of the polyline and at sharp corners, and share the miter otherwise
+        startOffset = normals[start] if start == 0 or sharp[start - 1] else miters[start - 1]
+        endOffset = normals[end - 1] if end == last or sharp[end - 1] else miters[end - 1]
+        offsets = np.concatenate(([startOffset], miters[start:end-1], [endOffset])) * halfWidth
+
+        stroke = points[start:end+1]
+        polygon = np.concatenate((stroke + offsets, (stroke - offsets)[::-1])).tolist()
+
+        pygame.gfxdraw.aapolygon(screen, polygon, color)
+        pygame.gfxdraw.filled_polygon(screen, polygon, color)
+
+    # round joins at sharp corners
+    for corner in sharpCorners:
+        x, y = points[corner + 1]
+        pygame.gfxdraw.aacircle(screen, int(x), int(y), int(halfWidth), color)
+        pygame.gfxdraw.filled_circle(screen, int(x), int(y), int(halfWidth), color)
+
 def getText(font: pygame.font.Font, string: str, color: tuple, opacity: float = 1) -> pygame.Surface:
     text = font.render(string, True, color)
     text.set_alpha(opacity * 255)
@@ -275,13 +353,9 @@ def drawArcFromCenterAngles(screen, startAngle, stopAngle, isPositive, color, ce
 
     # at this point, we are ALWAYS going from startAngle up to stopAngle
     numSegments = int(math.ceil(numSegments))
-    deltaTheta = (stopAngle - startAngle) / numSegments
-    for i in range(numSegments):
-        angle1 = startAngle + i*deltaTheta
-        angle2 = startAngle + (i+1)*deltaTheta
-        p1 = (center[0] + radius*math.cos(angle1), center[1] + radius*math.sin(angle1))
-        p2 = (center[0] + radius*math.cos(angle2), center[1] + radius*math.sin(angle2))
-        drawLine(screen, color, *p1, *p2, width)
+    angles = np.linspace(startAngle, stopAngle, numSegments + 1)
+    points = np.column_stack((center[0] + radius * np.cos(angles), center[1] + radius * np.sin(angles)))
+    drawPolyline(screen, color, points, width)
 
 
 
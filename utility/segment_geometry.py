@@ -0,0 +1,86 @@
+import math
+import numpy as np
+from utility.bezier_functions_2 import arc_length_table, cubic_bezier_points
+from utility.tessellation import CHORD_TOLERANCE, getArcSegmentCount, getBezierSegmentCount, getZoomBucket
+
+"""
+A sampled description of the shape of a single path segment, in the field reference frame. Every array
+has one entry per sample, from the start of the segment to the end:
+    positions: (N,2) points on the segment
+    headings: (N,) direction of travel along the segment in radians, unwrapped so that neighboring samples
+              never jump by 2pi
+    distances: (N,) arc length from the start of the segment, starting at 0 and ending at the segment length
+    curvatures: (N,) signed curvature, positive when turning towards positive theta
+
+Samples are dense enough that the lines between them stay within GEOMETRY_TOLERANCE inches of the true
+curve, so linearly interpolating between samples is accurate.
+"""
+
+# the maximum distance in inches between the sampled lines and the true curve
+GEOMETRY_TOLERANCE = 0.01
+
+# the sample counts from tessellation are for a chord tolerance in pixels, so ask for the zoom at which
+# CHORD_TOLERANCE pixels is GEOMETRY_TOLERANCE inches
+_GEOMETRY_BUCKET = getZoomBucket(CHORD_TOLERANCE / GEOMETRY_TOLERANCE)
+
+class SegmentGeometry:
+    def __init__(self, positions: np.ndarray, headings: np.ndarray, distances: np.ndarray, curvatures: np.ndarray):
+        self.positions = positions
+        self.headings = headings
+        self.distances = distances
+        self.curvatures = curvatures
+
+        # shared by every caller through the cache
+        for array in [positions, headings, distances, curvatures]:
+            array.flags.writeable = False
+
+    def getLength(self) -> float:
+        return float(self.distances[-1])
+
+    # the same segment driven backwards, which keeps the samples in place but turns every heading around
+    def reversed(self) -> 'SegmentGeometry':
+        return SegmentGeometry(self.positions, self.headings + math.pi, self.distances, self.curvatures)
+
+    def __len__(self) -> int:
+        return len(self.distances)
+
+def straightGeometry(a: tuple, b: tuple) -> SegmentGeometry:
+    heading = math.atan2(b[1] - a[1], b[0] - a[0])
+    return SegmentGeometry(
+        np.array([a, b], dtype = float),
+        np.full(2, heading),
+        np.array([0, math.hypot(b[0] - a[0], b[1] - a[1])]),
+        np.zeros(2)
+    )
+
+# An arc from startAngle to stopAngle around the center, going positively if isPositive and negatively otherwise
+def arcGeometry(center: tuple, radius: float, startAngle: float, stopAngle: float, isPositive: bool) -> SegmentGeometry:
+
+    sweep = (stopAngle - startAngle) % (2*math.pi)
+    if not isPositive:
+        sweep = -((-sweep) % (2*math.pi))
+
+    n = getArcSegmentCount(radius, abs(sweep), _GEOMETRY_BUCKET)
+    angles = startAngle + np.linspace(0, sweep, n + 1)
+    sign = 1 if isPositive else -1
+
+    return SegmentGeometry(
+        np.column_stack((center[0] + radius * np.cos(angles), center[1] + radius * np.sin(angles))),
+        angles + sign * math.pi / 2,
+        np.linspace(0, abs(sweep) * radius, n + 1),
+        np.full(n + 1, sign / radius if radius > 0 else 0)
+    )
+
+# Samples at evenly spaced values of t, with the arc length at each sample integrated exactly
+def bezierGeometry(p0: tuple, p1: tuple, p2: tuple, p3: tuple) -> SegmentGeometry:
+
+    n = getBezierSegmentCount(tuple(p0), tuple(p1), tuple(p2), tuple(p3), _GEOMETRY_BUCKET)
+    t, distances = arc_length_table(*map(np.asarray, [p0, p1, p2, p3]), intervals = n)
+    points, first, second, curvatures = cubic_bezier_points(t, p0, p1, p2, p3, derivatives = True, curvature = True)
+
+    # the derivative vanishes where a control point sits on its node, so fall back to the direction of the curve
+    speeds = np.hypot(first[:, 0], first[:, 1])
+    first = np.where((speeds > 1e-9)[:, None], first, np.gradient(points, axis = 0))
+    headings = np.unwrap(np.arctan2(first[:, 1], first[:, 0]))
+
+    return SegmentGeometry(points, headings, distances, curvatures)
@@ -0,0 +1,170 @@
+import math
+from functools import lru_cache
+import numpy as np
+from utility.bezier_functions_2 import cubic_bezier_points
+
+"""
+Picks how many lines to draw a curve with, based on how far the lines are allowed to stray from the true curve
+on the screen (chord error), instead of a fixed number of lines per pixel of length. Zooming in adds lines only
+where the curve actually bends, and the parts of a curve outside the field viewport are skipped.
+
+All functions take the geometry in the field reference frame, and the field to screen affine transform
+(screen = field * scale + offset, see FieldTransform.recalculatePointsAndVectors()). They return a list of
+(N,2) arrays of screen points, one per visible piece of the curve.
+
+Segment counts only depend on the curve and the zoom, so they are memoized per (geometry, zoom bucket).
+Zoom buckets are small enough that the counts are computed for a slightly higher zoom than the actual one,
+which keeps the chord error within tolerance for every zoom in the bucket.
+"""
+
+# the maximum distance in pixels between the drawn lines and the true curve
+CHORD_TOLERANCE = 0.25
+
+# upper bound on the number of lines for a single curve
+MAX_SEGMENTS = 1000
+
+ZOOM_BUCKETS_PER_DOUBLING = 8
+
+# the zoom bucket for a field to screen scale
+def getZoomBucket(scale: float) -> int:
+    return math.ceil(math.log2(scale) * ZOOM_BUCKETS_PER_DOUBLING)
+
+# the largest scale in the zoom bucket
+def getBucketScale(bucket: int) -> float:
+    return 2 ** (bucket / ZOOM_BUCKETS_PER_DOUBLING)
+
+# Largest angle step such that the sagitta r * (1 - cos(step / 2)) of each chord is within tolerance
+def getArcStepAngle(radius: float, tolerance: float = CHORD_TOLERANCE) -> float:
+    if radius <= tolerance:
+        return math.pi / 2
+    return 2 * math.acos(1 - tolerance / radius)
+
+@lru_cache(maxsize = 1024)
+def getArcSegmentCount(radius: float, deltaAngle: float, bucket: int) -> int:
+    step = getArcStepAngle(radius * getBucketScale(bucket))
+    return max(1, min(MAX_SEGMENTS, math.ceil(abs(deltaAngle) / step)))
+
+# For a cubic bezier, the distance between the curve and a chord over a t interval of h is at most
+# max|B''| * h^2 / 8, and max|B''| is reached at an endpoint: 6 * max(|p0 - 2p1 + p2|, |p1 - 2p2 + p3|)
+@lru_cache(maxsize = 1024)
+def getBezierSegmentCount(p0: tuple, p1: tuple, p2: tuple, p3: tuple, bucket: int) -> int:
+    scale = getBucketScale(bucket)
+    d1 = math.hypot(p0[0] - 2*p1[0] + p2[0], p0[1] - 2*p1[1] + p2[1])
+    d2 = math.hypot(p1[0] - 2*p2[0] + p3[0], p1[1] - 2*p2[1] + p3[1])
+    maxSecondDerivative = 6 * max(d1, d2) * scale
+    return max(1, min(MAX_SEGMENTS, math.ceil(math.sqrt(maxSecondDerivative / (8 * CHORD_TOLERANCE)))))
+
+# Tessellated bezier in field reference frame
+@lru_cache(maxsize = 256)
+def _tessellateBezierField(p0: tuple, p1: tuple, p2: tuple, p3: tuple, bucket: int) -> np.ndarray:
+    n = getBezierSegmentCount(p0, p1, p2, p3, bucket)
+    points = cubic_bezier_points(np.linspace(0, 1, n + 1), p0, p1, p2, p3)
+    points.flags.writeable = False # shared by every caller through the cache
+    return points
+
+# Split an array of points into runs of consecutive lines that touch the viewport (x, y, width, height),
+# expanded by margin on all sides. Lines entirely outside the viewport are dropped
+def clipPolyline(points: np.ndarray, viewport: tuple, margin: float = 0) -> list[np.ndarray]:
+
+    if len(points) < 2:
+        return []
+
+    x, y, width, height = viewport
+    start, end = points[:-1], points[1:]
+    visible = (np.minimum(start[:,0], end[:,0]) <= x + width + margin) & (np.maximum(start[:,0], end[:,0]) >= x - margin) \
+        & (np.minimum(start[:,1], end[:,1]) <= y + height + margin) & (np.maximum(start[:,1], end[:,1]) >= y - margin)
+
+    if visible.all():
+        return [points]
+
+    # indices of the first and last line of each run of visible lines
+    edges = np.diff(np.concatenate(([0], visible.astype(np.int8), [0])))
+    runStarts = np.flatnonzero(edges == 1)
+    runEnds = np.flatnonzero(edges == -1)
+    return [points[a:b+1] for a, b in zip(runStarts, runEnds)]
+
+# Points of a cubic bezier curve given its control points in field reference frame, in screen reference frame
+def tessellateBezier(p0: tuple, p1: tuple, p2: tuple, p3: tuple, scale: float, offset: tuple,
+                     viewport: tuple, margin: float = 0) -> list[np.ndarray]:
+
+    points = _tessellateBezierField(tuple(p0), tuple(p1), tuple(p2), tuple(p3), getZoomBucket(scale))
+    return clipPolyline(points * scale + np.asarray(offset), viewport, margin)
+
+# The angle intervals within [startAngle, stopAngle] where the circle is inside the viewport. The circle can
+# only enter or leave the viewport where it crosses one of the viewport edge lines, so split the arc there
+def clipArc(center: tuple, radius: float, startAngle: float, stopAngle: float,
+            viewport: tuple, margin: float = 0) -> list[tuple[float, float]]:
+
+    x, y, width, height = viewport
+    left, right = x - margin, x + width + margin
+    top, bottom = y - margin, y + height + margin
+    cx, cy = center
+
+    # entirely inside, or the whole circle's bounding box is outside
+    if cx - radius >= left and cx + radius <= right and cy - radius >= top and cy + radius <= bottom:
+        return [(startAngle, stopAngle)]
+    if cx + radius < left or cx - radius > right or cy + radius < top or cy - radius > bottom:
+        return []
+
+    # angles where the circle crosses the vertical and horizontal viewport edges
+    cuts = []
+    for edge in [left, right]:
+        if abs(edge - cx) < radius:
+            angle = math.acos((edge - cx) / radius)
+            cuts += [angle, -angle]
+    for edge in [top, bottom]:
+        if abs(edge - cy) < radius:
+            angle = math.asin((edge - cy) / radius)
+            cuts += [angle, math.pi - angle]
+
+    # shift the cuts into (startAngle, stopAngle)
+    span = stopAngle - startAngle
+    cuts = sorted(startAngle + (cut - startAngle) % (2*math.pi) for cut in cuts)
+    bounds = [startAngle] + [cut for cut in cuts if cut - startAngle < span] + [stopAngle]
+
+    # keep the pieces whose midpoint is inside the viewport, merging neighboring pieces
+    intervals = []
+    for a, b in zip(bounds, bounds[1:]):
+        mid = (a + b) / 2
+        mx, my = cx + radius * math.cos(mid), cy + radius * math.sin(mid)
+        if left <= mx <= right and top <= my <= bottom:
+            if len(intervals) > 0 and intervals[-1][1] == a:
+                intervals[-1] = (intervals[-1][0], b)
+            else:
+                intervals.append((a, b))
+    return intervals
+
+# Points of an arc from startAngle to stopAngle in screen reference frame, given the center and radius in
+# field reference frame. Angles are handled the same way as drawArcFromCenterAngles(). Vertices are at fixed
+# angles from the start, so they do not move around when panning changes which part of the arc is clipped
+def tessellateArc(center: tuple, radius: float, startAngle: float, stopAngle: float, isPositive: bool,
+                  scale: float, offset: tuple, viewport: tuple, margin: float = 0) -> list[np.ndarray]:
+
+    # always go positively from startAngle up to stopAngle, without wraparound
+    startAngle = startAngle % (2*math.pi)
+    stopAngle = stopAngle % (2*math.pi)
+    if not isPositive:
+        startAngle, stopAngle = stopAngle, startAngle
+    if startAngle > stopAngle:
+        startAngle -= 2*math.pi
+
+    deltaAngle = stopAngle - startAngle
+    if deltaAngle <= 0:
+        return []
+
+    centerS = (center[0] * scale + offset[0], center[1] * scale + offset[1])
+    radiusS = radius * scale
+
+    n = getArcSegmentCount(radius, deltaAngle, getZoomBucket(scale))
+    step = deltaAngle / n
+
+    pieces = []
+    for a, b in clipArc(centerS, radiusS, startAngle, stopAngle, viewport, margin):
+
+        # the vertices covering [a, b]
+        first = max(0, math.floor((a - startAngle) / step))
+        last = min(n, math.ceil((b - startAngle) / step))
+        angles = startAngle + np.arange(first, last + 1) * step
+
+        pieces.append(np.column_stack((centerS[0] + radiusS * np.cos(angles), centerS[1] + radiusS * np.sin(angles))))
+    return pieces